@@ -5,7 +5,7 @@ import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'app')))
 from app.core.database import Base
-from app.models import user, share
+from app.models import user, share, campaign
 
 config = context.config
 fileConfig(config.config_file_name)
@@ -0,0 +1,38 @@
+"""Add campaign_deliveries ledger table
+
+Revision ID: add_campaign_deliveries
+Revises: add_share_daily_rollup
+Create Date: 2025-08-07 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_campaign_deliveries'
+down_revision = 'add_share_daily_rollup'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'campaign_deliveries',
+        sa.Column('campaign_type', sa.String(length=50), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.Enum('pending', 'sent', 'failed', name='deliverystatusenum'), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('claim_token', sa.String(length=36), nullable=True),
+        sa.Column('last_error', sa.String(length=500), nullable=True),
+        sa.Column('sent_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('campaign_type', 'user_id')
+    )
+    op.create_index('idx_campaign_deliveries_status', 'campaign_deliveries', ['campaign_type', 'status'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_campaign_deliveries_status', table_name='campaign_deliveries')
+    op.drop_table('campaign_deliveries')
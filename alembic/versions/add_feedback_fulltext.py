@@ -0,0 +1,56 @@
+"""Add full-text search index on feedback answers
+
+Revision ID: add_feedback_fulltext
+Revises: add_campaign_deliveries
+Create Date: 2025-08-08 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_feedback_fulltext'
+down_revision = 'add_campaign_deliveries'
+branch_labels = None
+depends_on = None
+
+COLUMNS = ['monetization_considerations', 'professional_legacy', 'platform_impact', 'biggest_hurdle_other']
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'mysql':
+        op.create_index('ft_feedback_text', 'feedback', COLUMNS, unique=False, mysql_prefix='FULLTEXT')
+    elif dialect == 'sqlite':
+        columns = ', '.join(COLUMNS)
+        new = ', '.join(f'new.{c}' for c in COLUMNS)
+        old = ', '.join(f'old.{c}' for c in COLUMNS)
+        op.execute(f"CREATE VIRTUAL TABLE feedback_fts USING fts5({columns}, content='feedback', content_rowid='id')")
+        op.execute(f"""
+            CREATE TRIGGER feedback_fts_ai AFTER INSERT ON feedback BEGIN
+                INSERT INTO feedback_fts(rowid, {columns}) VALUES (new.id, {new});
+            END
+        """)
+        op.execute(f"""
+            CREATE TRIGGER feedback_fts_ad AFTER DELETE ON feedback BEGIN
+                INSERT INTO feedback_fts(feedback_fts, rowid, {columns}) VALUES ('delete', old.id, {old});
+            END
+        """)
+        op.execute(f"""
+            CREATE TRIGGER feedback_fts_au AFTER UPDATE ON feedback BEGIN
+                INSERT INTO feedback_fts(feedback_fts, rowid, {columns}) VALUES ('delete', old.id, {old});
+                INSERT INTO feedback_fts(rowid, {columns}) VALUES (new.id, {new});
+            END
+        """)
+        # Index existing feedback
+        op.execute("INSERT INTO feedback_fts(feedback_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'mysql':
+        op.drop_index('ft_feedback_text', table_name='feedback')
+    elif dialect == 'sqlite':
+        for trigger in ('feedback_fts_ai', 'feedback_fts_ad', 'feedback_fts_au'):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS feedback_fts")
@@ -0,0 +1,44 @@
+"""Add share_daily_rollup table and backfill it from share_events
+
+Revision ID: add_share_daily_rollup
+Revises: add_users_leaderboard_index
+Create Date: 2025-08-06 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_share_daily_rollup'
+down_revision = 'add_users_leaderboard_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'share_daily_rollup',
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('platform', sa.Enum('facebook', 'twitter', 'linkedin', 'instagram', 'whatsapp', name='platformenum'), nullable=False),
+        sa.Column('shares', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('points', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('unique_users', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('first_share_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('last_share_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('date', 'platform')
+    )
+    op.create_index('idx_share_daily_rollup_platform', 'share_daily_rollup', ['platform'], unique=False)
+
+    # Backfill from existing share events
+    op.execute("""
+        INSERT INTO share_daily_rollup (date, platform, shares, points, unique_users, first_share_at, last_share_at)
+        SELECT DATE(created_at), platform, COUNT(*), COALESCE(SUM(points_earned), 0),
+               COUNT(DISTINCT user_id), MIN(created_at), MAX(created_at)
+        FROM share_events
+        GROUP BY DATE(created_at), platform
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_share_daily_rollup_platform', table_name='share_daily_rollup')
+    op.drop_table('share_daily_rollup')
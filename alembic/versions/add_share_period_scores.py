@@ -0,0 +1,55 @@
+"""Add share_period_scores table and backfill it from share_events
+
+Revision ID: add_share_period_scores
+Revises: add_feedback_fulltext
+Create Date: 2025-08-09 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_share_period_scores'
+down_revision = 'add_feedback_fulltext'
+branch_labels = None
+depends_on = None
+
+# Period start expressions (MySQL): the day, the Monday of the week, the first of the month
+PERIOD_STARTS = {
+    'daily': "DATE(created_at)",
+    'weekly': "DATE_SUB(DATE(created_at), INTERVAL WEEKDAY(created_at) DAY)",
+    'monthly': "DATE_FORMAT(created_at, '%Y-%m-01')",
+}
+
+
+def upgrade() -> None:
+    op.create_table(
+        'share_period_scores',
+        sa.Column('period', sa.Enum('daily', 'weekly', 'monthly', name='scoreperiodenum'), nullable=False),
+        sa.Column('period_start', sa.Date(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('points', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('shares', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('last_share_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('period', 'period_start', 'user_id')
+    )
+    op.create_index(
+        'idx_share_period_scores_top', 'share_period_scores',
+        ['period', 'period_start', 'points'], unique=False
+    )
+
+    # Backfill from existing share events (other databases: run rebuild_share_rollup.py)
+    if op.get_bind().dialect.name == 'mysql':
+        for period, start in PERIOD_STARTS.items():
+            op.execute(f"""
+                INSERT INTO share_period_scores (period, period_start, user_id, points, shares, last_share_at)
+                SELECT '{period}', {start}, user_id, COALESCE(SUM(points_earned), 0), COUNT(*), MAX(created_at)
+                FROM share_events
+                GROUP BY {start}, user_id
+            """)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_share_period_scores_top', table_name='share_period_scores')
+    op.drop_table('share_period_scores')
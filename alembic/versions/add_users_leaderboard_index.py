@@ -0,0 +1,29 @@
+"""Add composite leaderboard index on users
+
+Revision ID: add_users_leaderboard_index
+Revises: add_feedback_contact_fields
+Create Date: 2025-08-05 10:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'add_users_leaderboard_index'
+down_revision = 'add_feedback_contact_fields'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Supports keyset around-me windows and exact-rank counts on
+    # (total_points DESC, created_at ASC, id ASC)
+    op.create_index(
+        'idx_users_leaderboard',
+        'users',
+        ['is_admin', 'total_points', 'created_at', 'id'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_users_leaderboard', table_name='users')
@@ -6,12 +6,16 @@ from app.schemas.admin import AdminDashboardResponse, AdminUsersResponse, AdminU
 from app.models.user import User
 from fastapi.security import OAuth2PasswordBearer
 from datetime import datetime, timedelta
+from typing import Optional
 from app.services.user_service import authenticate_user, create_jwt_for_user, get_user_by_id, promote_user_to_admin, get_bulk_email_recipients
 from app.core.security import get_current_admin
 from app.schemas.user import UserLogin
 from app.tasks.email_tasks import send_bulk_email_task
 from pydantic import BaseModel
 from app.utils.monitoring import inc_bulk_email_sent, inc_admin_promotion
+from app.services.analytics_service import get_share_analytics, get_platform_stats, get_platform_aggregates, get_today_totals
+from app.services.counter_service import get_user_counts
+from app.utils.pagination import InvalidCursor, cached_count, keyset_page, next_cursor_for
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
@@ -35,33 +39,24 @@ def admin_login(user_in: UserLogin, db: Session = Depends(get_db)):
 @router.get("/dashboard", response_model=AdminDashboardResponse)
 def dashboard(db: Session = Depends(get_db), admin=Depends(get_current_admin)):
     """Get admin dashboard overview with user and platform stats."""
-    from app.models.share import ShareEvent
-    from sqlalchemy import func
-
     # Basic user stats
-    total_users = db.query(User).count()
+    user_counts = get_user_counts(db)
+    total_users = user_counts["total_users"]
     active_users_24h = db.query(User).filter(User.updated_at > datetime.utcnow() - timedelta(hours=24)).count()
 
-    # Share stats for today
-    today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-    total_shares_today = db.query(ShareEvent).filter(ShareEvent.created_at >= today_start).count()
-    points_distributed_today = db.query(func.sum(ShareEvent.points_earned)).filter(ShareEvent.created_at >= today_start).scalar() or 0
-
-    # Platform breakdown (all time)
-    platform_stats = db.query(
-        ShareEvent.platform,
-        func.count(ShareEvent.id).label('shares'),
-        func.sum(ShareEvent.points_earned).label('points')
-    ).group_by(ShareEvent.platform).all()
+    # Share stats for today and per platform (all time), from the daily rollup
+    today_totals = get_today_totals(db)
+    total_shares_today = today_totals["shares"]
+    points_distributed_today = today_totals["points"]
 
-    total_all_shares = sum(stat.shares for stat in platform_stats) or 1  # Avoid division by zero
+    platform_stats = get_platform_aggregates(db)
+    total_all_shares = sum(stat["shares"] for stat in platform_stats.values()) or 1  # Avoid division by zero
     platform_breakdown = {}
 
-    for stat in platform_stats:
-        platform_name = stat.platform.value if hasattr(stat.platform, 'value') else str(stat.platform)
+    for platform_name, stat in platform_stats.items():
         platform_breakdown[platform_name] = {
-            "shares": stat.shares,
-            "percentage": round((stat.shares / total_all_shares) * 100, 1)
+            "shares": stat["shares"],
+            "percentage": round((stat["shares"] / total_all_shares) * 100, 1)
         }
 
     # Ensure all platforms are represented
@@ -70,8 +65,7 @@ def dashboard(db: Session = Depends(get_db), admin=Depends(get_current_admin)):
             platform_breakdown[platform] = {"shares": 0, "percentage": 0}
 
     # Growth metrics (simplified for now)
-    week_ago = datetime.utcnow() - timedelta(days=7)
-    new_users_7d = db.query(User).filter(User.created_at >= week_ago).count()
+    new_users_7d = user_counts["signups_7d"]
 
     growth_metrics = {
         "new_users_7d": new_users_7d,
@@ -97,78 +91,7 @@ def admin_analytics(db: Session = Depends(get_db), admin=Depends(get_current_adm
     Returns system-wide share analytics across all users.
     """
     try:
-        from app.models.share import ShareEvent, PlatformEnum
-        from sqlalchemy import func
-        from datetime import datetime, timedelta
-
-        # Get all share events
-        all_shares = db.query(ShareEvent).all()
-        total_shares = len(all_shares)
-        total_points = sum(s.points_earned for s in all_shares)
-
-        # Platform breakdown with enhanced data
-        platform_breakdown = {}
-        active_platforms = 0
-
-        for platform in PlatformEnum:
-            platform_shares = [s for s in all_shares if s.platform == platform]
-            shares_count = len(platform_shares)
-            points_sum = sum(s.points_earned for s in platform_shares)
-
-            if shares_count > 0:
-                active_platforms += 1
-                first_share = min(platform_shares, key=lambda x: x.created_at)
-                last_share = max(platform_shares, key=lambda x: x.created_at)
-
-                platform_breakdown[platform.value] = {
-                    "shares": shares_count,
-                    "points": points_sum,
-                    "percentage": round((shares_count / total_shares * 100), 1) if total_shares > 0 else 0,
-                    "first_share_date": first_share.created_at.isoformat(),
-                    "last_share_date": last_share.created_at.isoformat()
-                }
-            else:
-                platform_breakdown[platform.value] = {
-                    "shares": 0,
-                    "points": 0,
-                    "percentage": 0
-                }
-
-        # Timeline data (last 30 days) - system-wide
-        timeline = []
-        for i in range(30):
-            date = datetime.utcnow() - timedelta(days=i)
-            day_start = date.replace(hour=0, minute=0, second=0, microsecond=0)
-            day_end = day_start + timedelta(days=1)
-
-            day_shares = [s for s in all_shares if day_start <= s.created_at < day_end]
-            day_shares_count = len(day_shares)
-            day_points = sum(s.points_earned for s in day_shares)
-
-            timeline.append({
-                "date": day_start.isoformat(),
-                "shares": day_shares_count,
-                "points": day_points
-            })
-
-        # Reverse to get chronological order
-        timeline.reverse()
-
-        # Summary
-        average_points_per_share = round(total_points / total_shares, 2) if total_shares > 0 else 0
-
-        summary = {
-            "total_shares": total_shares,
-            "total_points": total_points,
-            "active_platforms": active_platforms,
-            "average_points_per_share": average_points_per_share
-        }
-
-        return {
-            "platform_breakdown": platform_breakdown,
-            "timeline": timeline,
-            "summary": summary
-        }
+        return get_share_analytics(db)
 
     except Exception as e:
         import logging
@@ -183,12 +106,17 @@ def admin_share_history(
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1, le=100),
     platform: str = Query(None),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page; replaces page"),
+    include_total: bool = Query(True, description="Include the (cached, in cursor mode) total count"),
     db: Session = Depends(get_db),
     admin=Depends(get_current_admin)
 ):
     """
     Get system-wide share history for admin panel.
     Returns all share events across all users with pagination.
+
+    Deep pages can be fetched with the opaque next_cursor of the previous
+    page (keyset on created_at, id) instead of page.
     """
     try:
         from app.models.share import ShareEvent, PlatformEnum
@@ -205,12 +133,19 @@ def admin_share_history(
             except ValueError:
                 pass  # Invalid platform, ignore filter
 
-        # Get total count for pagination
-        total_shares = query.count()
+        key_of = lambda event: (event.created_at, event.id)
+        if cursor:
+            share_events, next_cursor = keyset_page(
+                query, [(ShareEvent.created_at, True), (ShareEvent.id, True)], limit, cursor, key_of
+            )
+        else:
+            # Get total count for pagination
+            total_shares = query.count()
 
-        # Apply pagination and ordering
-        offset = (page - 1) * limit
-        share_events = query.order_by(desc(ShareEvent.created_at)).offset(offset).limit(limit).all()
+            # Apply pagination and ordering
+            offset = (page - 1) * limit
+            share_events = query.order_by(desc(ShareEvent.created_at), desc(ShareEvent.id)).offset(offset).limit(limit).all()
+            next_cursor = next_cursor_for(share_events, limit, key_of, total_shares, offset)
 
         # Format response
         shares = []
@@ -225,6 +160,16 @@ def admin_share_history(
                 "user_email": event.user.email
             })
 
+        if cursor:
+            pagination = {
+                "items_per_page": limit,
+                "has_next": next_cursor is not None
+            }
+            if include_total:
+                total_shares = cached_count(query)
+                pagination.update(total_items=total_shares, total_pages=(total_shares + limit - 1) // limit)
+            return {"shares": shares, "pagination": pagination, "next_cursor": next_cursor}
+
         # Calculate pagination info
         total_pages = (total_shares + limit - 1) // limit
         has_next = page < total_pages
@@ -239,9 +184,12 @@ def admin_share_history(
                 "items_per_page": limit,
                 "has_next": has_next,
                 "has_prev": has_prev
-            }
+            },
+            "next_cursor": next_cursor
         }
 
+    except InvalidCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         import logging
         logging.getLogger(__name__).error(f"Admin share history failed: {e}")
@@ -257,69 +205,7 @@ def admin_platform_stats(db: Session = Depends(get_db), admin=Depends(get_curren
     Returns comprehensive stats for each platform.
     """
     try:
-        from app.models.share import ShareEvent, PlatformEnum
-        from sqlalchemy import func
-        from datetime import datetime, timedelta
-
-        # Get all share events
-        all_shares = db.query(ShareEvent).all()
-        total_shares = len(all_shares)
-        total_points = sum(s.points_earned for s in all_shares)
-
-        # Calculate stats for each platform
-        platform_stats = {}
-
-        for platform in PlatformEnum:
-            platform_shares = [s for s in all_shares if s.platform == platform]
-            shares_count = len(platform_shares)
-            points_sum = sum(s.points_earned for s in platform_shares)
-
-            if shares_count > 0:
-                # Calculate additional metrics
-                first_share = min(platform_shares, key=lambda x: x.created_at)
-                last_share = max(platform_shares, key=lambda x: x.created_at)
-
-                # Get unique users for this platform
-                unique_users = len(set(s.user_id for s in platform_shares))
-
-                # Calculate recent activity (last 7 days)
-                week_ago = datetime.utcnow() - timedelta(days=7)
-                recent_shares = [s for s in platform_shares if s.created_at >= week_ago]
-
-                # Calculate daily average
-                days_active = (datetime.utcnow() - first_share.created_at).days + 1
-                daily_average = round(shares_count / days_active, 2) if days_active > 0 else 0
-
-                platform_stats[platform.value] = {
-                    "shares": shares_count,
-                    "points": points_sum,
-                    "percentage": round((shares_count / total_shares * 100), 1) if total_shares > 0 else 0,
-                    "unique_users": unique_users,
-                    "first_share_date": first_share.created_at.isoformat(),
-                    "last_share_date": last_share.created_at.isoformat(),
-                    "recent_shares_7d": len(recent_shares),
-                    "daily_average": daily_average,
-                    "points_per_share": round(points_sum / shares_count, 2) if shares_count > 0 else 0
-                }
-            else:
-                platform_stats[platform.value] = {
-                    "shares": 0,
-                    "points": 0,
-                    "percentage": 0,
-                    "unique_users": 0,
-                    "recent_shares_7d": 0,
-                    "daily_average": 0,
-                    "points_per_share": 0
-                }
-
-        return {
-            "platform_stats": platform_stats,
-            "summary": {
-                "total_shares": total_shares,
-                "total_points": total_points,
-                "total_platforms": len([p for p in platform_stats.values() if p["shares"] > 0])
-            }
-        }
+        return get_platform_stats(db)
 
     except Exception as e:
         import logging
@@ -330,17 +216,49 @@ def admin_platform_stats(db: Session = Depends(get_db), admin=Depends(get_curren
         )
 
 @router.get("/users", response_model=AdminUsersResponse)
-def admin_users(db: Session = Depends(get_db), admin=Depends(get_current_admin), page: int = 1, limit: int = 50, search: str = "", sort: str = "points"):
-    """List users for admin panel with pagination, search, and sorting."""
+def admin_users(
+    db: Session = Depends(get_db),
+    admin=Depends(get_current_admin),
+    page: int = 1,
+    limit: int = 50,
+    search: str = "",
+    sort: str = "points",
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page; replaces page"),
+    include_total: bool = Query(True, description="Include the (cached, in cursor mode) total count")
+):
+    """
+    List users for admin panel with pagination, search, and sorting.
+
+    Deep pages can be fetched with the opaque next_cursor of the previous
+    page (keyset on total_points, id or on id) instead of page.
+    """
     q = db.query(User)
     if search:
         q = q.filter(User.name.ilike(f"%{search}%"))
     if sort == "points":
-        q = q.order_by(User.total_points.desc())
-    total = q.count()
-    users = q.offset((page-1)*limit).limit(limit).all()
+        keys = [(User.total_points, True), (User.id, True)]
+        key_of = lambda u: (u.total_points, u.id)
+    else:
+        keys = [(User.id, False)]
+        key_of = lambda u: (u.id,)
+
+    if cursor:
+        try:
+            users, next_cursor = keyset_page(q, keys, limit, cursor, key_of)
+        except InvalidCursor as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        pagination = {"limit": limit}
+        if include_total:
+            total = cached_count(q)
+            pagination.update(total=total, pages=(total+limit-1)//limit)
+    else:
+        total = q.count()
+        users = q.order_by(*(column.desc() if descending else column.asc() for column, descending in keys)).offset((page-1)*limit).limit(limit).all()
+        next_cursor = next_cursor_for(users, limit, key_of, total, (page-1)*limit)
+        pagination = {"page": page, "limit": limit, "total": total, "pages": (total+limit-1)//limit}
+
     items = [AdminUser(user_id=u.id, name=u.name, email=u.email, points=u.total_points, rank=None, shares_count=u.shares_count, status="active" if u.is_active else "inactive", last_activity=u.updated_at, created_at=u.created_at) for u in users]
-    return AdminUsersResponse(users=items, pagination={"page": page, "limit": limit, "total": total, "pages": (total+limit-1)//limit})
+    return AdminUsersResponse(users=items, pagination=pagination, next_cursor=next_cursor)
 
 @router.post("/send-bulk-email")
 def send_bulk_email(req: BulkEmailRequest, db: Session = Depends(get_db), admin=Depends(get_current_admin)):
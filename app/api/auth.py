@@ -1,9 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from app.core.dependencies import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.dependencies import get_db, get_async_db
 from app.schemas.user import UserCreate, UserLogin, UserResponse
 from app.schemas.token import Token
-from app.services.user_service import create_user, authenticate_user, create_jwt_for_user, get_user_by_email
+from app.services.user_service import create_user, authenticate_user_async, create_jwt_for_user, get_user_by_email
 from app.core.security import verify_access_token
 from fastapi.security import OAuth2PasswordBearer
 from app.tasks.email_tasks import send_delayed_welcome_email_task
@@ -114,7 +115,7 @@ def signup(user_in: UserCreate, db: Session = Depends(get_db)):
         )
 
 @router.post("/login", response_model=Token)
-def login(user_in: UserLogin, db: Session = Depends(get_db)):
+async def login(user_in: UserLogin, db: AsyncSession = Depends(get_async_db)):
     """
     Authenticate user and return access token.
 
@@ -130,7 +131,7 @@ def login(user_in: UserLogin, db: Session = Depends(get_db)):
     """
     try:
         # Authenticate user
-        user = authenticate_user(db, user_in.email, user_in.password)
+        user = await authenticate_user_async(db, user_in.email, user_in.password)
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -103,6 +103,12 @@ def beta_signup(user_data: BetaUserCreate, db: Session = Depends(get_db)):
 
         logger.info(f"Beta user created successfully: {beta_user.email} (ID: {beta_user.id})")
 
+        # Add the new user to the leaderboard rank index and user counters
+        from app.services.rank_index import record_user_points
+        from app.services.counter_service import record_user_created
+        record_user_points(beta_user.id, 0, beta_user.created_at)
+        record_user_created()
+
         # Schedule welcome email (if email service is available)
         try:
             from app.tasks.email_tasks import send_beta_welcome_email_task
@@ -152,28 +158,14 @@ def get_beta_stats(db: Session = Depends(get_db)):
         dict: Beta user statistics
     """
     try:
-        # Count total beta users (users created through beta signup)
-        total_users = db.query(User).filter(User.is_admin == False).count()
-        
-        # Count users created in the last 24 hours
-        from datetime import datetime, timedelta
-        yesterday = datetime.utcnow() - timedelta(days=1)
-        recent_users = db.query(User).filter(
-            User.is_admin == False,
-            User.created_at >= yesterday
-        ).count()
-        
-        # Count users created in the last week
-        last_week = datetime.utcnow() - timedelta(days=7)
-        weekly_users = db.query(User).filter(
-            User.is_admin == False,
-            User.created_at >= last_week
-        ).count()
+        # Non-admin user counts, maintained incrementally by the counter service
+        from app.services.counter_service import get_user_counts
+        counts = get_user_counts(db)
         
         return {
-            "total_beta_users": total_users,
-            "users_last_24h": recent_users,
-            "users_last_week": weekly_users,
+            "total_beta_users": counts["non_admin_users"],
+            "users_last_24h": counts["non_admin_signups_24h"],
+            "users_last_week": counts["non_admin_signups_7d"],
             "status": "active"
         }
         
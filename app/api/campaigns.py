@@ -348,7 +348,7 @@ def preview_campaign(campaign_type: str, admin=Depends(get_current_admin)):
         dict: Campaign preview
     """
     try:
-        from app.services.email_campaign_service import EMAIL_TEMPLATES
+        from app.services.email_campaign_service import EMAIL_TEMPLATES, get_campaign_template
 
         if campaign_type not in EMAIL_TEMPLATES:
             raise HTTPException(
@@ -359,7 +359,9 @@ def preview_campaign(campaign_type: str, admin=Depends(get_current_admin)):
         template = EMAIL_TEMPLATES[campaign_type]
 
         # Preview with sample data
-        sample_body = template["template"].format(name="[User Name]")
+        compiled = get_campaign_template(campaign_type)
+        sample_body = compiled.render_text(name="[User Name]")
+        sample_html = compiled.render_html(name="[User Name]")
 
         is_past = is_campaign_in_past(campaign_type) if campaign_type != "welcome" else False
 
@@ -367,6 +369,7 @@ def preview_campaign(campaign_type: str, admin=Depends(get_current_admin)):
             "campaign_type": campaign_type,
             "subject": template["subject"],
             "body": sample_body,
+            "html_body": sample_html,
             "schedule": str(template["schedule"]),
             "is_past": is_past,
             "is_future": not is_past,
@@ -1,7 +1,9 @@
 import logging
 from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
 from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import and_, or_, func
 from typing import Optional, List
 from datetime import datetime, timedelta, timezone
@@ -9,10 +11,13 @@ import csv
 import json
 import io
 
-from app.core.dependencies import get_db
+from app.core.dependencies import get_db, get_async_db
 from app.core.security import get_current_admin, verify_access_token
 from app.models.feedback import Feedback
 from app.models.user import User
+from app.services.feedback_search import apply_feedback_search
+from app.services import feedback_stats_service
+from app.utils.pagination import InvalidCursor, cached_count, keyset_page, next_cursor_for
 from app.schemas.feedback import (
     FeedbackCreate, FeedbackResponse, FeedbackListResponse, 
     FeedbackStatsResponse, FeedbackSubmitResponse, FeedbackFilters,
@@ -26,7 +31,7 @@ logger = logging.getLogger(__name__)
 async def submit_feedback(
     feedback_data: FeedbackCreate,
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Submit feedback survey response.
@@ -74,8 +79,9 @@ async def submit_feedback(
         )
         
         db.add(feedback)
-        db.commit()
-        db.refresh(feedback)
+        await db.commit()
+        await db.refresh(feedback)
+        await run_in_threadpool(feedback_stats_service.record_feedback_submitted, feedback)
         
         logger.info(f"Feedback submitted successfully. ID: {feedback.id}, User ID: {user_id}, IP: {client_ip}")
         
@@ -89,7 +95,7 @@ async def submit_feedback(
         raise
     except Exception as e:
         logger.error(f"Error submitting feedback: {str(e)}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to submit feedback. Please try again later."
@@ -106,27 +112,26 @@ async def get_feedback_list(
     time_consuming_part: Optional[str] = Query(None),
     start_date: Optional[datetime] = Query(None),
     end_date: Optional[datetime] = Query(None),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page; replaces page"),
+    include_total: bool = Query(True, description="Include the (cached, in cursor mode) total count"),
     db: Session = Depends(get_db),
     current_admin = Depends(get_current_admin)
 ):
     """
     Get paginated list of feedback responses (admin only).
+
+    Deep pages can be fetched with the opaque next_cursor of the previous
+    page (keyset on submitted_at, id) instead of page. Searches are ordered
+    by relevance and only paginate by page.
     """
     try:
         # Build query
         query = db.query(Feedback).join(User, Feedback.user_id == User.id, isouter=True)
         
-        # Apply filters
+        # Apply filters; full-text search when available, ordered by relevance
+        relevance = None
         if search:
-            search_filter = or_(
-                Feedback.monetization_considerations.ilike(f"%{search}%"),
-                Feedback.professional_legacy.ilike(f"%{search}%"),
-                Feedback.platform_impact.ilike(f"%{search}%"),
-                Feedback.biggest_hurdle_other.ilike(f"%{search}%"),
-                User.name.ilike(f"%{search}%"),
-                User.email.ilike(f"%{search}%")
-            )
-            query = query.filter(search_filter)
+            query, relevance = apply_feedback_search(db, query, search)
         
         if biggest_hurdle:
             query = query.filter(Feedback.biggest_hurdle == biggest_hurdle)
@@ -146,12 +151,38 @@ async def get_feedback_list(
         if end_date:
             query = query.filter(Feedback.submitted_at <= end_date)
         
-        # Get total count
-        total = query.count()
-        
-        # Apply pagination
-        offset = (page - 1) * page_size
-        feedback_list = query.order_by(Feedback.submitted_at.desc()).offset(offset).limit(page_size).all()
+        key_of = lambda feedback: (feedback.submitted_at, feedback.id)
+        if cursor:
+            if relevance is not None:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Cursor pagination is not available for search results"
+                )
+            feedback_list, next_cursor = keyset_page(
+                query, [(Feedback.submitted_at, True), (Feedback.id, True)], page_size, cursor, key_of
+            )
+            pagination = {"page_size": page_size}
+            if include_total:
+                total = cached_count(query)
+                pagination.update(total=total, total_pages=(total + page_size - 1) // page_size)
+        else:
+            # Get total count
+            total = query.count()
+
+            # Apply pagination
+            offset = (page - 1) * page_size
+            if relevance is None:
+                feedback_list = query.order_by(Feedback.submitted_at.desc(), Feedback.id.desc()).offset(offset).limit(page_size).all()
+                next_cursor = next_cursor_for(feedback_list, page_size, key_of, total, offset)
+            else:
+                feedback_list = query.order_by(relevance.desc(), Feedback.submitted_at.desc()).offset(offset).limit(page_size).all()
+                next_cursor = None
+            pagination = {
+                "page": page,
+                "page_size": page_size,
+                "total": total,
+                "total_pages": (total + page_size - 1) // page_size
+            }
         
         # Convert to response format
         feedback_responses = []
@@ -179,14 +210,14 @@ async def get_feedback_list(
         
         return FeedbackListResponse(
             feedback=feedback_responses,
-            pagination={
-                "page": page,
-                "page_size": page_size,
-                "total": total,
-                "total_pages": (total + page_size - 1) // page_size
-            }
+            pagination=pagination,
+            next_cursor=next_cursor
         )
         
+    except HTTPException:
+        raise
+    except InvalidCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         logger.error(f"Error fetching feedback list: {str(e)}")
         raise HTTPException(
@@ -196,64 +227,30 @@ async def get_feedback_list(
 
 @router.get("/stats", response_model=FeedbackStatsResponse)
 async def get_feedback_stats(
+    fresh: bool = Query(False, description="Recompute from the database instead of the cached snapshot"),
     db: Session = Depends(get_db),
     current_admin = Depends(get_current_admin)
 ):
     """
     Get feedback statistics and analytics (admin only).
+
+    Served from a cached snapshot kept current on every submission
+    (see feedback_stats_service); fresh=true recomputes it.
     """
     try:
-        # Get total responses
-        total_responses = db.query(func.count(Feedback.id)).scalar()
-        
-        # Get breakdown by categories
-        hurdle_stats = db.query(
-            Feedback.biggest_hurdle,
-            func.count(Feedback.id)
-        ).group_by(Feedback.biggest_hurdle).all()
-        
-        motivation_stats = db.query(
-            Feedback.primary_motivation,
-            func.count(Feedback.id)
-        ).group_by(Feedback.primary_motivation).all()
-        
-        time_stats = db.query(
-            Feedback.time_consuming_part,
-            func.count(Feedback.id)
-        ).group_by(Feedback.time_consuming_part).all()
-        
-        fear_stats = db.query(
-            Feedback.professional_fear,
-            func.count(Feedback.id)
-        ).group_by(Feedback.professional_fear).all()
-        
-        # Get recent activity
-        now = datetime.now(timezone.utc)
-        last_7_days = db.query(func.count(Feedback.id)).filter(
-            Feedback.submitted_at >= now - timedelta(days=7)
-        ).scalar()
-        
-        last_30_days = db.query(func.count(Feedback.id)).filter(
-            Feedback.submitted_at >= now - timedelta(days=30)
-        ).scalar()
-        
-        # Get date range
-        date_range = db.query(
-            func.min(Feedback.submitted_at),
-            func.max(Feedback.submitted_at)
-        ).first()
-        
+        stats = feedback_stats_service.get_feedback_stats(db, fresh=fresh)
+
         return FeedbackStatsResponse(
-            total_responses=total_responses or 0,
-            responses_by_hurdle={str(hurdle): count for hurdle, count in hurdle_stats},
-            responses_by_motivation={str(motivation): count for motivation, count in motivation_stats},
-            responses_by_time_consuming_part={str(part): count for part, count in time_stats},
-            responses_by_fear={str(fear): count for fear, count in fear_stats},
-            recent_responses=last_7_days or 0,
-            responses_last_7_days=last_7_days or 0,
-            responses_last_30_days=last_30_days or 0,
-            first_response=date_range[0] if date_range[0] else None,
-            latest_response=date_range[1] if date_range[1] else None
+            total_responses=stats["total"],
+            responses_by_hurdle={str(hurdle): count for hurdle, count in stats["by_hurdle"].items()},
+            responses_by_motivation={str(motivation): count for motivation, count in stats["by_motivation"].items()},
+            responses_by_time_consuming_part={str(part): count for part, count in stats["by_time_consuming_part"].items()},
+            responses_by_fear={str(fear): count for fear, count in stats["by_fear"].items()},
+            recent_responses=stats["last_7_days"],
+            responses_last_7_days=stats["last_7_days"],
+            responses_last_30_days=stats["last_30_days"],
+            first_response=stats["first"],
+            latest_response=stats["latest"]
         )
         
     except Exception as e:
@@ -263,6 +260,117 @@ async def get_feedback_stats(
             detail="Failed to fetch feedback statistics"
         )
 
+EXPORT_CSV_HEADERS = [
+    'ID', 'User ID', 'Email', 'Name', 'User Name', 'User Email', 'IP Address',
+    'Biggest Hurdle', 'Biggest Hurdle (Text)', 'Biggest Hurdle Other',
+    'Primary Motivation', 'Primary Motivation (Text)',
+    'Time Consuming Part', 'Time Consuming Part (Text)',
+    'Professional Fear', 'Professional Fear (Text)',
+    'Monetization Considerations', 'Professional Legacy', 'Platform Impact',
+    'Submitted At', 'Updated At'
+]
+
+# Rows fetched per round trip while streaming an export
+EXPORT_BATCH_SIZE = 500
+# Bytes buffered before a chunk is written to the client
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+def _export_csv_row(feedback: Feedback, user_name: Optional[str], user_email: Optional[str]) -> list:
+    return [
+        feedback.id,
+        feedback.user_id or '',
+        feedback.email or '',
+        feedback.name or '',
+        user_name or '',
+        user_email or '',
+        feedback.ip_address or '',
+        feedback.biggest_hurdle.value,
+        HURDLE_LABELS.get(feedback.biggest_hurdle.value, ''),
+        feedback.biggest_hurdle_other or '',
+        feedback.primary_motivation.value if feedback.primary_motivation else '',
+        MOTIVATION_LABELS.get(feedback.primary_motivation.value, '') if feedback.primary_motivation else '',
+        feedback.time_consuming_part.value if feedback.time_consuming_part else '',
+        TIME_CONSUMING_LABELS.get(feedback.time_consuming_part.value, '') if feedback.time_consuming_part else '',
+        feedback.professional_fear.value,
+        FEAR_LABELS.get(feedback.professional_fear.value, ''),
+        feedback.monetization_considerations or '',
+        feedback.professional_legacy or '',
+        feedback.platform_impact,
+        feedback.submitted_at.isoformat(),
+        feedback.updated_at.isoformat()
+    ]
+
+def _export_record(feedback: Feedback, user_name: Optional[str], user_email: Optional[str]) -> dict:
+    return {
+        'id': feedback.id,
+        'user_id': feedback.user_id,
+        'email': feedback.email,
+        'name': feedback.name,
+        'user_name': user_name,
+        'user_email': user_email,
+        'ip_address': feedback.ip_address,
+        'biggest_hurdle': {
+            'value': feedback.biggest_hurdle.value,
+            'label': HURDLE_LABELS.get(feedback.biggest_hurdle.value, '')
+        },
+        'biggest_hurdle_other': feedback.biggest_hurdle_other,
+        'primary_motivation': {
+            'value': feedback.primary_motivation.value,
+            'label': MOTIVATION_LABELS.get(feedback.primary_motivation.value, '')
+        } if feedback.primary_motivation else None,
+        'time_consuming_part': {
+            'value': feedback.time_consuming_part.value,
+            'label': TIME_CONSUMING_LABELS.get(feedback.time_consuming_part.value, '')
+        } if feedback.time_consuming_part else None,
+        'professional_fear': {
+            'value': feedback.professional_fear.value,
+            'label': FEAR_LABELS.get(feedback.professional_fear.value, '')
+        },
+        'monetization_considerations': feedback.monetization_considerations,
+        'professional_legacy': feedback.professional_legacy,
+        'platform_impact': feedback.platform_impact,
+        'submitted_at': feedback.submitted_at.isoformat(),
+        'updated_at': feedback.updated_at.isoformat()
+    }
+
+def _stream_export(rows, format: ExportFormat):
+    """
+    Encode export rows as they are fetched, in chunks of ~EXPORT_CHUNK_BYTES.
+
+    Only one fetch batch and one output chunk are held in memory at a time.
+    Headers are already sent when this runs, so errors can only be logged and
+    end the response early.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    try:
+        if format == ExportFormat.CSV:
+            writer.writerow(EXPORT_CSV_HEADERS)
+        elif format == ExportFormat.JSON:
+            buffer.write("[")
+
+        for index, (feedback, user_name, user_email) in enumerate(rows):
+            if format == ExportFormat.CSV:
+                writer.writerow(_export_csv_row(feedback, user_name, user_email))
+            elif format == ExportFormat.NDJSON:
+                buffer.write(json.dumps(_export_record(feedback, user_name, user_email)))
+                buffer.write("\n")
+            else:
+                buffer.write(",\n" if index else "\n")
+                buffer.write(json.dumps(_export_record(feedback, user_name, user_email), indent=2))
+
+            if buffer.tell() >= EXPORT_CHUNK_BYTES:
+                yield buffer.getvalue().encode('utf-8')
+                buffer.seek(0)
+                buffer.truncate()
+
+        if format == ExportFormat.JSON:
+            buffer.write("\n]")
+        yield buffer.getvalue().encode('utf-8')
+    except Exception as e:
+        logger.error(f"Error streaming feedback export: {str(e)}")
+        raise
+
 @router.get("/export")
 async def export_feedback(
     format: ExportFormat = Query(ExportFormat.CSV),
@@ -277,23 +385,21 @@ async def export_feedback(
     current_admin = Depends(get_current_admin)
 ):
     """
-    Export feedback data in CSV or JSON format (admin only).
+    Export feedback data in CSV, JSON or NDJSON format (admin only).
+
+    Rows are streamed from the database in batches of EXPORT_BATCH_SIZE
+    and encoded as they arrive, so memory use does not grow with the
+    number of feedback entries.
     """
     try:
-        # Build query (same as get_feedback_list)
-        query = db.query(Feedback).join(User, Feedback.user_id == User.id, isouter=True)
+        # Build query (same filters as get_feedback_list); user columns are
+        # selected directly to avoid a lazy load per row
+        query = db.query(Feedback, User.name, User.email).join(User, Feedback.user_id == User.id, isouter=True)
 
-        # Apply filters
+        # Apply filters; full-text search when available, ordered by relevance
+        relevance = None
         if search:
-            search_filter = or_(
-                Feedback.monetization_considerations.ilike(f"%{search}%"),
-                Feedback.professional_legacy.ilike(f"%{search}%"),
-                Feedback.platform_impact.ilike(f"%{search}%"),
-                Feedback.biggest_hurdle_other.ilike(f"%{search}%"),
-                User.name.ilike(f"%{search}%"),
-                User.email.ilike(f"%{search}%")
-            )
-            query = query.filter(search_filter)
+            query, relevance = apply_feedback_search(db, query, search)
 
         if biggest_hurdle:
             query = query.filter(Feedback.biggest_hurdle == biggest_hurdle)
@@ -313,104 +419,21 @@ async def export_feedback(
         if end_date:
             query = query.filter(Feedback.submitted_at <= end_date)
 
-        # Get all feedback data
-        feedback_list = query.order_by(Feedback.submitted_at.desc()).all()
-
-        if format == ExportFormat.CSV:
-            # Create CSV
-            output = io.StringIO()
-            writer = csv.writer(output)
-
-            # Write headers
-            headers = [
-                'ID', 'User ID', 'Email', 'Name', 'User Name', 'User Email', 'IP Address',
-                'Biggest Hurdle', 'Biggest Hurdle (Text)', 'Biggest Hurdle Other',
-                'Primary Motivation', 'Primary Motivation (Text)',
-                'Time Consuming Part', 'Time Consuming Part (Text)',
-                'Professional Fear', 'Professional Fear (Text)',
-                'Monetization Considerations', 'Professional Legacy', 'Platform Impact',
-                'Submitted At', 'Updated At'
-            ]
-            writer.writerow(headers)
-
-            # Write data
-            for feedback in feedback_list:
-                row = [
-                    feedback.id,
-                    feedback.user_id or '',
-                    feedback.email or '',
-                    feedback.name or '',
-                    feedback.user.name if feedback.user else '',
-                    feedback.user.email if feedback.user else '',
-                    feedback.ip_address or '',
-                    feedback.biggest_hurdle.value,
-                    HURDLE_LABELS.get(feedback.biggest_hurdle.value, ''),
-                    feedback.biggest_hurdle_other or '',
-                    feedback.primary_motivation.value if feedback.primary_motivation else '',
-                    MOTIVATION_LABELS.get(feedback.primary_motivation.value, '') if feedback.primary_motivation else '',
-                    feedback.time_consuming_part.value if feedback.time_consuming_part else '',
-                    TIME_CONSUMING_LABELS.get(feedback.time_consuming_part.value, '') if feedback.time_consuming_part else '',
-                    feedback.professional_fear.value,
-                    FEAR_LABELS.get(feedback.professional_fear.value, ''),
-                    feedback.monetization_considerations or '',
-                    feedback.professional_legacy or '',
-                    feedback.platform_impact,
-                    feedback.submitted_at.isoformat(),
-                    feedback.updated_at.isoformat()
-                ]
-                writer.writerow(row)
+        ordering = [Feedback.submitted_at.desc()] if relevance is None else [relevance.desc(), Feedback.submitted_at.desc()]
+        rows = query.order_by(*ordering).yield_per(EXPORT_BATCH_SIZE)
 
-            output.seek(0)
+        media_types = {
+            ExportFormat.CSV: "text/csv",
+            ExportFormat.JSON: "application/json",
+            ExportFormat.NDJSON: "application/x-ndjson"
+        }
+        filename = f"feedback_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{format.value}"
 
-            return StreamingResponse(
-                io.BytesIO(output.getvalue().encode('utf-8')),
-                media_type="text/csv",
-                headers={"Content-Disposition": f"attachment; filename=feedback_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"}
-            )
-
-        else:  # JSON format
-            export_data = []
-            for feedback in feedback_list:
-                data = {
-                    'id': feedback.id,
-                    'user_id': feedback.user_id,
-                    'email': feedback.email,
-                    'name': feedback.name,
-                    'user_name': feedback.user.name if feedback.user else None,
-                    'user_email': feedback.user.email if feedback.user else None,
-                    'ip_address': feedback.ip_address,
-                    'biggest_hurdle': {
-                        'value': feedback.biggest_hurdle.value,
-                        'label': HURDLE_LABELS.get(feedback.biggest_hurdle.value, '')
-                    },
-                    'biggest_hurdle_other': feedback.biggest_hurdle_other,
-                    'primary_motivation': {
-                        'value': feedback.primary_motivation.value if feedback.primary_motivation else None,
-                        'label': MOTIVATION_LABELS.get(feedback.primary_motivation.value, '') if feedback.primary_motivation else None
-                    } if feedback.primary_motivation else None,
-                    'time_consuming_part': {
-                        'value': feedback.time_consuming_part.value if feedback.time_consuming_part else None,
-                        'label': TIME_CONSUMING_LABELS.get(feedback.time_consuming_part.value, '') if feedback.time_consuming_part else None
-                    } if feedback.time_consuming_part else None,
-                    'professional_fear': {
-                        'value': feedback.professional_fear.value,
-                        'label': FEAR_LABELS.get(feedback.professional_fear.value, '')
-                    },
-                    'monetization_considerations': feedback.monetization_considerations,
-                    'professional_legacy': feedback.professional_legacy,
-                    'platform_impact': feedback.platform_impact,
-                    'submitted_at': feedback.submitted_at.isoformat(),
-                    'updated_at': feedback.updated_at.isoformat()
-                }
-                export_data.append(data)
-
-            json_data = json.dumps(export_data, indent=2)
-
-            return StreamingResponse(
-                io.BytesIO(json_data.encode('utf-8')),
-                media_type="application/json",
-                headers={"Content-Disposition": f"attachment; filename=feedback_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"}
-            )
+        return StreamingResponse(
+            _stream_export(rows, format),
+            media_type=media_types[format],
+            headers={"Content-Disposition": f"attachment; filename={filename}"}
+        )
 
     except Exception as e:
         logger.error(f"Error exporting feedback: {str(e)}")
@@ -1,52 +1,42 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response, Header
 from sqlalchemy.orm import Session
-from app.core.dependencies import get_db
-from app.schemas.leaderboard import LeaderboardResponse, LeaderboardUser, AroundMeResponse, AroundMeUser, TopPerformersResponse, TopPerformer
-from app.services.leaderboard_service import get_leaderboard, get_user_rank
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.dependencies import get_db, get_async_db
+from app.schemas.leaderboard import LeaderboardResponse, AroundMeResponse, AroundMeUser, TopPerformersResponse, TopPerformer
+from app.services.leaderboard_service import get_leaderboard_page_async, get_around_me, get_top_performers
 from app.core.security import verify_access_token
 from fastapi.security import OAuth2PasswordBearer
 from app.models.user import User
-from typing import List
+from typing import Optional
 
 router = APIRouter(prefix="/leaderboard", tags=["leaderboard"])
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 @router.get("", response_model=LeaderboardResponse)
-def leaderboard(page: int = Query(1, ge=1), limit: int = Query(50, ge=1, le=100), db: Session = Depends(get_db)):
+async def leaderboard(
+    page: int = Query(1, ge=1),
+    limit: int = Query(50, ge=1, le=100),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db)
+):
     """
     Get public leaderboard with pagination.
 
     This is a public endpoint that doesn't require authentication.
+    The pre-rendered body is returned as-is with an ETag; clients that send
+    a matching If-None-Match get 304 Not Modified without a body.
 
     Args:
         page: Page number (starts from 1)
         limit: Number of users per page (max 100)
+        if_none_match: ETag from a previous response
         db: Database session
 
     Returns:
         LeaderboardResponse: Paginated leaderboard data
     """
     try:
-        # Get leaderboard data
-        leaderboard_data = get_leaderboard(db, page, limit)
-        total_users = db.query(User).count()
-        total_pages = (total_users + limit - 1) // limit
-
-        return LeaderboardResponse(
-            leaderboard=[LeaderboardUser(**u) for u in leaderboard_data],
-            pagination={
-                "page": page,
-                "limit": limit,
-                "total": total_users,
-                "pages": total_pages
-            },
-            metadata={
-                "total_users": total_users,
-                "your_rank": None,  # No user context for public endpoint
-                "your_points": 0    # No user context for public endpoint
-            }
-        )
-
+        etag, body = await get_leaderboard_page_async(db, page, limit)
     except Exception as e:
         import logging
         logging.getLogger(__name__).error(f"Leaderboard failed: {e}")
@@ -55,25 +45,41 @@ def leaderboard(page: int = Query(1, ge=1), limit: int = Query(50, ge=1, le=100)
             detail="Failed to retrieve leaderboard"
         )
 
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if if_none_match and (if_none_match.strip() == "*" or etag in [t.strip() for t in if_none_match.split(",")]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
 @router.get("/around-me", response_model=AroundMeResponse)
-def leaderboard_around_me(range: int = 5, db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)):
+def leaderboard_around_me(range: int = Query(5, ge=0, le=50), db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)):
+    """
+    Get the users ranked around the current user.
+
+    Only the `range` users above and below the caller are loaded, so the
+    cost does not grow with the size of the users table.
+    """
     payload = verify_access_token(token)
     if not payload:
         raise HTTPException(status_code=401, detail="Invalid token")
-    users = db.query(User).order_by(User.total_points.desc()).all()
-    user_rank = get_user_rank(db, payload["user_id"])
-    idx = user_rank - 1 if user_rank else 0
-    start = max(0, idx - range)
-    end = min(len(users), idx + range + 1)
-    surrounding = [AroundMeUser(rank=i+1, name=u.name, points=u.total_points, is_current_user=(u.id==payload["user_id"])) for i, u in enumerate(users[start:end], start=start)]
-    user = db.query(User).filter(User.id == payload["user_id"]).first()
+    around = get_around_me(db, payload["user_id"], range)
+    if not around:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    user = around["user"]
+    user_rank = around["rank"]
+    total_users = around["total_users"]
+    surrounding = [
+        AroundMeUser(rank=rank, name=u.name, points=u.total_points, is_current_user=(u.id == user.id))
+        for rank, u in around["neighbours"]
+    ]
+    above = [u for rank, u in around["neighbours"] if user_rank and rank == user_rank - 1]
     return AroundMeResponse(
         surrounding_users=surrounding,
         your_stats={
-            "rank": user_rank,
-            "points": user.total_points if user else 0,
-            "points_to_next_rank": users[idx-1].total_points - user.total_points if idx > 0 else 0,
-            "percentile": 100.0 * (1 - (user_rank-1)/len(users)) if user_rank else 0
+            "rank": user_rank or 0,
+            "points": user.total_points,
+            "points_to_next_rank": max(0, above[0].total_points - user.total_points + 1) if above else 0,
+            "percentile": 100.0 * (1 - (user_rank - 1) / total_users) if user_rank and total_users else 0
         }
     )
 
@@ -97,31 +103,11 @@ def leaderboard_top_performers(
         TopPerformersResponse: Top performers data
     """
     try:
-        # For now, just return top N users (period logic can be added later)
-        users = db.query(User).order_by(User.total_points.desc()).limit(limit).all()
-
-        top_performers = []
-        for i, u in enumerate(users):
-            top_performers.append(TopPerformer(
-                rank=i+1,
-                user_id=u.id,
-                name=u.name,
-                points_gained=u.total_points,  # For now, same as total points
-                total_points=u.total_points,
-                growth_rate="0%"  # Placeholder for future implementation
-            ))
-
-        total_points = sum(u.total_points for u in users) if users else 0
-
+        result = get_top_performers(db, period, limit)
         return TopPerformersResponse(
-            period=period,
-            top_performers=top_performers,
-            period_stats={
-                "start_date": "",
-                "end_date": "",
-                "total_points_awarded": total_points,
-                "active_users": len(users)
-            }
+            period=result["period"],
+            top_performers=[TopPerformer(**performer) for performer in result["top_performers"]],
+            period_stats=result["period_stats"]
         )
 
     except Exception as e:
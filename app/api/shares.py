@@ -1,23 +1,26 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query, Path
 from sqlalchemy.orm import Session
-from app.core.dependencies import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.dependencies import get_db, get_async_db
 from app.schemas.share import ShareCreate, ShareResponse, ShareHistoryResponse, ShareHistoryItem, ShareAnalyticsResponse
-from app.services.share_service import log_share_event
+from app.services.share_service import log_share_event_async
 from app.core.security import verify_access_token
 from fastapi.security import OAuth2PasswordBearer
 from app.models.share import ShareEvent, PlatformEnum
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 from app.utils.monitoring import inc_share_event
+from app.utils.pagination import InvalidCursor, cached_count, keyset_page, next_cursor_for
+from app.services.analytics_service import get_share_analytics, get_platform_aggregates
 
 router = APIRouter(prefix="/shares", tags=["shares"])
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 @router.post("/{platform}", response_model=ShareResponse, status_code=201)
-def share(
+async def share(
     platform: PlatformEnum = Path(..., description="Platform to share on (facebook, twitter, linkedin, instagram, whatsapp)"),
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Record a share event on the specified platform.
@@ -47,7 +50,7 @@ def share(
             )
 
         # Log share event
-        share, user, points = log_share_event(db, payload["user_id"], platform)
+        share, user, points = await log_share_event_async(db, payload["user_id"], platform)
 
         # Update metrics
         inc_share_event()
@@ -65,9 +68,10 @@ def share(
                 message="You have already shared on this platform. No additional points awarded."
             )
 
-        # Get updated rank information
+        # Live rank from the rank index (the stored rank may still be awaiting the rank refresher)
         from app.services.ranking_service import get_user_rank_info
-        rank_info = get_user_rank_info(db, user.id)
+        rank_info = await db.run_sync(get_user_rank_info, user.id)
+        new_rank = rank_info.get("current_rank", user.current_rank)
 
         # Return successful share response with rank information
         return ShareResponse(
@@ -76,9 +80,9 @@ def share(
             platform=platform.value,
             points_earned=points,
             total_points=user.total_points,
-            new_rank=user.current_rank,
+            new_rank=new_rank,
             timestamp=share.created_at,
-            message=f"Share recorded successfully! You earned {points} points. Current rank: {user.current_rank}"
+            message=f"Share recorded successfully! You earned {points} points. Current rank: {new_rank}"
         )
 
     except HTTPException:
@@ -99,22 +103,42 @@ def share_history(
     db: Session = Depends(get_db),
     page: int = 1,
     limit: int = 20,
-    platform: PlatformEnum = Query(None, description="Filter by platform")
+    platform: PlatformEnum = Query(None, description="Filter by platform"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page; replaces page"),
+    include_total: bool = Query(True, description="Include the (cached, in cursor mode) total count")
 ):
-    """Get share history for the current user, optionally filtered by platform."""
+    """
+    Get share history for the current user, optionally filtered by platform.
+
+    Pages are selected with page/limit (OFFSET) or, for deep history, with
+    the opaque next_cursor returned by the previous page (keyset on
+    created_at, id).
+    """
     payload = verify_access_token(token)
     if not payload:
         raise HTTPException(status_code=401, detail="Invalid token")
     q = db.query(ShareEvent).filter(ShareEvent.user_id == payload["user_id"])
     if platform:
         q = q.filter(ShareEvent.platform == platform)
-    total = q.count()
-    shares = q.order_by(ShareEvent.created_at.desc()).offset((page-1)*limit).limit(limit).all()
+
+    key_of = lambda s: (s.created_at, s.id)
+    if cursor:
+        try:
+            shares, next_cursor = keyset_page(q, [(ShareEvent.created_at, True), (ShareEvent.id, True)], limit, cursor, key_of)
+        except InvalidCursor as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        pagination = {"limit": limit}
+        if include_total:
+            total = cached_count(q)
+            pagination.update(total=total, pages=(total+limit-1)//limit)
+    else:
+        total = q.count()
+        shares = q.order_by(ShareEvent.created_at.desc(), ShareEvent.id.desc()).offset((page-1)*limit).limit(limit).all()
+        next_cursor = next_cursor_for(shares, limit, key_of, total, (page-1)*limit)
+        pagination = {"page": page, "limit": limit, "total": total, "pages": (total+limit-1)//limit}
+
     items = [ShareHistoryItem(share_id=s.id, platform=s.platform.value, points_earned=s.points_earned, timestamp=s.created_at) for s in shares]
-    return ShareHistoryResponse(
-        shares=items,
-        pagination={"page": page, "limit": limit, "total": total, "pages": (total+limit-1)//limit}
-    )
+    return ShareHistoryResponse(shares=items, pagination=pagination, next_cursor=next_cursor)
 
 @router.get("/analytics", response_model=ShareAnalyticsResponse)
 def share_analytics(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
@@ -146,13 +170,13 @@ def share_analytics(token: str = Depends(oauth2_scheme), db: Session = Depends(g
         total_shares = q.count()
 
         # Calculate points breakdown by platform
+        aggregates = get_platform_aggregates(db, user_id=payload["user_id"])
         points_breakdown = {}
         for platform in PlatformEnum:
-            p_q = q.filter(ShareEvent.platform == platform.value)  # Use platform.value for comparison
-            shares = p_q.all()
+            stats = aggregates.get(platform.value, {})
             points_breakdown[platform.value] = {
-                "shares": len(shares),
-                "points": sum(s.points_earned for s in shares)
+                "shares": stats.get("shares", 0),
+                "points": stats.get("points", 0)
             }
 
         # Get recent activity
@@ -192,9 +216,6 @@ def share_analytics_enhanced(token: str = Depends(oauth2_scheme), db: Session =
     This endpoint matches the frontend ShareAnalyticsEnhanced interface.
     """
     try:
-        from sqlalchemy import func, desc
-        from datetime import datetime, timedelta
-
         # Verify access token
         payload = verify_access_token(token)
         if not payload:
@@ -204,76 +225,7 @@ def share_analytics_enhanced(token: str = Depends(oauth2_scheme), db: Session =
                 headers={"WWW-Authenticate": "Bearer"}
             )
 
-        user_id = payload["user_id"]
-
-        # Get all user's share events
-        all_shares = db.query(ShareEvent).filter(ShareEvent.user_id == user_id).all()
-        total_shares = len(all_shares)
-        total_points = sum(s.points_earned for s in all_shares)
-
-        # Platform breakdown with enhanced data
-        platform_breakdown = {}
-        active_platforms = 0
-
-        for platform in PlatformEnum:
-            platform_shares = [s for s in all_shares if s.platform == platform]
-            shares_count = len(platform_shares)
-            points_sum = sum(s.points_earned for s in platform_shares)
-
-            if shares_count > 0:
-                active_platforms += 1
-                first_share = min(platform_shares, key=lambda x: x.created_at)
-                last_share = max(platform_shares, key=lambda x: x.created_at)
-
-                platform_breakdown[platform.value] = {
-                    "shares": shares_count,
-                    "points": points_sum,
-                    "percentage": round((shares_count / total_shares * 100), 1) if total_shares > 0 else 0,
-                    "first_share_date": first_share.created_at.isoformat(),
-                    "last_share_date": last_share.created_at.isoformat()
-                }
-            else:
-                platform_breakdown[platform.value] = {
-                    "shares": 0,
-                    "points": 0,
-                    "percentage": 0
-                }
-
-        # Timeline data (last 30 days)
-        timeline = []
-        for i in range(30):
-            date = datetime.utcnow() - timedelta(days=i)
-            day_start = date.replace(hour=0, minute=0, second=0, microsecond=0)
-            day_end = day_start + timedelta(days=1)
-
-            day_shares = [s for s in all_shares if day_start <= s.created_at < day_end]
-            day_shares_count = len(day_shares)
-            day_points = sum(s.points_earned for s in day_shares)
-
-            timeline.append({
-                "date": day_start.isoformat(),
-                "shares": day_shares_count,
-                "points": day_points
-            })
-
-        # Reverse to get chronological order
-        timeline.reverse()
-
-        # Summary
-        average_points_per_share = round(total_points / total_shares, 2) if total_shares > 0 else 0
-
-        summary = {
-            "total_shares": total_shares,
-            "total_points": total_points,
-            "active_platforms": active_platforms,
-            "average_points_per_share": average_points_per_share
-        }
-
-        return {
-            "platform_breakdown": platform_breakdown,
-            "timeline": timeline,
-            "summary": summary
-        }
+        return get_share_analytics(db, user_id=payload["user_id"])
 
     except HTTPException:
         raise
@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Response, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from app.core.dependencies import get_db
 from app.schemas.user import UserResponse, UserProfileUpdate
@@ -8,6 +9,8 @@ from fastapi.security import OAuth2PasswordBearer
 from app.models.user import User
 import csv
 import io
+import json
+import zlib
 
 router = APIRouter(prefix="/users", tags=["users"])
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
@@ -45,52 +48,124 @@ def update_profile(profile_in: UserProfileUpdate, token: str = Depends(oauth2_sc
         is_admin=user.is_admin
     )
 
+# Columns selected for listings and exports; rows are plain tuples, no ORM objects
+USER_EXPORT_COLUMNS = ["id", "name", "email", "total_points", "shares_count", "created_at", "is_admin"]
+# Rows fetched per round trip while streaming
+USER_EXPORT_BATCH_SIZE = 1000
+# Bytes buffered before a chunk is written to the client
+USER_EXPORT_CHUNK_BYTES = 64 * 1024
+
+def _user_rows(db: Session, min_points: int = None):
+    """Iterate projected user rows in id order, streamed in batches."""
+    query = db.query(*(getattr(User, column) for column in USER_EXPORT_COLUMNS))
+    if min_points is not None:
+        query = query.filter(User.total_points >= min_points)
+    return query.order_by(User.id).yield_per(USER_EXPORT_BATCH_SIZE)
+
+def _chunks(pieces):
+    """Join small string pieces into ~USER_EXPORT_CHUNK_BYTES encoded chunks."""
+    buffer = []
+    size = 0
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= USER_EXPORT_CHUNK_BYTES:
+            yield "".join(buffer).encode("utf-8")
+            buffer = []
+            size = 0
+    if buffer:
+        yield "".join(buffer).encode("utf-8")
+
+def _gzip_chunks(chunks):
+    """Compress a chunk stream on the fly."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31: gzip container
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+def _csv_pieces(rows):
+    line = io.StringIO()
+    writer = csv.writer(line)
+    writer.writerow(USER_EXPORT_COLUMNS)
+    for row in rows:
+        writer.writerow(row)
+        yield line.getvalue()
+        line.seek(0)
+        line.truncate()
+    yield line.getvalue()
+
+def _export_record(row) -> dict:
+    record = dict(zip(USER_EXPORT_COLUMNS, row))
+    record["created_at"] = str(record["created_at"])
+    return record
+
+def _ndjson_pieces(rows):
+    for row in rows:
+        yield json.dumps(_export_record(row)) + "\n"
+
+def _json_array_pieces(items):
+    yield "["
+    for index, item in enumerate(items):
+        yield "," + item if index else item
+    yield "]"
+
 @router.get("/view", response_model=list[UserResponse])
 def view_all_users(admin=Depends(get_current_admin), db: Session = Depends(get_db)):
-    users = db.query(User).all()
-    return [UserResponse(
-        user_id=u.id,
-        name=u.name,
-        email=u.email,
-        created_at=u.created_at,
-        total_points=u.total_points,
-        shares_count=u.shares_count,
-        current_rank=None,
-        is_admin=u.is_admin
-    ) for u in users]
+    """
+    List all users (admin only).
+
+    The JSON array is streamed as rows are fetched rather than built in memory.
+    """
+    def items():
+        for user_id, name, email, total_points, shares_count, created_at, is_admin in _user_rows(db):
+            yield UserResponse(
+                user_id=user_id,
+                name=name,
+                email=email,
+                created_at=created_at,
+                total_points=total_points,
+                shares_count=shares_count,
+                current_rank=None,
+                is_admin=is_admin
+            ).model_dump_json()
+
+    return StreamingResponse(_chunks(_json_array_pieces(items())), media_type="application/json")
 
 @router.get("/export")
 def export_users(
     admin=Depends(get_current_admin),
     db: Session = Depends(get_db),
-    format: str = Query("csv", enum=["csv", "json"]),
-    min_points: int = Query(0)
+    format: str = Query("csv", enum=["csv", "json", "ndjson", "jsonl"]),
+    min_points: int = Query(0),
+    gzip: bool = Query(False, description="Compress the download with gzip")
 ):
-    users = db.query(User).filter(User.total_points >= min_points).all()
-    if format == "json":
-        data = [
-            {
-                "id": u.id,
-                "name": u.name,
-                "email": u.email,
-                "total_points": u.total_points,
-                "shares_count": u.shares_count,
-                "created_at": str(u.created_at),
-                "is_admin": u.is_admin
-            }
-            for u in users
-        ]
-        from fastapi.responses import JSONResponse
-        return JSONResponse(content=data)
-    # Default: CSV
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(["id", "name", "email", "total_points", "shares_count", "created_at", "is_admin"])
-    for u in users:
-        writer.writerow([u.id, u.name, u.email, u.total_points, u.shares_count, u.created_at, u.is_admin])
-    output.seek(0)
-    return Response(
-        content=output.read(),
-        media_type="text/csv",
-        headers={"Content-Disposition": "attachment; filename=users.csv"}
-    ) 
\ No newline at end of file
+    """
+    Export users (admin only) as CSV, a JSON array, or NDJSON/JSONL.
+
+    Only the exported columns are selected and rows are streamed in batches
+    of USER_EXPORT_BATCH_SIZE, so memory use does not grow with the number
+    of users. With gzip=true the stream is compressed on the fly.
+    """
+    rows = _user_rows(db, min_points)
+    if format == "csv":
+        pieces, media_type = _csv_pieces(rows), "text/csv"
+    elif format == "json":
+        pieces = _json_array_pieces(json.dumps(_export_record(row)) for row in rows)
+        media_type = "application/json"
+    else:
+        pieces, media_type = _ndjson_pieces(rows), "application/x-ndjson"
+
+    chunks = _chunks(pieces)
+    filename = f"users.{format}"
+    if gzip:
+        chunks = _gzip_chunks(chunks)
+        filename += ".gz"
+        media_type = "application/gzip"
+
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
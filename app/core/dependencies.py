@@ -1,11 +1,27 @@
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from app.core.config import settings
+from app.utils.monitoring import InstrumentedQueuePool, InstrumentedAsyncQueuePool, register_pool_metrics
 from diskcache import Cache
 
-engine = create_engine(settings.database_url, pool_pre_ping=True)
+POOL_OPTIONS = {
+    "pool_pre_ping": True,
+    "pool_size": settings.DB_POOL_SIZE,
+    "max_overflow": settings.DB_MAX_OVERFLOW,
+    "pool_recycle": settings.DB_POOL_RECYCLE,
+    "pool_timeout": settings.DB_POOL_TIMEOUT,
+}
+
+engine = create_engine(settings.database_url, poolclass=InstrumentedQueuePool, **POOL_OPTIONS)
+register_pool_metrics(engine, "sync")
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# The async engine is created on first use, so deployments without an
+# async driver installed only need it once an async endpoint is hit.
+async_engine = None
+AsyncSessionLocal = None
+
 cache = Cache(settings.CACHE_DIR)
 
 def get_db():
@@ -15,5 +31,22 @@ def get_db():
     finally:
         db.close()
 
+def get_async_sessionmaker() -> async_sessionmaker:
+    global async_engine, AsyncSessionLocal
+    if AsyncSessionLocal is None:
+        async_engine = create_async_engine(
+            settings.async_database_url,
+            poolclass=InstrumentedAsyncQueuePool,
+            **POOL_OPTIONS
+        )
+        register_pool_metrics(async_engine.sync_engine, "async")
+        # Objects stay usable after commit without an implicit (blocking) reload
+        AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    return AsyncSessionLocal
+
+async def get_async_db():
+    async with get_async_sessionmaker()() as db:
+        yield db
+
 def get_cache():
-    return cache 
\ No newline at end of file
+    return cache
@@ -1,5 +1,6 @@
 import os
 import logging
+import asyncio
 from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from app.api import auth, users, shares, leaderboard, admin, campaigns, feedback, beta
@@ -73,7 +74,7 @@ async def rate_limit_middleware(request: Request, call_next):
         return await call_next(request)
 
     # Skip rate limiting for health checks and metrics
-    if request.url.path in ["/health", "/metrics", "/docs", "/redoc", "/openapi.json"]:
+    if request.url.path in ["/health", "/health/pool", "/metrics", "/docs", "/redoc", "/openapi.json"]:
         return await call_next(request)
 
     try:
@@ -146,10 +147,67 @@ app.include_router(admin.router)
 app.include_router(campaigns.router)
 app.include_router(feedback.router)
 
+@app.on_event("startup")
+def load_rank_index_on_startup():
+    """Warm the in-memory leaderboard rank index for this worker."""
+    if not settings.RANK_INDEX_ENABLED:
+        return
+    try:
+        from app.core.dependencies import SessionLocal
+        from app.services.rank_index import load_rank_index
+        db = SessionLocal()
+        try:
+            load_rank_index(db)
+        finally:
+            db.close()
+    except Exception as e:
+        # The index loads lazily on first use if the database is not ready yet
+        logger.warning(f"Rank index not loaded at startup: {e}")
+
+@app.on_event("startup")
+async def start_rank_index_reloader():
+    """Reload this worker's rank index in the background instead of inside requests."""
+    if settings.RANK_INDEX_ENABLED:
+        from app.services.rank_index import run_rank_index_reloader
+        app.state.rank_index_reloader = asyncio.create_task(run_rank_index_reloader())
+
+@app.on_event("startup")
+async def start_rank_refresher():
+    """Start this worker's background rank refresher (deferred rank maintenance)."""
+    from app.services.rank_refresh_service import run_rank_refresher
+    if settings.RANK_REFRESH_MODE == "deferred":
+        app.state.rank_refresher = asyncio.create_task(run_rank_refresher())
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    for name in ("rank_refresher", "rank_index_reloader"):
+        task = getattr(app.state, name, None)
+        if task is not None:
+            task.cancel()
+
 @app.get("/health")
 def health_check():
     return {"status": "healthy"}
 
+@app.get("/health/pool")
+def pool_health_check():
+    """Report database connection pool saturation for this worker."""
+    from app.core import dependencies
+    from app.utils.monitoring import pool_status
+
+    pools = {"sync": pool_status(dependencies.engine)}
+    if dependencies.async_engine is not None:
+        pools["async"] = pool_status(dependencies.async_engine.sync_engine)
+
+    saturation = max(pool["saturation"] for pool in pools.values())
+    if saturation >= 1:
+        pool_state = "saturated"
+    elif saturation >= settings.DB_POOL_SATURATION_WARNING:
+        pool_state = "warning"
+    else:
+        pool_state = "healthy"
+    return {"status": pool_state, "pools": pools}
+
 @app.get("/metrics")
 def metrics():
     return prometheus_endpoint() 
\ No newline at end of file
@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, String, DateTime, Enum, ForeignKey, Index
+from sqlalchemy.sql import func
+from app.core.database import Base
+import enum
+
+class DeliveryStatusEnum(enum.Enum):
+    pending = "pending"
+    sent = "sent"
+    failed = "failed"
+
+class CampaignDelivery(Base):
+    """One row per (campaign, recipient): whether and how often the campaign was sent to the user."""
+    __tablename__ = "campaign_deliveries"
+    campaign_type = Column(String(50), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    status = Column(Enum(DeliveryStatusEnum), nullable=False, default=DeliveryStatusEnum.pending)
+    attempts = Column(Integer, nullable=False, default=0)
+    claim_token = Column(String(36), nullable=True)  # Identifies the run currently sending this row
+    last_error = Column(String(500), nullable=True)
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+Index('idx_campaign_deliveries_status', CampaignDelivery.campaign_type, CampaignDelivery.status)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Enum, ForeignKey, Index
+from sqlalchemy import Column, Integer, String, Text, DateTime, Enum, ForeignKey, Index, DDL, event
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
@@ -69,3 +69,32 @@ Index('idx_feedback_biggest_hurdle', Feedback.biggest_hurdle)
 Index('idx_feedback_primary_motivation', Feedback.primary_motivation)
 Index('idx_feedback_professional_fear', Feedback.professional_fear)
 Index('idx_feedback_time_consuming_part', Feedback.time_consuming_part)
+
+# Full-text search over the free-text answers (see app/services/feedback_search.py)
+FEEDBACK_FULLTEXT_COLUMNS = ("monetization_considerations", "professional_legacy", "platform_impact", "biggest_hurdle_other")
+
+# MySQL: InnoDB FULLTEXT index
+Index(
+    'ft_feedback_text',
+    *(getattr(Feedback, column) for column in FEEDBACK_FULLTEXT_COLUMNS),
+    mysql_prefix='FULLTEXT'
+).ddl_if(dialect='mysql')
+
+# SQLite: external-content FTS5 table kept in sync by triggers
+_fts_columns = ", ".join(FEEDBACK_FULLTEXT_COLUMNS)
+_fts_new = ", ".join(f"new.{column}" for column in FEEDBACK_FULLTEXT_COLUMNS)
+_fts_old = ", ".join(f"old.{column}" for column in FEEDBACK_FULLTEXT_COLUMNS)
+SQLITE_FTS_DDL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS feedback_fts USING fts5({_fts_columns}, content='feedback', content_rowid='id')",
+    f"CREATE TRIGGER IF NOT EXISTS feedback_fts_ai AFTER INSERT ON feedback BEGIN "
+    f"INSERT INTO feedback_fts(rowid, {_fts_columns}) VALUES (new.id, {_fts_new}); END",
+    f"CREATE TRIGGER IF NOT EXISTS feedback_fts_ad AFTER DELETE ON feedback BEGIN "
+    f"INSERT INTO feedback_fts(feedback_fts, rowid, {_fts_columns}) VALUES ('delete', old.id, {_fts_old}); END",
+    f"CREATE TRIGGER IF NOT EXISTS feedback_fts_au AFTER UPDATE ON feedback BEGIN "
+    f"INSERT INTO feedback_fts(feedback_fts, rowid, {_fts_columns}) VALUES ('delete', old.id, {_fts_old}); "
+    f"INSERT INTO feedback_fts(rowid, {_fts_columns}) VALUES (new.id, {_fts_new}); END",
+]
+
+for _statement in SQLITE_FTS_DDL:
+    event.listen(Feedback.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+event.listen(Feedback.__table__, "after_drop", DDL("DROP TABLE IF EXISTS feedback_fts").execute_if(dialect="sqlite"))
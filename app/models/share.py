@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Enum, ForeignKey, Index
+from sqlalchemy import Column, Integer, String, Date, DateTime, Enum, ForeignKey, Index
 from sqlalchemy.sql import func
 from app.core.database import Base
 import enum
@@ -19,4 +19,38 @@ class ShareEvent(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
 Index('idx_share_events_user_id', ShareEvent.user_id)
-Index('idx_share_events_platform', ShareEvent.platform) 
\ No newline at end of file
+Index('idx_share_events_platform', ShareEvent.platform)
+
+class ShareDailyRollup(Base):
+    """Per-day, per-platform share totals maintained on every share event."""
+    __tablename__ = "share_daily_rollup"
+    date = Column(Date, primary_key=True)
+    platform = Column(Enum(PlatformEnum), primary_key=True)
+    shares = Column(Integer, nullable=False, default=0)
+    points = Column(Integer, nullable=False, default=0)
+    # Points are only awarded for a user's first share per platform, so every
+    # event in a (date, platform) row comes from a distinct user
+    unique_users = Column(Integer, nullable=False, default=0)
+    first_share_at = Column(DateTime(timezone=True), nullable=True)
+    last_share_at = Column(DateTime(timezone=True), nullable=True)
+
+Index('idx_share_daily_rollup_platform', ShareDailyRollup.platform)
+
+class ScorePeriodEnum(enum.Enum):
+    daily = "daily"
+    weekly = "weekly"
+    monthly = "monthly"
+
+class SharePeriodScore(Base):
+    """Per-user points for one day, ISO week or month, maintained on every share event."""
+    __tablename__ = "share_period_scores"
+    period = Column(Enum(ScorePeriodEnum), primary_key=True)
+    # The day, the Monday of the week, or the first day of the month
+    period_start = Column(Date, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    points = Column(Integer, nullable=False, default=0)
+    shares = Column(Integer, nullable=False, default=0)
+    last_share_at = Column(DateTime(timezone=True), nullable=True)
+
+# Top performers of one period: range scan on (period, period_start) by points
+Index('idx_share_period_scores_top', SharePeriodScore.period, SharePeriodScore.period_start, SharePeriodScore.points)
@@ -25,4 +25,6 @@ class User(Base):
 Index('idx_users_total_points', User.total_points)
 Index('idx_users_email', User.email)
 Index('idx_users_current_rank', User.current_rank)
-Index('idx_users_default_rank', User.default_rank)
\ No newline at end of file
+Index('idx_users_default_rank', User.default_rank)
+# Leaderboard order: keyset pagination and exact-rank counts walk this index
+Index('idx_users_leaderboard', User.is_admin, User.total_points, User.created_at, User.id)
\ No newline at end of file
@@ -16,6 +16,7 @@ class AdminUser(BaseModel):
 class AdminUsersResponse(BaseModel):
     users: List[AdminUser]
     pagination: Dict[str, int]
+    next_cursor: Optional[str] = None
 
 class AdminDashboardResponse(BaseModel):
     overview: Dict[str, int]
@@ -110,6 +110,7 @@ class FeedbackResponse(BaseModel):
 class FeedbackListResponse(BaseModel):
     feedback: List[FeedbackResponse]
     pagination: Dict[str, int]
+    next_cursor: Optional[str] = None
 
 class FeedbackStatsResponse(BaseModel):
     total_responses: int
@@ -155,6 +156,7 @@ class FeedbackFilters(BaseModel):
 class ExportFormat(str, Enum):
     CSV = "csv"
     JSON = "json"
+    NDJSON = "ndjson"
 
 # Mapping for human-readable labels
 HURDLE_LABELS = {
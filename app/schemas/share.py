@@ -24,6 +24,7 @@ class ShareHistoryItem(BaseModel):
 class ShareHistoryResponse(BaseModel):
     shares: List[ShareHistoryItem]
     pagination: Dict[str, int]
+    next_cursor: Optional[str] = None
 
 class ShareAnalyticsResponse(BaseModel):
     total_shares: int
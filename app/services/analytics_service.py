@@ -0,0 +1,235 @@
+"""
+Share Analytics Service
+=======================
+
+SQL-side aggregation for the share analytics endpoints.
+
+Every statistic is computed with a handful of GROUP BY queries instead of
+loading all events into Python:
+- per-platform counts, points, first/last share, unique users and 7-day activity
+- a daily series of shares and points
+
+System-wide statistics read the pre-aggregated share_daily_rollup table
+(see rollup_service). Per-user statistics (pass user_id) read share_events
+directly: a user has at most one event per platform, so that scan is tiny.
+"""
+
+from datetime import datetime, timedelta, date
+from typing import Optional
+
+from sqlalchemy import func, case
+from sqlalchemy.orm import Session
+
+from app.models.share import ShareEvent, ShareDailyRollup, PlatformEnum
+
+
+def _platform_value(platform) -> str:
+    return platform.value if hasattr(platform, 'value') else str(platform)
+
+
+def to_date(value) -> date:
+    """Normalize DATE() results (date on MySQL, 'YYYY-MM-DD' string on SQLite)."""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value)[:10], "%Y-%m-%d").date()
+
+
+def get_platform_aggregates(db: Session, user_id: Optional[int] = None) -> dict:
+    """
+    Aggregate share events per platform in a single GROUP BY query.
+
+    Returns:
+        dict: platform value -> {shares, points, unique_users, recent_shares_7d,
+              first_share, last_share}; platforms without shares are omitted
+    """
+    if user_id is None:
+        return _get_rollup_platform_aggregates(db)
+
+    week_ago = datetime.utcnow() - timedelta(days=7)
+    query = db.query(
+        ShareEvent.platform,
+        func.count(ShareEvent.id).label('shares'),
+        func.coalesce(func.sum(ShareEvent.points_earned), 0).label('points'),
+        func.count(func.distinct(ShareEvent.user_id)).label('unique_users'),
+        func.coalesce(func.sum(case((ShareEvent.created_at >= week_ago, 1), else_=0)), 0).label('recent_shares_7d'),
+        func.min(ShareEvent.created_at).label('first_share'),
+        func.max(ShareEvent.created_at).label('last_share')
+    ).filter(ShareEvent.user_id == user_id)
+
+    aggregates = {}
+    for row in query.group_by(ShareEvent.platform).all():
+        aggregates[_platform_value(row.platform)] = {
+            "shares": int(row.shares),
+            "points": int(row.points),
+            "unique_users": int(row.unique_users),
+            "recent_shares_7d": int(row.recent_shares_7d),
+            "first_share": row.first_share,
+            "last_share": row.last_share
+        }
+    return aggregates
+
+
+def _get_rollup_platform_aggregates(db: Session) -> dict:
+    """System-wide per-platform aggregates from share_daily_rollup."""
+    week_start = (datetime.utcnow() - timedelta(days=6)).date()
+    rows = db.query(
+        ShareDailyRollup.platform,
+        func.sum(ShareDailyRollup.shares).label('shares'),
+        func.sum(ShareDailyRollup.points).label('points'),
+        # Each user has at most one event per platform, so daily counts add up
+        func.sum(ShareDailyRollup.unique_users).label('unique_users'),
+        func.coalesce(func.sum(case((ShareDailyRollup.date >= week_start, ShareDailyRollup.shares), else_=0)), 0).label('recent_shares_7d'),
+        func.min(ShareDailyRollup.first_share_at).label('first_share'),
+        func.max(ShareDailyRollup.last_share_at).label('last_share')
+    ).group_by(ShareDailyRollup.platform).all()
+
+    aggregates = {}
+    for row in rows:
+        aggregates[_platform_value(row.platform)] = {
+            "shares": int(row.shares or 0),
+            "points": int(row.points or 0),
+            "unique_users": int(row.unique_users or 0),
+            "recent_shares_7d": int(row.recent_shares_7d or 0),
+            "first_share": row.first_share,
+            "last_share": row.last_share
+        }
+    return aggregates
+
+
+def get_today_totals(db: Session) -> dict:
+    """Shares and points recorded today (UTC), from share_daily_rollup."""
+    today = datetime.utcnow().date()
+    row = db.query(
+        func.coalesce(func.sum(ShareDailyRollup.shares), 0).label('shares'),
+        func.coalesce(func.sum(ShareDailyRollup.points), 0).label('points')
+    ).filter(ShareDailyRollup.date == today).first()
+    return {"shares": int(row.shares), "points": int(row.points)}
+
+
+def get_daily_series(db: Session, days: int = 30, user_id: Optional[int] = None) -> list:
+    """
+    Shares and points per day for the last `days` days (oldest first, today last).
+
+    Days without shares are filled with zeros.
+    """
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    start = today - timedelta(days=days - 1)
+
+    if user_id is None:
+        query = db.query(
+            ShareDailyRollup.date.label('day'),
+            func.sum(ShareDailyRollup.shares).label('shares'),
+            func.sum(ShareDailyRollup.points).label('points')
+        ).filter(ShareDailyRollup.date >= start.date()).group_by(ShareDailyRollup.date)
+    else:
+        day = func.date(ShareEvent.created_at)
+        query = db.query(
+            day.label('day'),
+            func.count(ShareEvent.id).label('shares'),
+            func.coalesce(func.sum(ShareEvent.points_earned), 0).label('points')
+        ).filter(
+            ShareEvent.created_at >= start,
+            ShareEvent.user_id == user_id
+        ).group_by(day)
+
+    by_day = {to_date(row.day): (int(row.shares), int(row.points)) for row in query.all()}
+
+    timeline = []
+    for i in range(days):
+        day_start = start + timedelta(days=i)
+        shares, points = by_day.get(day_start.date(), (0, 0))
+        timeline.append({
+            "date": day_start.isoformat(),
+            "shares": shares,
+            "points": points
+        })
+    return timeline
+
+
+def get_share_analytics(db: Session, user_id: Optional[int] = None, days: int = 30) -> dict:
+    """
+    Build the enhanced analytics payload (platform breakdown, timeline, summary).
+
+    Used by /admin/analytics (system-wide) and /shares/analytics/enhanced (per user).
+    """
+    aggregates = get_platform_aggregates(db, user_id)
+    total_shares = sum(a["shares"] for a in aggregates.values())
+    total_points = sum(a["points"] for a in aggregates.values())
+
+    platform_breakdown = {}
+    for platform in PlatformEnum:
+        stats = aggregates.get(platform.value)
+        if stats and stats["shares"] > 0:
+            platform_breakdown[platform.value] = {
+                "shares": stats["shares"],
+                "points": stats["points"],
+                "percentage": round((stats["shares"] / total_shares * 100), 1) if total_shares > 0 else 0,
+                "first_share_date": stats["first_share"].isoformat(),
+                "last_share_date": stats["last_share"].isoformat()
+            }
+        else:
+            platform_breakdown[platform.value] = {
+                "shares": 0,
+                "points": 0,
+                "percentage": 0
+            }
+
+    summary = {
+        "total_shares": total_shares,
+        "total_points": total_points,
+        "active_platforms": len([a for a in aggregates.values() if a["shares"] > 0]),
+        "average_points_per_share": round(total_points / total_shares, 2) if total_shares > 0 else 0
+    }
+
+    return {
+        "platform_breakdown": platform_breakdown,
+        "timeline": get_daily_series(db, days, user_id),
+        "summary": summary
+    }
+
+
+def get_platform_stats(db: Session) -> dict:
+    """Build the detailed per-platform statistics payload for /admin/platform-stats."""
+    aggregates = get_platform_aggregates(db)
+    total_shares = sum(a["shares"] for a in aggregates.values())
+    total_points = sum(a["points"] for a in aggregates.values())
+    now = datetime.utcnow()
+
+    platform_stats = {}
+    for platform in PlatformEnum:
+        stats = aggregates.get(platform.value)
+        if stats and stats["shares"] > 0:
+            shares_count = stats["shares"]
+            days_active = (now - stats["first_share"].replace(tzinfo=None)).days + 1
+            platform_stats[platform.value] = {
+                "shares": shares_count,
+                "points": stats["points"],
+                "percentage": round((shares_count / total_shares * 100), 1) if total_shares > 0 else 0,
+                "unique_users": stats["unique_users"],
+                "first_share_date": stats["first_share"].isoformat(),
+                "last_share_date": stats["last_share"].isoformat(),
+                "recent_shares_7d": stats["recent_shares_7d"],
+                "daily_average": round(shares_count / days_active, 2) if days_active > 0 else 0,
+                "points_per_share": round(stats["points"] / shares_count, 2)
+            }
+        else:
+            platform_stats[platform.value] = {
+                "shares": 0,
+                "points": 0,
+                "percentage": 0,
+                "unique_users": 0,
+                "recent_shares_7d": 0,
+                "daily_average": 0,
+                "points_per_share": 0
+            }
+
+    return {
+        "platform_stats": platform_stats,
+        "summary": {
+            "total_shares": total_shares,
+            "total_points": total_points,
+            "total_platforms": len([p for p in platform_stats.values() if p["shares"] > 0])
+        }
+    }
@@ -0,0 +1,237 @@
+"""
+Campaign Delivery Ledger
+========================
+
+Records which campaign has been delivered to which user in the
+campaign_deliveries table, so that every send is idempotent: re-running a
+campaign, retrying a chunk task or re-triggering the signup flow only
+targets recipients that have not received the campaign yet.
+
+A send works in two steps:
+1. claim_recipients() anti-joins the candidate users against the ledger
+   and claims the undelivered ones in bulk under a fresh claim token.
+   Recipients are claimable when they have no row, a failed row with
+   fewer than CAMPAIGN_MAX_ATTEMPTS attempts, or a pending row whose
+   claim is older than CAMPAIGN_CLAIM_TIMEOUT_SECONDS (a crashed sender).
+2. record_delivery_results() marks the claimed rows sent or failed.
+   If the send aborts before results exist, release_claims() marks the
+   rows still held by the token failed, so they are claimable again
+   right away instead of after CAMPAIGN_CLAIM_TIMEOUT_SECONDS.
+
+Concurrent senders cannot both claim a recipient: inserts are
+insert-ignore and updates re-check the claimable condition, and each
+sender only sends to the rows carrying its own token.
+"""
+
+import logging
+import uuid
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from sqlalchemy import and_, func, or_, update
+from sqlalchemy.orm import Query, Session
+
+from app.core.config import settings
+from app.models.campaign import CampaignDelivery, DeliveryStatusEnum
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+
+def _claimable(now: datetime):
+    """Ledger condition for rows that may be (re)claimed."""
+    stale_before = now - timedelta(seconds=settings.CAMPAIGN_CLAIM_TIMEOUT_SECONDS)
+    return or_(
+        and_(
+            CampaignDelivery.status == DeliveryStatusEnum.failed,
+            CampaignDelivery.attempts < settings.CAMPAIGN_MAX_ATTEMPTS
+        ),
+        and_(
+            CampaignDelivery.status == DeliveryStatusEnum.pending,
+            CampaignDelivery.updated_at < stale_before
+        )
+    )
+
+
+def _insert_ignore(db: Session, rows: List[dict]):
+    """Dialect-aware INSERT IGNORE / ON CONFLICT DO NOTHING."""
+    table = CampaignDelivery.__table__
+    dialect = db.get_bind().dialect.name
+
+    if dialect == "mysql":
+        from sqlalchemy.dialects.mysql import insert
+        stmt = insert(table).prefix_with("IGNORE")
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+        stmt = insert(table).on_conflict_do_nothing(index_elements=[table.c.campaign_type, table.c.user_id])
+    else:
+        raise NotImplementedError(f"Campaign delivery ledger is not supported on {dialect}")
+
+    db.execute(stmt, rows)
+
+
+def claim_recipients(db: Session, campaign_type: str, recipients: Query) -> Tuple[str, List[User]]:
+    """
+    Claim the recipients that have not received campaign_type yet.
+
+    Args:
+        db: Database session (committed by this function)
+        campaign_type: Campaign being sent
+        recipients: Query over User selecting the candidate recipients
+
+    Returns:
+        tuple: (claim_token, claimed users in id order)
+    """
+    now = datetime.utcnow()
+    token = str(uuid.uuid4())
+
+    # Anti-join: candidates without a row, or with a retryable row
+    candidates = recipients.outerjoin(
+        CampaignDelivery,
+        and_(
+            CampaignDelivery.user_id == User.id,
+            CampaignDelivery.campaign_type == campaign_type
+        )
+    ).filter(
+        or_(CampaignDelivery.user_id.is_(None), _claimable(now))
+    ).with_entities(User.id, CampaignDelivery.user_id).all()
+
+    if not candidates:
+        return token, []
+
+    new_ids = [user_id for user_id, ledger_id in candidates if ledger_id is None]
+    retry_ids = [user_id for user_id, ledger_id in candidates if ledger_id is not None]
+
+    if new_ids:
+        _insert_ignore(db, [
+            {
+                "campaign_type": campaign_type,
+                "user_id": user_id,
+                "status": DeliveryStatusEnum.pending,
+                "attempts": 1,
+                "claim_token": token,
+                "created_at": now,
+                "updated_at": now
+            }
+            for user_id in new_ids
+        ])
+    if retry_ids:
+        db.execute(
+            update(CampaignDelivery)
+            .where(
+                CampaignDelivery.campaign_type == campaign_type,
+                CampaignDelivery.user_id.in_(retry_ids),
+                _claimable(now)
+            )
+            .values(
+                status=DeliveryStatusEnum.pending,
+                attempts=CampaignDelivery.attempts + 1,
+                claim_token=token,
+                updated_at=now
+            )
+            .execution_options(synchronize_session=False)
+        )
+    db.commit()
+
+    claimed = db.query(User).join(
+        CampaignDelivery,
+        and_(
+            CampaignDelivery.user_id == User.id,
+            CampaignDelivery.campaign_type == campaign_type
+        )
+    ).filter(
+        CampaignDelivery.claim_token == token
+    ).order_by(User.id).all()
+
+    skipped = len(candidates) - len(claimed)
+    if skipped:
+        logger.info(f"Campaign '{campaign_type}': {skipped} recipients claimed by another sender")
+    return token, claimed
+
+
+def record_delivery_results(db: Session, campaign_type: str, token: str, results: List[Tuple[int, Optional[str]]]):
+    """
+    Mark claimed recipients as sent or failed.
+
+    Args:
+        db: Database session (committed by this function)
+        campaign_type: Campaign that was sent
+        token: Claim token returned by claim_recipients
+        results: (user_id, error) pairs; error is None for a successful send
+    """
+    now = datetime.utcnow()
+    sent_ids = [user_id for user_id, error in results if error is None]
+
+    if sent_ids:
+        db.execute(
+            update(CampaignDelivery)
+            .where(
+                CampaignDelivery.campaign_type == campaign_type,
+                CampaignDelivery.claim_token == token,
+                CampaignDelivery.user_id.in_(sent_ids)
+            )
+            .values(status=DeliveryStatusEnum.sent, sent_at=now, last_error=None, claim_token=None, updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+    for user_id, error in results:
+        if error is None:
+            continue
+        db.execute(
+            update(CampaignDelivery)
+            .where(
+                CampaignDelivery.campaign_type == campaign_type,
+                CampaignDelivery.claim_token == token,
+                CampaignDelivery.user_id == user_id
+            )
+            .values(status=DeliveryStatusEnum.failed, last_error=str(error)[:500], claim_token=None, updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+    db.commit()
+
+
+def release_claims(db: Session, campaign_type: str, token: str, error: str) -> int:
+    """
+    Mark every row still claimed by token as failed (e.g. after the send raised).
+
+    The attempt stays counted, so a recipient is retried until it reaches
+    CAMPAIGN_MAX_ATTEMPTS like any other failure.
+
+    Args:
+        db: Database session (rolled back first, committed by this function)
+        campaign_type: Campaign that was being sent
+        token: Claim token returned by claim_recipients
+        error: Why the send was aborted
+
+    Returns:
+        int: Number of claims released
+    """
+    db.rollback()
+    released = db.execute(
+        update(CampaignDelivery)
+        .where(
+            CampaignDelivery.campaign_type == campaign_type,
+            CampaignDelivery.claim_token == token,
+            CampaignDelivery.status == DeliveryStatusEnum.pending
+        )
+        .values(status=DeliveryStatusEnum.failed, last_error=str(error)[:500], claim_token=None, updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    if released:
+        logger.warning(f"Campaign '{campaign_type}': released {released} claims after an aborted send")
+    return released
+
+
+def get_delivery_counts(db: Session, campaign_type: str) -> dict:
+    """
+    Count ledger rows per status for a campaign.
+
+    Returns:
+        dict: {"pending": n, "sent": n, "failed": n}
+    """
+    counts = {status.value: 0 for status in DeliveryStatusEnum}
+    for status, count in db.query(CampaignDelivery.status, func.count()).filter(
+        CampaignDelivery.campaign_type == campaign_type
+    ).group_by(CampaignDelivery.status):
+        counts[status.value] = count
+    return counts
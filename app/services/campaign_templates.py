@@ -0,0 +1,129 @@
+"""
+Campaign Template Engine
+========================
+
+Compiles each campaign in EMAIL_TEMPLATES once per process instead of
+formatting the raw body string for every recipient.
+
+- The body source is split once into static segments and {placeholder}
+  fields; the static segments are converted to both a plain-text and an
+  HTML (bold, links, paragraphs) Jinja2 template, compiled up front.
+- The encoded Subject and From headers are computed once per campaign.
+- build_messages() renders recipients lazily, yielding one
+  multipart/alternative message (text + HTML part) at a time.
+"""
+
+import html
+import re
+from email.charset import Charset, QP
+from email.header import Header
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from typing import Iterable, Iterator, Tuple
+
+from jinja2 import Environment, StrictUndefined
+
+from app.core.config import settings
+
+# {name}-style fields in the campaign sources
+FIELD_PATTERN = re.compile(r"\{(\w+)\}")
+BOLD_PATTERN = re.compile(r"\*\*(.+?)\*\*")
+URL_PATTERN = re.compile(r"https?://[^\s<]+")
+
+# Mostly-ASCII bodies: quoted-printable is smaller and cheaper than base64
+UTF8_QP = Charset("utf-8")
+UTF8_QP.body_encoding = QP
+
+_text_env = Environment(autoescape=False, undefined=StrictUndefined, keep_trailing_newline=True)
+_html_env = Environment(autoescape=True, undefined=StrictUndefined, keep_trailing_newline=True)
+
+
+def _raw(segment: str) -> str:
+    """Protect a static segment from Jinja2 syntax."""
+    if "{{" in segment or "{%" in segment or "{#" in segment:
+        return "{% raw %}" + segment + "{% endraw %}"
+    return segment
+
+
+def _segments(source: str):
+    """Split a source into (static_text, field_name) pairs; field_name is None for the tail."""
+    position = 0
+    for match in FIELD_PATTERN.finditer(source):
+        yield source[position:match.start()], match.group(1)
+        position = match.end()
+    yield source[position:], None
+
+
+def _html_static(segment: str) -> str:
+    """Render a static text segment as HTML."""
+    escaped = html.escape(segment, quote=False)
+    escaped = BOLD_PATTERN.sub(r"<strong>\1</strong>", escaped)
+    escaped = URL_PATTERN.sub(lambda m: f'<a href="{m.group(0)}">{m.group(0)}</a>', escaped)
+    escaped = re.sub(r"(?m)^---$", "<hr>", escaped)
+    escaped = escaped.replace("\n\n", "</p>\n<p>")
+    return escaped.replace("\n", "<br>\n")
+
+
+class CampaignTemplate:
+    """One compiled campaign: subject plus text and HTML body templates."""
+
+    def __init__(self, campaign_type: str, subject: str, source: str):
+        self.campaign_type = campaign_type
+        self.subject = subject
+
+        text_parts = []
+        html_parts = []
+        for static, field in _segments(source.strip()):
+            text_parts.append(_raw(static))
+            html_parts.append(_raw(_html_static(static)))
+            if field:
+                text_parts.append("{{ " + field + " }}")
+                html_parts.append("{{ " + field + " }}")
+
+        self.text_template = _text_env.from_string("".join(text_parts))
+        self.html_template = _html_env.from_string(
+            "<html><body><p>" + "".join(html_parts) + "</p></body></html>"
+        )
+
+        # Header encoding is the same for every recipient
+        self.subject_header = Header(subject, "utf-8").encode()
+        self.from_header = settings.EMAIL_FROM
+
+    def render_text(self, **context) -> str:
+        return self.text_template.render(**context)
+
+    def render_html(self, **context) -> str:
+        return self.html_template.render(**context)
+
+    def build_message(self, user_email: str, **context) -> MIMEMultipart:
+        """Build the multipart/alternative message for one recipient."""
+        msg = MIMEMultipart("alternative")
+        msg["Subject"] = self.subject_header
+        msg["From"] = self.from_header
+        msg["To"] = user_email
+        msg.attach(MIMEText(self.render_text(**context), "plain", UTF8_QP))
+        msg.attach(MIMEText(self.render_html(**context), "html", UTF8_QP))
+        return msg
+
+    def build_messages(self, recipients: Iterable[Tuple[str, str]]) -> Iterator[MIMEMultipart]:
+        """
+        Lazily build messages for (email, name) recipients.
+
+        Yields:
+            MIMEMultipart: One message per recipient, in input order
+        """
+        for user_email, name in recipients:
+            yield self.build_message(user_email, name=name)
+
+
+def compile_campaign_templates(templates: dict) -> dict:
+    """
+    Compile every campaign of an EMAIL_TEMPLATES-style dict.
+
+    Returns:
+        dict: campaign_type -> CampaignTemplate
+    """
+    return {
+        campaign_type: CampaignTemplate(campaign_type, template["subject"], template["template"])
+        for campaign_type, template in templates.items()
+    }
@@ -0,0 +1,149 @@
+"""
+User Counter Service
+====================
+
+O(1) user counts for hot endpoints (leaderboard, ranking, beta stats,
+admin dashboard) instead of a COUNT(*) over the users table per request.
+
+A single snapshot in diskcache (shared by all workers) holds:
+- total users and non-admin users
+- hourly signup buckets for the last 7 days, as (all, non_admin) pairs
+
+Signups and admin promotions update the snapshot in place. It is
+reconciled against the database whenever it is missing or older than
+USER_COUNTS_RECONCILE_SECONDS, which also repairs any drift from writes
+that bypass this service.
+"""
+
+import logging
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.user import User
+from app.utils.cache import cache
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_KEY = "user_counts:snapshot"
+RECONCILE_LOCK_KEY = "user_counts:reconcile_lock"
+
+# Hourly buckets older than this are dropped
+BUCKET_HOURS = 7 * 24
+
+
+def _hour(moment: datetime) -> int:
+    return int(moment.timestamp() // 3600)
+
+
+def _prune(buckets: dict, now_hour: int) -> dict:
+    return {hour: counts for hour, counts in buckets.items() if hour > now_hour - BUCKET_HOURS}
+
+
+def reconcile_user_counts(db: Session) -> dict:
+    """
+    Recompute the snapshot from the database.
+
+    Returns:
+        dict: The new snapshot
+    """
+    now = datetime.utcnow()
+    week_ago = now - timedelta(hours=BUCKET_HOURS)
+
+    total = db.query(User).count()
+    non_admin = db.query(User).filter(User.is_admin == False).count()
+
+    buckets = {}
+    recent = db.query(User.created_at, User.is_admin).filter(User.created_at >= week_ago)
+    for created_at, is_admin in recent.yield_per(10000):
+        hour = _hour(created_at)
+        all_count, non_admin_count = buckets.get(hour, (0, 0))
+        buckets[hour] = (all_count + 1, non_admin_count + (0 if is_admin else 1))
+
+    snapshot = {
+        "total": total,
+        "non_admin": non_admin,
+        "buckets": buckets,
+        "reconciled_at": time.time()
+    }
+    cache.set(SNAPSHOT_KEY, snapshot)
+    logger.info(f"Reconciled user counts: {total} users, {non_admin} non-admin")
+    return snapshot
+
+
+def _get_snapshot(db: Session) -> dict:
+    snapshot = cache.get(SNAPSHOT_KEY)
+    if snapshot is None:
+        return reconcile_user_counts(db)
+
+    if time.time() - snapshot["reconciled_at"] > settings.USER_COUNTS_RECONCILE_SECONDS:
+        # One worker reconciles; the others keep serving the current snapshot
+        if cache.add(RECONCILE_LOCK_KEY, True, expire=60):
+            try:
+                return reconcile_user_counts(db)
+            finally:
+                cache.delete(RECONCILE_LOCK_KEY)
+    return snapshot
+
+
+def get_user_counts(db: Session) -> dict:
+    """
+    Get user counts.
+
+    Returns:
+        dict: total_users, non_admin_users, signups_24h, signups_7d,
+              non_admin_signups_24h, non_admin_signups_7d
+    """
+    snapshot = _get_snapshot(db)
+    now_hour = _hour(datetime.utcnow())
+
+    signups_24h = non_admin_24h = signups_7d = non_admin_7d = 0
+    for hour, (all_count, non_admin_count) in snapshot["buckets"].items():
+        if hour > now_hour - BUCKET_HOURS:
+            signups_7d += all_count
+            non_admin_7d += non_admin_count
+        if hour > now_hour - 24:
+            signups_24h += all_count
+            non_admin_24h += non_admin_count
+
+    return {
+        "total_users": snapshot["total"],
+        "non_admin_users": snapshot["non_admin"],
+        "signups_24h": signups_24h,
+        "signups_7d": signups_7d,
+        "non_admin_signups_24h": non_admin_24h,
+        "non_admin_signups_7d": non_admin_7d
+    }
+
+
+def _update_snapshot(total_delta: int, non_admin_delta: int, bucket_delta=None):
+    try:
+        with cache.transact():
+            snapshot = cache.get(SNAPSHOT_KEY)
+            if snapshot is None:
+                # Nothing to update; the next read reconciles from the database
+                return
+            snapshot["total"] += total_delta
+            snapshot["non_admin"] += non_admin_delta
+            if bucket_delta:
+                now_hour = _hour(datetime.utcnow())
+                buckets = _prune(snapshot["buckets"], now_hour)
+                all_count, non_admin_count = buckets.get(now_hour, (0, 0))
+                buckets[now_hour] = (all_count + bucket_delta[0], non_admin_count + bucket_delta[1])
+                snapshot["buckets"] = buckets
+            cache.set(SNAPSHOT_KEY, snapshot)
+    except Exception as e:
+        logger.error(f"User counter update failed: {e}")
+
+
+def record_user_created(is_admin: bool = False):
+    """Count a newly committed user (regular or beta signup)."""
+    non_admin = 0 if is_admin else 1
+    _update_snapshot(1, non_admin, (1, non_admin))
+
+
+def record_user_promoted():
+    """Move a user from the non-admin count to the admin count."""
+    _update_snapshot(0, -1)
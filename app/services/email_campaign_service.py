@@ -9,13 +9,20 @@ Campaign Schedule:
 2. Mail 2: Search Engine Complete (July 26, 2025, 2:00 PM IST)
 3. Mail 3: Portfolio Builder Complete (July 30, 2025, 10:30 AM IST)
 4. Mail 4: Platform Complete & Launch (August 3, 2025, 9:00 AM IST)
+
+Every send goes through the campaign_deliveries ledger
+(see campaign_delivery_service), so a campaign reaches each user at most once.
 """
 
 from sqlalchemy.orm import Session
 from app.models.user import User
-from app.services.email_service import send_email
+from app.services.email_service import get_smtp_pool
+from app.services.campaign_templates import CampaignTemplate, compile_campaign_templates
+from app.services.campaign_delivery_service import claim_recipients, record_delivery_results, release_claims
 from app.core.dependencies import get_db
+from app.core.config import settings
 from datetime import datetime, timezone
+from typing import List, Tuple
 import pytz
 import logging
 
@@ -133,6 +140,13 @@ The LawVriksh Team
     }
 }
 
+# Compiled once per process; see campaign_templates
+COMPILED_TEMPLATES = compile_campaign_templates(EMAIL_TEMPLATES)
+
+def get_campaign_template(campaign_type: str) -> CampaignTemplate:
+    """Get the compiled template of a campaign (KeyError if unknown)."""
+    return COMPILED_TEMPLATES[campaign_type]
+
 def send_welcome_email_campaign(user_email: str, user_name: str):
     """
     Send the instant welcome email when user signs up.
@@ -144,11 +158,8 @@ def send_welcome_email_campaign(user_email: str, user_name: str):
     """
     try:
         # Send welcome email immediately
-        template = EMAIL_TEMPLATES["welcome"]
-        subject = template["subject"]
-        body = template["template"].format(name=user_name)
-        send_email(user_email, subject, body)
-        logger.info(f"Welcome email sent to {user_email} ({user_name})")
+        if _send_once("welcome", user_email, user_name):
+            logger.info(f"Welcome email sent to {user_email} ({user_name})")
 
         # Check for past-due scheduled emails and send them instantly
         current_time = datetime.now(IST)
@@ -179,6 +190,42 @@ def send_welcome_email_campaign(user_email: str, user_name: str):
         logger.error(f"Failed to send welcome email campaign to {user_email}: {e}")
         return False
 
+def _send_once(campaign_type: str, user_email: str, user_name: str) -> bool:
+    """
+    Send one campaign email to one user unless the ledger shows it was delivered.
+
+    Users without a row in the users table (not committed yet) are sent to
+    without a ledger entry.
+
+    Returns:
+        bool: True if the email was sent now, False if it was skipped
+
+    Raises:
+        Exception: If sending fails (the failure is recorded in the ledger)
+    """
+    from app.core.dependencies import SessionLocal
+    msg = get_campaign_template(campaign_type).build_message(user_email, name=user_name)
+
+    db = SessionLocal()
+    try:
+        token, claimed = claim_recipients(db, campaign_type, db.query(User).filter(User.email == user_email))
+        if not claimed:
+            if db.query(User.id).filter(User.email == user_email).first() is not None:
+                logger.info(f"Campaign '{campaign_type}' already delivered or in progress for {user_email}, skipping")
+                return False
+            get_smtp_pool().send_message(msg)
+            return True
+
+        try:
+            get_smtp_pool().send_message(msg)
+        except Exception as e:
+            record_delivery_results(db, campaign_type, token, [(claimed[0].id, str(e))])
+            raise
+        record_delivery_results(db, campaign_type, token, [(claimed[0].id, None)])
+        return True
+    finally:
+        db.close()
+
 def send_scheduled_campaign_email(campaign_type: str, user_email: str, user_name: str):
     """
     Send a scheduled campaign email.
@@ -193,24 +240,107 @@ def send_scheduled_campaign_email(campaign_type: str, user_email: str, user_name
             logger.error(f"Unknown campaign type: {campaign_type}")
             return False
         
-        template = EMAIL_TEMPLATES[campaign_type]
-        subject = template["subject"]
-        body = template["template"].format(name=user_name)
-        
-        # Send email
-        send_email(user_email, subject, body)
-        
-        logger.info(f"Campaign email '{campaign_type}' sent to {user_email} ({user_name})")
+        if _send_once(campaign_type, user_email, user_name):
+            logger.info(f"Campaign email '{campaign_type}' sent to {user_email} ({user_name})")
         return True
         
     except Exception as e:
         logger.error(f"Failed to send campaign email '{campaign_type}' to {user_email}: {e}")
         return False
 
+def _campaign_recipients(db: Session):
+    """Active non-admin users, the audience of every bulk campaign."""
+    return db.query(User).filter(
+        User.is_active == True,
+        User.is_admin == False
+    )
+
+def get_campaign_recipient_chunks(db: Session, chunk_size: int = None) -> List[Tuple[int, int]]:
+    """
+    Split campaign recipients into user id ranges of at most chunk_size users.
+
+    Ranges are found with keyset queries on users.id (one indexed lookup per
+    chunk), so no user rows are loaded.
+
+    Returns:
+        list: (first_id, last_id) inclusive ranges in id order
+    """
+    chunk_size = chunk_size or settings.CAMPAIGN_CHUNK_SIZE
+    recipient_ids = db.query(User.id).filter(
+        User.is_active == True,
+        User.is_admin == False
+    ).order_by(User.id)
+
+    chunks = []
+    last_id = 0
+    while True:
+        remaining = recipient_ids.filter(User.id > last_id)
+        first_id = remaining.limit(1).scalar()
+        if first_id is None:
+            break
+        end_id = remaining.offset(chunk_size - 1).limit(1).scalar()
+        if end_id is None:
+            end_id = remaining.order_by(None).order_by(User.id.desc()).limit(1).scalar()
+        chunks.append((first_id, end_id))
+        last_id = end_id
+    return chunks
+
+def send_campaign_chunk(campaign_type: str, db: Session, first_id: int, last_id: int) -> Tuple[int, int]:
+    """
+    Send a campaign to the recipients with first_id <= id <= last_id.
+
+    Only recipients the delivery ledger shows as undelivered are claimed and
+    sent to, so retrying a chunk (or re-running the campaign) does not send
+    duplicates. Per-recipient SMTP failures are counted and recorded in the
+    ledger. If the send aborts (template, dispatcher or database error), the
+    chunk's claims are released and the error propagates so the calling task
+    can retry the chunk.
+
+    Returns:
+        tuple: (success_count, failed_count)
+    """
+    token, users = claim_recipients(db, campaign_type, _campaign_recipients(db).filter(
+        User.id >= first_id,
+        User.id <= last_id
+    ))
+    if not users:
+        return 0, 0
+
+    # Deliver over concurrent SMTP sessions instead of one user at a time
+    from app.services.email_dispatcher import dispatch_messages
+    try:
+        # Passed as a generator: each message is built when a session is ready to send it
+        messages = get_campaign_template(campaign_type).build_messages((user.email, user.name) for user in users)
+        results = dispatch_messages(messages)
+        record_delivery_results(db, campaign_type, token, [
+            (user.id, None if result["success"] else result["error"])
+            for user, result in zip(users, results)
+        ])
+    except Exception as e:
+        # Free the claims now so that a retry of this chunk can pick them up
+        try:
+            release_claims(db, campaign_type, token, str(e))
+        except Exception as release_error:
+            logger.error(f"Could not release campaign '{campaign_type}' claims {token}: {release_error}")
+        raise
+
+    success_count = sum(1 for result in results if result["success"])
+    failed_count = len(results) - success_count
+    for result in results:
+        if not result["success"]:
+            logger.error(f"Failed to send campaign email '{campaign_type}' to {result['email']}: {result['error']}")
+
+    logger.info(f"Campaign '{campaign_type}' users {first_id}-{last_id}: {success_count} sent, {failed_count} failed")
+    return success_count, failed_count
+
 def send_bulk_campaign_email(campaign_type: str, db: Session):
     """
     Send campaign email to all active users, but only if the campaign is not in the past.
 
+    Recipients are processed chunk by chunk (see get_campaign_recipient_chunks)
+    rather than loaded all at once. Celery fans the same chunks out across
+    workers via send_bulk_campaign_task.
+
     Args:
         campaign_type: Type of campaign to send
         db: Database session
@@ -221,22 +351,19 @@ def send_bulk_campaign_email(campaign_type: str, db: Session):
             logger.warning(f"Campaign '{campaign_type}' is in the past. Skipping bulk send.")
             return 0, 0
 
-        # Get all active non-admin users
-        users = db.query(User).filter(
-            User.is_active == True,
-            User.is_admin == False
-        ).all()
+        if campaign_type not in EMAIL_TEMPLATES:
+            logger.error(f"Unknown campaign type: {campaign_type}")
+            return 0, 0
 
-        logger.info(f"Sending '{campaign_type}' campaign to {len(users)} users")
+        chunks = get_campaign_recipient_chunks(db)
+        logger.info(f"Sending '{campaign_type}' campaign in {len(chunks)} chunks")
 
         success_count = 0
         failed_count = 0
-
-        for user in users:
-            if send_scheduled_campaign_email(campaign_type, user.email, user.name):
-                success_count += 1
-            else:
-                failed_count += 1
+        for first_id, last_id in chunks:
+            sent, failed = send_campaign_chunk(campaign_type, db, first_id, last_id)
+            success_count += sent
+            failed_count += failed
 
         logger.info(f"Campaign '{campaign_type}' completed: {success_count} sent, {failed_count} failed")
         return success_count, failed_count
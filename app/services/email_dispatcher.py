@@ -0,0 +1,186 @@
+"""
+Async Bulk Email Dispatcher
+===========================
+
+Delivers large batches of messages over several concurrent SMTP sessions
+using aiosmtplib, instead of one message at a time over one connection.
+
+- `concurrency` sessions run side by side, each sending messages from a
+  shared queue and reconnecting after `max_messages` or a dropped session.
+- A shared rate limiter caps throughput at `rate_per_second` messages
+  across all sessions, so provider sending limits are respected.
+- Every recipient gets a result: {"email", "success", "error"}.
+
+dispatch_messages() is the synchronous entry point used by Celery tasks
+and the campaign service.
+"""
+
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+import aiosmtplib
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+RECONNECT_ERRORS = (aiosmtplib.SMTPServerDisconnected, aiosmtplib.SMTPConnectError, ConnectionError, asyncio.TimeoutError)
+
+
+class _RateLimiter:
+    """Spaces acquisitions at least 1 / rate_per_second seconds apart."""
+
+    def __init__(self, rate_per_second: float):
+        self.interval = 1.0 / rate_per_second if rate_per_second and rate_per_second > 0 else 0
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class AsyncMailDispatcher:
+    """Concurrent, rate-limited bulk sender built on aiosmtplib."""
+
+    def __init__(self, host: str, port: int, user: Optional[str] = None, password: Optional[str] = None,
+                 concurrency: int = 8, rate_per_second: float = 0, max_messages: int = 100,
+                 start_tls: Optional[bool] = True, timeout: int = 30):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.concurrency = max(1, concurrency)
+        self.rate_per_second = rate_per_second
+        self.max_messages = max_messages
+        self.start_tls = start_tls
+        self.timeout = timeout
+
+    async def _connect(self) -> aiosmtplib.SMTP:
+        client = aiosmtplib.SMTP(
+            hostname=self.host,
+            port=self.port,
+            start_tls=self.start_tls,
+            timeout=self.timeout
+        )
+        await client.connect()
+        if self.user and self.password:
+            await client.login(self.user, self.password)
+        return client
+
+    @staticmethod
+    async def _disconnect(client: Optional[aiosmtplib.SMTP]):
+        if client is None:
+            return
+        try:
+            await client.quit()
+        except Exception:
+            client.close()
+
+    async def _worker(self, pending, limiter: _RateLimiter, results: dict):
+        client = None
+        sent_on_client = 0
+        try:
+            while True:
+                # Messages are pulled (and built, for a generator) only when a session is free
+                item = next(pending, None)
+                if item is None:
+                    return
+                index, msg = item
+
+                await limiter.acquire()
+                error = None
+                for attempt in range(2):
+                    try:
+                        if client is None or sent_on_client >= self.max_messages:
+                            await self._disconnect(client)
+                            client = None
+                            client = await self._connect()
+                            sent_on_client = 0
+                        await client.send_message(msg)
+                        sent_on_client += 1
+                        error = None
+                        break
+                    except RECONNECT_ERRORS as e:
+                        # Session dropped; retry this message once on a new connection
+                        error = e
+                        if client is not None:
+                            client.close()
+                        client = None
+                    except Exception as e:
+                        error = e
+                        break
+
+                results[index] = {
+                    "email": msg["To"],
+                    "success": error is None,
+                    "error": str(error) if error else None
+                }
+        finally:
+            await self._disconnect(client)
+
+    async def send_all(self, messages) -> List[dict]:
+        """
+        Send all messages and return one result per message, in input order.
+
+        messages may be any iterable, including a generator; it is consumed
+        lazily by the sessions, so at most `concurrency` messages are held
+        in memory at a time.
+        """
+        pending = enumerate(messages)
+        results = {}
+        limiter = _RateLimiter(self.rate_per_second)
+
+        started = time.monotonic()
+        await asyncio.gather(*(self._worker(pending, limiter, results) for _ in range(self.concurrency)))
+        if not results:
+            return []
+
+        results = [results[index] for index in range(len(results))]
+        sent = sum(1 for r in results if r["success"])
+        logger.info(
+            f"Dispatched {len(results)} emails over {min(self.concurrency, len(results))} sessions in "
+            f"{time.monotonic() - started:.1f}s: {sent} sent, {len(results) - sent} failed"
+        )
+        return results
+
+
+def get_dispatcher() -> AsyncMailDispatcher:
+    """Dispatcher configured from settings."""
+    return AsyncMailDispatcher(
+        settings.SMTP_HOST,
+        settings.SMTP_PORT,
+        settings.SMTP_USER,
+        settings.SMTP_PASSWORD,
+        concurrency=settings.EMAIL_DISPATCH_CONCURRENCY,
+        rate_per_second=settings.EMAIL_DISPATCH_RATE_PER_SECOND,
+        max_messages=settings.SMTP_MAX_MESSAGES_PER_CONNECTION,
+        start_tls=settings.SMTP_STARTTLS
+    )
+
+
+def dispatch_messages(messages, dispatcher: Optional[AsyncMailDispatcher] = None) -> List[dict]:
+    """
+    Send messages concurrently from synchronous code.
+
+    Returns:
+        list: {"email", "success", "error"} per message
+    """
+    dispatcher = dispatcher or get_dispatcher()
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(dispatcher.send_all(messages))
+
+    # Called from inside an event loop: run the batch on its own loop in a thread
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, dispatcher.send_all(messages)).result()
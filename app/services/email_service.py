@@ -1,8 +1,192 @@
 import smtplib
 import logging
+import queue
+import threading
+import time
+from contextlib import contextmanager
 from email.mime.text import MIMEText
 from app.core.config import settings
-from typing import List
+from typing import List, Optional
+
+# Errors after which a connection is dropped and the send retried on a new one
+RECONNECT_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, ConnectionError, TimeoutError)
+
+
+class _PooledConnection:
+    """An authenticated SMTP session plus bookkeeping for reuse."""
+
+    def __init__(self, server: smtplib.SMTP):
+        self.server = server
+        self.messages_sent = 0
+        self.last_used = time.monotonic()
+
+
+class SMTPConnectionPool:
+    """
+    Thread-safe pool of authenticated SMTP connections.
+
+    Connections are opened (STARTTLS + login) on demand, reused across
+    messages and threads, re-checked with NOOP after sitting idle, and
+    recycled after max_messages so providers that cap messages per session
+    are respected. A send that fails because the server dropped the
+    connection is retried once on a fresh connection.
+    """
+
+    def __init__(self, host: str, port: int, user: Optional[str] = None, password: Optional[str] = None,
+                 size: int = 4, max_messages: int = 100, idle_timeout: int = 60):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.size = size
+        self.max_messages = max_messages
+        self.idle_timeout = idle_timeout
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def _open(self) -> _PooledConnection:
+        server = smtplib.SMTP(self.host, self.port, timeout=30)
+        server.starttls()
+        if self.user and self.password:
+            server.login(self.user, self.password)
+        return _PooledConnection(server)
+
+    @staticmethod
+    def _close(connection: _PooledConnection):
+        try:
+            connection.server.quit()
+        except Exception:
+            try:
+                connection.server.close()
+            except Exception:
+                pass
+
+    def _is_alive(self, connection: _PooledConnection) -> bool:
+        if time.monotonic() - connection.last_used < self.idle_timeout:
+            return True
+        try:
+            return connection.server.noop()[0] == 250
+        except Exception:
+            return False
+
+    def _checkout(self) -> _PooledConnection:
+        while True:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                return self._open()
+            if self._is_alive(connection):
+                return connection
+            self._close(connection)
+
+    def _checkin(self, connection: _PooledConnection):
+        connection.last_used = time.monotonic()
+        if connection.messages_sent >= self.max_messages:
+            self._close(connection)
+        else:
+            self._idle.put(connection)
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection; it is returned to the pool unless it failed."""
+        self._slots.acquire()
+        connection = None
+        try:
+            connection = self._checkout()
+            yield connection
+            self._checkin(connection)
+        except Exception:
+            if connection is not None:
+                self._close(connection)
+            raise
+        finally:
+            self._slots.release()
+
+    def _send_on(self, connection: _PooledConnection, msg):
+        connection.server.sendmail(msg["From"], [msg["To"]], msg.as_string())
+        connection.messages_sent += 1
+
+    def send_message(self, msg):
+        """Send one message, reconnecting once if the server dropped the session."""
+        try:
+            with self.connection() as connection:
+                self._send_on(connection, msg)
+        except RECONNECT_ERRORS as e:
+            logging.warning(f"SMTP connection lost ({e}); retrying on a new connection")
+            with self.connection() as connection:
+                self._send_on(connection, msg)
+
+    def send_messages(self, messages) -> List[tuple]:
+        """
+        Send many messages over as few sessions as possible.
+
+        Returns:
+            list: (recipient, error or None) per message
+        """
+        results = []
+        pending = list(messages)
+        while pending:
+            try:
+                with self.connection() as connection:
+                    while pending:
+                        msg = pending[0]
+                        if connection.messages_sent >= self.max_messages:
+                            break  # Check the connection in and continue on a fresh one
+                        try:
+                            self._send_on(connection, msg)
+                            results.append((msg["To"], None))
+                        except RECONNECT_ERRORS:
+                            raise
+                        except Exception as e:
+                            results.append((msg["To"], e))
+                        pending.pop(0)
+            except RECONNECT_ERRORS as e:
+                # The message at the head failed because the session dropped; retry it once
+                msg = pending.pop(0)
+                logging.warning(f"SMTP connection lost ({e}); retrying {msg['To']} on a new connection")
+                try:
+                    self.send_message(msg)
+                    results.append((msg["To"], None))
+                except Exception as retry_error:
+                    results.append((msg["To"], retry_error))
+        return results
+
+    def close(self):
+        """Close all idle connections."""
+        while True:
+            try:
+                self._close(self._idle.get_nowait())
+            except queue.Empty:
+                return
+
+
+_smtp_pool: Optional[SMTPConnectionPool] = None
+_smtp_pool_lock = threading.Lock()
+
+def get_smtp_pool() -> SMTPConnectionPool:
+    """Process-wide SMTP pool, created on first use (after any Celery fork)."""
+    global _smtp_pool
+    if _smtp_pool is None:
+        with _smtp_pool_lock:
+            if _smtp_pool is None:
+                _smtp_pool = SMTPConnectionPool(
+                    settings.SMTP_HOST,
+                    settings.SMTP_PORT,
+                    settings.SMTP_USER,
+                    settings.SMTP_PASSWORD,
+                    size=settings.SMTP_POOL_SIZE,
+                    max_messages=settings.SMTP_MAX_MESSAGES_PER_CONNECTION,
+                    idle_timeout=settings.SMTP_IDLE_TIMEOUT
+                )
+    return _smtp_pool
+
+def build_message(user_email: str, subject: str, body: str) -> MIMEText:
+    """Build a plain-text message from EMAIL_FROM to a single recipient."""
+    msg = MIMEText(body)
+    msg["Subject"] = subject
+    msg["From"] = settings.EMAIL_FROM
+    msg["To"] = user_email
+    return msg
 
 def send_welcome_email(user_email: str, user_name: str):
     """Send welcome email to new user."""
@@ -25,16 +209,7 @@ The LawVriksh Team
 🌐 Visit us: https://www.lawvriksh.com
 💬 Share feedback: https://lawvriksh.com/feedback"""
 
-        msg = MIMEText(body)
-        msg["Subject"] = subject
-        msg["From"] = settings.EMAIL_FROM
-        msg["To"] = user_email
-        
-        with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT) as server:
-            server.starttls()
-            if settings.SMTP_USER and settings.SMTP_PASSWORD:
-                server.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
-            server.sendmail(settings.EMAIL_FROM, [user_email], msg.as_string())
+        get_smtp_pool().send_message(build_message(user_email, subject, body))
         
         logging.info(f"Welcome email sent successfully to {user_email}")
     except Exception as e:
@@ -44,16 +219,7 @@ The LawVriksh Team
 def send_email(user_email: str, subject: str, body: str):
     """Send a generic email to a user."""
     try:
-        msg = MIMEText(body)
-        msg["Subject"] = subject
-        msg["From"] = settings.EMAIL_FROM
-        msg["To"] = user_email
-
-        with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT) as server:
-            server.starttls()
-            if settings.SMTP_USER and settings.SMTP_PASSWORD:
-                server.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
-            server.sendmail(settings.EMAIL_FROM, [user_email], msg.as_string())
+        get_smtp_pool().send_message(build_message(user_email, subject, body))
 
         logging.info(f"Email sent successfully to {user_email}")
         return True
@@ -68,25 +234,16 @@ def send_bulk_email(emails: List[str], subject: str, body: str):
         return
     
     try:
-        msg = MIMEText(body)
-        msg["Subject"] = subject
-        msg["From"] = settings.EMAIL_FROM
-        
-        with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT) as server:
-            server.starttls()
-            if settings.SMTP_USER and settings.SMTP_PASSWORD:
-                server.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
-            
-            for email in emails:
-                try:
-                    msg["To"] = email
-                    server.sendmail(settings.EMAIL_FROM, [email], msg.as_string())
-                    logging.info(f"Bulk email sent successfully to {email}")
-                except Exception as e:
-                    logging.error(f"Failed to send bulk email to {email}: {str(e)}")
-                    continue
-        
-        logging.info(f"Bulk email process completed. Sent to {len(emails)} recipients")
+        from app.services.email_dispatcher import dispatch_messages
+        results = dispatch_messages(build_message(email, subject, body) for email in emails)
+
+        for result in results:
+            if not result["success"]:
+                logging.error(f"Failed to send bulk email to {result['email']}: {result['error']}")
+
+        sent = sum(1 for result in results if result["success"])
+        logging.info(f"Bulk email process completed. Sent to {sent} of {len(emails)} recipients")
+        return results
     except Exception as e:
         logging.error(f"Failed to send bulk email: {str(e)}")
-        raise 
\ No newline at end of file
+        raise
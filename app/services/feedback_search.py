@@ -0,0 +1,124 @@
+"""
+Feedback Search
+===============
+
+Full-text search over the free-text feedback answers, used by the admin
+feedback list and export endpoints.
+
+- MySQL: MATCH ... AGAINST (boolean mode) on the ft_feedback_text
+  FULLTEXT index
+- SQLite: the feedback_fts FTS5 table (maintained by triggers), ranked
+  with bm25()
+
+Every search term is matched as a word prefix, and all terms must match.
+Results are ordered by relevance. Feedback whose user's name or email
+contains the search string also matches (substring ILIKE, as before the
+full-text index existed).
+
+The original substring ILIKE scan is kept as a fallback for databases
+without a full-text index and for searches that the index cannot serve
+(no word characters, or words shorter than MIN_TOKEN_LENGTH).
+"""
+
+import logging
+import re
+from typing import Optional, Tuple
+
+from sqlalchemy import and_, column, func, inspect, literal_column, or_, select, table
+from sqlalchemy.orm import Query, Session
+
+from app.models.feedback import Feedback, FEEDBACK_FULLTEXT_COLUMNS
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+FULLTEXT_INDEX = "ft_feedback_text"
+FTS_TABLE = "feedback_fts"
+# InnoDB ignores shorter words (innodb_ft_min_token_size)
+MIN_TOKEN_LENGTH = 3
+
+# Engine URL -> whether the full-text structures exist
+_fulltext_available = {}
+
+
+def _tokens(search: str) -> list:
+    return re.findall(r"\w+", search, flags=re.UNICODE)
+
+
+def has_fulltext_index(db: Session) -> bool:
+    """Whether the bound database has the full-text index for its dialect (cached per engine)."""
+    bind = db.get_bind()
+    key = str(bind.url)
+    if key not in _fulltext_available:
+        try:
+            inspector = inspect(bind)
+            if bind.dialect.name == "mysql":
+                available = any(index["name"] == FULLTEXT_INDEX for index in inspector.get_indexes("feedback"))
+            elif bind.dialect.name == "sqlite":
+                available = inspector.has_table(FTS_TABLE)
+            else:
+                available = False
+        except Exception as e:
+            logger.warning(f"Could not inspect feedback full-text index: {e}")
+            available = False
+        _fulltext_available[key] = available
+    return _fulltext_available[key]
+
+
+def reset_fulltext_cache():
+    """Forget cached index availability (after migrations or schema resets)."""
+    _fulltext_available.clear()
+
+
+def _mysql_hits(tokens: list):
+    from sqlalchemy.dialects.mysql import match
+    against = " ".join(f"+{token}*" for token in tokens)
+    score = match(*(getattr(Feedback, name) for name in FEEDBACK_FULLTEXT_COLUMNS), against=against).in_boolean_mode()
+    return select(Feedback.id.label("feedback_id"), score.label("score")).where(score > 0).subquery("search_hits")
+
+
+def _sqlite_hits(tokens: list):
+    fts = table(FTS_TABLE, column("rowid"))
+    expression = " ".join('"' + token.replace('"', '""') + '"*' for token in tokens)
+    return select(
+        fts.c.rowid.label("feedback_id"),
+        (-func.bm25(literal_column(FTS_TABLE))).label("score")
+    ).select_from(fts).where(literal_column(FTS_TABLE).op("MATCH")(expression)).subquery("search_hits")
+
+
+def like_search_filter(search: str):
+    """Substring ILIKE filter over the answers and the user's name and email (fallback path)."""
+    return or_(
+        Feedback.monetization_considerations.ilike(f"%{search}%"),
+        Feedback.professional_legacy.ilike(f"%{search}%"),
+        Feedback.platform_impact.ilike(f"%{search}%"),
+        Feedback.biggest_hurdle_other.ilike(f"%{search}%"),
+        User.name.ilike(f"%{search}%"),
+        User.email.ilike(f"%{search}%")
+    )
+
+
+def apply_feedback_search(db: Session, query: Query, search: str) -> Tuple[Query, Optional[object]]:
+    """
+    Filter a feedback query (already outer-joined to User) by a search string.
+
+    Args:
+        db: Database session
+        query: Query over Feedback joined to User
+        search: Search string from the request
+
+    Returns:
+        tuple: (filtered query, relevance column to order by descending, or
+               None when the LIKE fallback was used)
+    """
+    tokens = _tokens(search)
+    dialect = db.get_bind().dialect.name
+    if not tokens or min(len(token) for token in tokens) < MIN_TOKEN_LENGTH or not has_fulltext_index(db):
+        return query.filter(like_search_filter(search)), None
+
+    hits = _mysql_hits(tokens) if dialect == "mysql" else _sqlite_hits(tokens)
+    user_match = or_(User.name.ilike(f"%{search}%"), User.email.ilike(f"%{search}%"))
+    query = query.outerjoin(hits, hits.c.feedback_id == Feedback.id).filter(
+        or_(hits.c.feedback_id.isnot(None), and_(Feedback.user_id.isnot(None), user_match))
+    )
+    return query, func.coalesce(hits.c.score, 0)
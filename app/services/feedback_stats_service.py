@@ -0,0 +1,178 @@
+"""
+Feedback Statistics Service
+===========================
+
+Serves /feedback/stats from a snapshot in diskcache (shared by all
+workers) instead of seven aggregate queries per admin page view.
+
+The snapshot is computed in a single GROUP BY over the four multiple-choice
+answers, with conditional sums for the 7/30-day windows and min/max of
+submitted_at; the per-question breakdowns are folded from those groups.
+
+Each submitted feedback is added to the snapshot in place. It is recomputed
+when missing, when older than FEEDBACK_STATS_RECONCILE_SECONDS (which also
+lets old responses age out of the 7/30-day windows), or on request.
+
+A recompute does not lose or double-count submissions recorded while it
+runs: they are also queued in PENDING_KEY and re-applied to the new
+snapshot unless its query already saw them. The snapshot keeps the ids of
+responses from the last RECENT_SECONDS so each one is counted once.
+"""
+
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.feedback import Feedback
+from app.utils.cache import cache
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_KEY = "feedback_stats:snapshot"
+RECOMPUTE_LOCK_KEY = "feedback_stats:recompute_lock"
+# Number of recomputes in flight, and the submissions recorded meanwhile
+RECOMPUTING_KEY = "feedback_stats:recomputing"
+PENDING_KEY = "feedback_stats:pending"
+RECENT_SECONDS = 300
+
+# Snapshot field -> Feedback column for each per-question breakdown
+BREAKDOWNS = {
+    "by_hurdle": "biggest_hurdle",
+    "by_motivation": "primary_motivation",
+    "by_time_consuming_part": "time_consuming_part",
+    "by_fear": "professional_fear"
+}
+
+
+def compute_feedback_stats(db: Session) -> dict:
+    """
+    Recompute the snapshot from the database in one query.
+
+    Returns:
+        dict: The new snapshot
+    """
+    with cache.transact():
+        cache.set(RECOMPUTING_KEY, cache.get(RECOMPUTING_KEY, default=0) + 1, expire=60)
+
+    try:
+        snapshot = _query_feedback_stats(db)
+    finally:
+        with cache.transact():
+            running = cache.get(RECOMPUTING_KEY, default=1) - 1
+            pending = cache.get(PENDING_KEY, default=[])
+            if running > 0:
+                cache.set(RECOMPUTING_KEY, running, expire=60)
+            else:
+                cache.delete(RECOMPUTING_KEY)
+                cache.delete(PENDING_KEY)
+
+    with cache.transact():
+        for entry in pending:
+            _apply(snapshot, entry)
+        cache.set(SNAPSHOT_KEY, snapshot)
+    logger.info(f"Computed feedback stats: {snapshot['total']} responses")
+    return snapshot
+
+
+def _query_feedback_stats(db: Session) -> dict:
+    """Build a snapshot from the aggregate query (not stored)."""
+    now = datetime.now(timezone.utc)
+    group_columns = [getattr(Feedback, column) for column in BREAKDOWNS.values()]
+
+    rows = db.query(
+        *group_columns,
+        func.count(Feedback.id),
+        func.sum(case((Feedback.submitted_at >= now - timedelta(days=7), 1), else_=0)),
+        func.sum(case((Feedback.submitted_at >= now - timedelta(days=30), 1), else_=0)),
+        func.min(Feedback.submitted_at),
+        func.max(Feedback.submitted_at)
+    ).group_by(*group_columns).all()
+
+    snapshot = {field: {} for field in BREAKDOWNS}
+    snapshot.update(total=0, last_7_days=0, last_30_days=0, first=None, latest=None)
+    for row in rows:
+        answers = row[:len(BREAKDOWNS)]
+        count, last_7, last_30, first, latest = row[len(BREAKDOWNS):]
+        for field, answer in zip(BREAKDOWNS, answers):
+            snapshot[field][answer] = snapshot[field].get(answer, 0) + count
+        snapshot["total"] += count
+        snapshot["last_7_days"] += last_7 or 0
+        snapshot["last_30_days"] += last_30 or 0
+        if first is not None and (snapshot["first"] is None or first < snapshot["first"]):
+            snapshot["first"] = first
+        if latest is not None and (snapshot["latest"] is None or latest > snapshot["latest"]):
+            snapshot["latest"] = latest
+
+    # Read in the same transaction as the aggregates, so these are exactly the recent rows counted
+    snapshot["recent_ids"] = {
+        feedback_id for feedback_id, in db.query(Feedback.id).filter(
+            Feedback.submitted_at >= now - timedelta(seconds=RECENT_SECONDS)
+        )
+    }
+    snapshot["computed_at"] = time.time()
+    return snapshot
+
+
+def get_feedback_stats(db: Session, fresh: bool = False) -> dict:
+    """
+    Get the feedback stats snapshot.
+
+    Args:
+        db: Database session
+        fresh: Recompute from the database instead of using the snapshot
+
+    Returns:
+        dict: total, by_hurdle, by_motivation, by_time_consuming_part, by_fear,
+              last_7_days, last_30_days, first, latest
+    """
+    snapshot = None if fresh else cache.get(SNAPSHOT_KEY)
+    if snapshot is None:
+        return compute_feedback_stats(db)
+
+    if time.time() - snapshot["computed_at"] > settings.FEEDBACK_STATS_RECONCILE_SECONDS:
+        # One worker recomputes; the others keep serving the current snapshot
+        if cache.add(RECOMPUTE_LOCK_KEY, True, expire=60):
+            try:
+                return compute_feedback_stats(db)
+            finally:
+                cache.delete(RECOMPUTE_LOCK_KEY)
+    return snapshot
+
+
+def _apply(snapshot: dict, entry: tuple):
+    """Add one (id, answers, submitted_at) entry to the snapshot unless it is already counted."""
+    feedback_id, answers, submitted_at = entry
+    if feedback_id in snapshot["recent_ids"]:
+        return
+    snapshot["recent_ids"].add(feedback_id)
+    for field, answer in zip(BREAKDOWNS, answers):
+        snapshot[field][answer] = snapshot[field].get(answer, 0) + 1
+    snapshot["total"] += 1
+    snapshot["last_7_days"] += 1
+    snapshot["last_30_days"] += 1
+    if submitted_at is not None:
+        if snapshot["first"] is None:
+            snapshot["first"] = submitted_at
+        snapshot["latest"] = submitted_at
+
+
+def record_feedback_submitted(feedback: Feedback):
+    """Add a newly committed feedback response to the snapshot (blocking; run off the event loop)."""
+    entry = (feedback.id, tuple(getattr(feedback, column) for column in BREAKDOWNS.values()), feedback.submitted_at)
+    try:
+        with cache.transact():
+            if cache.get(RECOMPUTING_KEY):
+                # The recompute re-applies this if its query missed it
+                cache.set(PENDING_KEY, cache.get(PENDING_KEY, default=[]) + [entry], expire=60)
+            snapshot = cache.get(SNAPSHOT_KEY)
+            if snapshot is None:
+                # Nothing to update; the next read computes from the database
+                return
+            _apply(snapshot, entry)
+            cache.set(SNAPSHOT_KEY, snapshot)
+    except Exception as e:
+        logger.error(f"Feedback stats update failed: {e}")
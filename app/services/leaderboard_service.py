@@ -1,27 +1,116 @@
+import hashlib
+import json
 import logging
+from datetime import datetime
+from sqlalchemy import and_, func, or_
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.user import User
-from app.utils.cache import get_leaderboard_cache, set_leaderboard_cache
-from typing import List
+from app.models.share import ScorePeriodEnum, ShareDailyRollup, SharePeriodScore
+from app.services.rollup_service import period_end, period_start, previous_period_start
+from app.schemas.leaderboard import LeaderboardResponse, LeaderboardUser
+from app.utils.cache import get_leaderboard_cache, leaderboard_cache_token, set_leaderboard_cache
+from app.services.rank_index import rank_index, sync_rank_index
+from app.services.counter_service import get_user_counts
+from typing import List, Tuple
 
-def get_leaderboard(db: Session, page: int = 1, limit: int = 50):
-    """Get leaderboard, using cache for efficiency."""
-    try:
-        cached = get_leaderboard_cache(page, limit)
-        if cached:
-            logging.info(f"Leaderboard cache hit for page {page}, limit {limit}")
-            return cached
-        logging.info(f"Leaderboard cache miss for page {page}, limit {limit}")
-    except Exception as e:
-        logging.error(f"Leaderboard cache error: {e}")
-        cached = None
-    # Get users ordered by points (desc) then by created_at (asc) for consistent ranking
-    users = db.query(User).filter(
+def _get_page_users(db: Session, page: int, limit: int):
+    """Fetch one leaderboard page, using the rank index to avoid an OFFSET scan."""
+    start = (page - 1) * limit + 1
+    if sync_rank_index(db):
+        ranked = rank_index.users_in_range(start, start + limit - 1)
+        if not ranked:
+            return []
+        by_id = {u.id: u for u in db.query(User).filter(User.id.in_([user_id for _, user_id, _ in ranked])).all()}
+        return [by_id[user_id] for _, user_id, _ in ranked if user_id in by_id]
+
+    return db.query(User).filter(
         User.is_admin == False
     ).order_by(
         User.total_points.desc(),
-        User.created_at.asc()
-    ).offset((page-1)*limit).limit(limit).all()
+        User.created_at.asc(),
+        User.id.asc()
+    ).offset(start - 1).limit(limit).all()
+
+def _ranked_ahead_of(user: User):
+    """Keyset predicate for users ranked above `user` (points DESC, created_at ASC, id ASC)."""
+    return or_(
+        User.total_points > user.total_points,
+        and_(User.total_points == user.total_points, User.created_at < user.created_at),
+        and_(User.total_points == user.total_points, User.created_at == user.created_at, User.id < user.id)
+    )
+
+def _ranked_behind(user: User):
+    """Keyset predicate for users ranked below `user`."""
+    return or_(
+        User.total_points < user.total_points,
+        and_(User.total_points == user.total_points, User.created_at > user.created_at),
+        and_(User.total_points == user.total_points, User.created_at == user.created_at, User.id > user.id)
+    )
+
+def get_around_me(db: Session, user_id: int, range: int = 5):
+    """
+    Get the users ranked directly above and below a user.
+
+    Only the 2 * range neighbours are loaded: from the rank index when it is
+    available, otherwise with keyset queries on (total_points, created_at, id)
+    that walk the points index outward from the caller. Nothing is written
+    to the rank index here.
+
+    Returns:
+        dict: rank, total_users, neighbours (list of (rank, User)) or None if the user is unknown
+    """
+    user = db.query(User).filter(User.id == user_id).first()
+    if not user:
+        return None
+
+    ranked_users = db.query(User).filter(User.is_admin == False, User.id != user.id)
+    total_users = get_user_counts(db)["non_admin_users"]
+    if user.is_admin:
+        return {"user": user, "rank": None, "total_users": total_users, "neighbours": []}
+
+    if sync_rank_index(db):
+        # Read-only: place the caller without writing to the (possibly shared) index
+        rank = rank_index.rank_for(user.total_points, user.created_at, user.id)
+        indexed_at = rank_index.rank_of(user.id)
+        window = [(rank, user.id)]
+        for r, uid, _ in rank_index.users_in_range(rank - range, rank + range):
+            if uid == user.id:
+                continue
+            # Position among the other users, then around the caller
+            position = r - 1 if indexed_at is not None and r > indexed_at else r
+            final = position if position < rank else position + 1
+            if abs(final - rank) <= range:
+                window.append((final, uid))
+        window.sort()
+        by_id = {u.id: u for u in db.query(User).filter(User.id.in_([uid for _, uid in window])).all()}
+        neighbours = [(r, by_id[uid]) for r, uid in window if uid in by_id]
+        return {"user": user, "rank": rank, "total_users": total_users, "neighbours": neighbours}
+
+    # Exact rank from the (total_points, created_at, id) index; the stored
+    # current_rank may still be waiting for the deferred refresher
+    rank = ranked_users.filter(_ranked_ahead_of(user)).count() + 1
+
+    above = ranked_users.filter(_ranked_ahead_of(user)).order_by(
+        User.total_points.asc(),
+        User.created_at.desc(),
+        User.id.desc()
+    ).limit(range).all()
+    below = ranked_users.filter(_ranked_behind(user)).order_by(
+        User.total_points.desc(),
+        User.created_at.asc(),
+        User.id.asc()
+    ).limit(range).all()
+
+    neighbours = [(rank - i, u) for i, u in enumerate(above, start=1)][::-1]
+    neighbours.append((rank, user))
+    neighbours.extend((rank + i, u) for i, u in enumerate(below, start=1))
+    return {"user": user, "rank": rank, "total_users": total_users, "neighbours": neighbours}
+
+def _build_leaderboard(db: Session, page: int, limit: int) -> List[dict]:
+    """Build the leaderboard rows for one page."""
+    # Get users ordered by points (desc) then by created_at (asc) for consistent ranking
+    users = _get_page_users(db, page, limit)
 
     leaderboard = []
     for idx, u in enumerate(users):
@@ -45,19 +134,184 @@ def get_leaderboard(db: Session, page: int = 1, limit: int = 50):
             "default_rank": u.default_rank,
             "rank_improvement": rank_improvement
         })
+    return leaderboard
+
+def _render_leaderboard_page(db: Session, page: int, limit: int) -> bytes:
+    """Render the full /leaderboard response body for one page."""
+    total_users = get_user_counts(db)["total_users"]
+    response = LeaderboardResponse(
+        leaderboard=[LeaderboardUser(**row) for row in _build_leaderboard(db, page, limit)],
+        pagination={
+            "page": page,
+            "limit": limit,
+            "total": total_users,
+            "pages": (total_users + limit - 1) // limit
+        },
+        metadata={
+            "total_users": total_users,
+            "your_rank": None,  # No user context for public endpoint
+            "your_points": 0    # No user context for public endpoint
+        }
+    )
+    return response.model_dump_json().encode()
+
+def get_leaderboard_page(db: Session, page: int = 1, limit: int = 50) -> Tuple[str, bytes]:
+    """
+    Get the rendered /leaderboard response for one page.
+
+    The whole body (rows, pagination and total count) is cached as bytes in
+    two tiers (this worker's memory, then diskcache), so a hit needs no
+    database query and no serialization. Rank changes invalidate the
+    affected pages; the total count may lag new signups by the cache expiry.
+
+    Returns:
+        tuple: (etag, body)
+    """
     try:
-        set_leaderboard_cache(leaderboard, page, limit)
+        cached = get_leaderboard_cache(page, limit)
+        if cached is not None:
+            logging.info(f"Leaderboard cache hit for page {page}, limit {limit}")
+            return cached
+        logging.info(f"Leaderboard cache miss for page {page}, limit {limit}")
+    except Exception as e:
+        logging.error(f"Leaderboard cache error: {e}")
+
+    # Taken before rendering, so an invalidation during the render is not overwritten
+    token = leaderboard_cache_token(page, limit)
+    body = _render_leaderboard_page(db, page, limit)
+    entry = (f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"', body)
+    try:
+        set_leaderboard_cache(entry, token, page, limit)
     except Exception as e:
         logging.error(f"Leaderboard cache set error: {e}")
-    return leaderboard
+    return entry
+
+async def get_leaderboard_page_async(db: AsyncSession, page: int = 1, limit: int = 50) -> Tuple[str, bytes]:
+    """
+    Async version of get_leaderboard_page.
+
+    Cache hits return without touching the database; misses render the page
+    on the async connection via run_sync.
+    """
+    cached = get_leaderboard_cache(page, limit)
+    if cached is not None:
+        return cached
+    return await db.run_sync(get_leaderboard_page, page, limit)
+
+def get_leaderboard(db: Session, page: int = 1, limit: int = 50) -> List[dict]:
+    """Get leaderboard, using cache for efficiency."""
+    _, body = get_leaderboard_page(db, page, limit)
+    return json.loads(body)["leaderboard"]
 
 def get_user_rank(db: Session, user_id: int):
-    """Get the current rank of a user by user_id."""
+    """Get the current rank of a user by user_id (live from the rank index when available)."""
     try:
+        if sync_rank_index(db):
+            rank = rank_index.rank_of(user_id)
+            if rank is not None:
+                return rank
         user = db.query(User).filter(User.id == user_id).first()
         if user:
             return user.current_rank
         return None
     except Exception as e:
         logging.error(f"Error getting user rank for user_id {user_id}: {e}")
-        return None
\ No newline at end of file
+        return None
+
+def _growth_rate(current: int, previous: int) -> str:
+    """Change in points gained versus the previous period, e.g. "+50%"."""
+    if not previous:
+        return "new" if current else "0%"
+    return f"{round((current - previous) * 100 / previous):+d}%"
+
+def get_top_performers(db: Session, period: str = "weekly", limit: int = 10) -> dict:
+    """
+    Get the top performers for a period.
+
+    daily, weekly (ISO week) and monthly rank users by the points gained in
+    the current period, read from that period's share_period_scores rows;
+    growth_rate compares with the same user's previous period. all-time
+    ranks by total_points. Period stats are summed over non-admin users'
+    share_period_scores rows (every monthly row for all-time), so nothing
+    is aggregated from raw share events and admins are never counted.
+
+    Args:
+        db: Database session
+        period: daily, weekly, monthly or all-time
+        limit: Number of performers to return
+
+    Returns:
+        dict: period, top_performers and period_stats (start_date, end_date,
+              total_points_awarded, active_users)
+    """
+    today = datetime.utcnow().date()
+
+    if period == "all-time":
+        users = [u for u in _get_page_users(db, 1, limit) if u.total_points > 0]
+        performers = [
+            {
+                "rank": i + 1,
+                "user_id": u.id,
+                "name": u.name,
+                "points_gained": u.total_points,
+                "total_points": u.total_points,
+                "growth_rate": "n/a"
+            }
+            for i, u in enumerate(users)
+        ]
+        first_day = db.query(func.min(ShareDailyRollup.date)).scalar()
+        # Every share lands in exactly one monthly row, the coarsest bucket to sum
+        total_points = db.query(func.coalesce(func.sum(SharePeriodScore.points), 0)).join(
+            User, User.id == SharePeriodScore.user_id
+        ).filter(SharePeriodScore.period == ScorePeriodEnum.monthly, User.is_admin == False).scalar()
+        active_users = db.query(func.count(User.id)).filter(User.is_admin == False, User.total_points > 0).scalar()
+        start, end = first_day or today, today
+    else:
+        score_period = ScorePeriodEnum(period)
+        start = period_start(score_period, today)
+        end = period_end(score_period, start)
+        in_period = and_(SharePeriodScore.period == score_period, SharePeriodScore.period_start == start)
+
+        rows = db.query(SharePeriodScore.points, User).join(User, User.id == SharePeriodScore.user_id).filter(
+            in_period,
+            User.is_admin == False
+        ).order_by(
+            SharePeriodScore.points.desc(),
+            SharePeriodScore.last_share_at.asc(),
+            SharePeriodScore.user_id.asc()
+        ).limit(limit).all()
+
+        previous = {}
+        if rows:
+            previous = dict(db.query(SharePeriodScore.user_id, SharePeriodScore.points).filter(
+                SharePeriodScore.period == score_period,
+                SharePeriodScore.period_start == previous_period_start(score_period, start),
+                SharePeriodScore.user_id.in_([u.id for _, u in rows])
+            ).all())
+
+        performers = [
+            {
+                "rank": i + 1,
+                "user_id": u.id,
+                "name": u.name,
+                "points_gained": points,
+                "total_points": u.total_points,
+                "growth_rate": _growth_rate(points, previous.get(u.id, 0))
+            }
+            for i, (points, u) in enumerate(rows)
+        ]
+        active_users, total_points = db.query(
+            func.count(SharePeriodScore.user_id),
+            func.coalesce(func.sum(SharePeriodScore.points), 0)
+        ).join(User, User.id == SharePeriodScore.user_id).filter(in_period, User.is_admin == False).first()
+
+    return {
+        "period": period,
+        "top_performers": performers,
+        "period_stats": {
+            "start_date": start.isoformat(),
+            "end_date": end.isoformat(),
+            "total_points_awarded": total_points,
+            "active_users": active_users
+        }
+    }
@@ -0,0 +1,414 @@
+"""
+Leaderboard Rank Index
+======================
+
+In-memory order-statistic index over non-admin users, ordered exactly like
+the leaderboard: total_points DESC, created_at ASC, id ASC.
+
+Structure:
+- A Fenwick tree over point buckets counts how many users hold each points
+  value, so "users with more points than p" is a prefix-sum query.
+- Each bucket keeps its users sorted by (created_at, id), so the position
+  inside a bucket is a bisect.
+
+Queries ("rank of user X", "users at ranks N..M", "points needed for next
+rank") therefore cost O(log P + log B) instead of a window function over
+the whole users table.
+
+Every gunicorn worker holds its own copy. Point changes are applied locally
+and appended to a short journal in diskcache; other workers replay the
+journal before answering. A background task reloads the index from the
+database when the journal has expired or RANK_INDEX_REFRESH_SECONDS has
+elapsed. Read paths never modify the index; only record_user_points does.
+
+With LEADERBOARD_BACKEND=redis the index is a Redis sorted set shared by
+every node instead (see redis_rank_index); the functions below keep the
+same contract for both backends.
+"""
+
+import asyncio
+import bisect
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.user import User
+from app.utils.cache import cache
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_SEQ_KEY = "rank_index:seq"
+# How often the background reloader checks whether a reload is due
+RELOAD_POLL_SECONDS = 1
+JOURNAL_EVENT_KEY = "rank_index:event:{}"
+
+# Tie-break key used when a row has no created_at yet
+_MISSING_CREATED = float("inf")
+
+
+def _created_key(created_at: Optional[datetime]) -> float:
+    """Convert created_at to a sortable float (earlier registration sorts first)."""
+    if created_at is None:
+        return _MISSING_CREATED
+    return created_at.timestamp()
+
+
+class _FenwickTree:
+    """Binary indexed tree over non-negative integer positions."""
+
+    def __init__(self, size: int = 64):
+        self.size = size
+        self.tree = [0] * (size + 1)
+
+    def add(self, position: int, delta: int):
+        i = position + 1
+        while i <= self.size:
+            self.tree[i] += delta
+            i += i & -i
+
+    def prefix_sum(self, position: int) -> int:
+        """Sum of counts at positions 0..position (inclusive)."""
+        if position < 0:
+            return 0
+        i = min(position, self.size - 1) + 1
+        total = 0
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+    def find_kth(self, k: int) -> int:
+        """Smallest position whose prefix sum is >= k (k is 1-based)."""
+        position = 0
+        step = 1 << self.size.bit_length()
+        while step:
+            nxt = position + step
+            if nxt <= self.size and self.tree[nxt] < k:
+                position = nxt
+                k -= self.tree[nxt]
+            step >>= 1
+        return position
+
+
+class RankIndex:
+    """Thread-safe order-statistic index keyed by (-total_points, created_at, id)."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.reset()
+
+    def reset(self):
+        """Drop all entries and mark the index as not loaded."""
+        with self._lock:
+            self._entries: Dict[int, Tuple[int, float]] = {}
+            self._buckets: Dict[int, List[Tuple[float, int]]] = {}
+            self._tree = _FenwickTree()
+            self.loaded = False
+            self.loaded_at = 0.0
+            self.journal_seq = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, user_id: int) -> bool:
+        return user_id in self._entries
+
+    def _grow(self, points: int):
+        size = self._tree.size
+        while points >= size:
+            size *= 2
+        tree = _FenwickTree(size)
+        for bucket_points, bucket in self._buckets.items():
+            if bucket:
+                tree.add(bucket_points, len(bucket))
+        self._tree = tree
+
+    def _insert(self, user_id: int, points: int, created: float):
+        points = max(0, points)
+        if points >= self._tree.size:
+            self._grow(points)
+        bisect.insort(self._buckets.setdefault(points, []), (created, user_id))
+        self._tree.add(points, 1)
+        self._entries[user_id] = (points, created)
+
+    def _delete(self, user_id: int):
+        points, created = self._entries.pop(user_id)
+        bucket = self._buckets[points]
+        i = bisect.bisect_left(bucket, (created, user_id))
+        if i < len(bucket) and bucket[i] == (created, user_id):
+            bucket.pop(i)
+        self._tree.add(points, -1)
+
+    def _count_above(self, points: int) -> int:
+        """Number of users with strictly more than `points` points."""
+        return len(self._entries) - self._tree.prefix_sum(points)
+
+    def upsert(self, user_id: int, points: int, created_at: Optional[datetime]):
+        """Insert a user or move them to a new points value."""
+        with self._lock:
+            if user_id in self._entries:
+                self._delete(user_id)
+            self._insert(user_id, points, _created_key(created_at))
+
+    def remove(self, user_id: int):
+        """Remove a user (e.g. after promotion to admin)."""
+        with self._lock:
+            if user_id in self._entries:
+                self._delete(user_id)
+
+    def rank_for(self, points: int, created_at: Optional[datetime], user_id: int) -> int:
+        """1-based rank a user would hold with the given points, ignoring their current entry."""
+        created = _created_key(created_at)
+        with self._lock:
+            ahead = self._count_above(points)
+            bucket = self._buckets.get(points, [])
+            ahead += bisect.bisect_left(bucket, (created, user_id))
+            current = self._entries.get(user_id)
+            if current is not None and (current[0] > points or (current[0] == points and current[1] < created)):
+                ahead -= 1
+            return ahead + 1
+
+    def rank_of(self, user_id: int) -> Optional[int]:
+        """1-based rank of a user, or None if they are not indexed."""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            points, created = entry
+            bucket = self._buckets[points]
+            return self._count_above(points) + bisect.bisect_left(bucket, (created, user_id)) + 1
+
+    def users_in_range(self, start: int, end: int) -> List[Tuple[int, int, int]]:
+        """Return (rank, user_id, points) for ranks start..end inclusive."""
+        results = []
+        with self._lock:
+            total = len(self._entries)
+            start = max(1, start)
+            end = min(end, total)
+            rank = start
+            while rank <= end:
+                # k-th from the top is the (total - k + 1)-th from the bottom
+                points = self._tree.find_kth(total - rank + 1)
+                bucket = self._buckets[points]
+                offset = rank - self._count_above(points) - 1
+                for created, user_id in bucket[offset:offset + (end - rank + 1)]:
+                    results.append((rank, user_id, points))
+                    rank += 1
+        return results
+
+    def user_at_rank(self, rank: int) -> Optional[Tuple[int, int, int]]:
+        """Return (rank, user_id, points) for a single rank."""
+        found = self.users_in_range(rank, rank)
+        return found[0] if found else None
+
+    def points_to_next_rank(self, user_id: int) -> int:
+        """Points the user needs to overtake the user directly above them."""
+        with self._lock:
+            rank = self.rank_of(user_id)
+            if not rank or rank <= 1:
+                return 0
+            above = self.user_at_rank(rank - 1)
+            points = self._entries[user_id][0]
+            return max(0, above[2] - points + 1) if above else 0
+
+    def load(self, rows, journal_seq: int = 0):
+        """Rebuild the index from (id, total_points, created_at) rows."""
+        with self._lock:
+            self.reset()
+            for user_id, points, created_at in rows:
+                self._insert(user_id, points or 0, _created_key(created_at))
+            self.loaded = True
+            self.loaded_at = time.monotonic()
+            self.journal_seq = journal_seq
+
+
+def _create_rank_index():
+    if settings.LEADERBOARD_BACKEND == "redis":
+        from app.services.redis_rank_index import RedisRankIndex, create_redis_client
+        return RedisRankIndex(create_redis_client(settings.LEADERBOARD_REDIS_URL))
+    return RankIndex()
+
+
+# Process-wide index instance (a handle on the shared ZSET with the Redis backend)
+rank_index = _create_rank_index()
+
+
+# Whether run_rank_index_reloader is active in this process
+_reloader = {"running": False}
+
+
+def _shared_index() -> bool:
+    """Whether the index lives in Redis rather than in this worker's memory."""
+    return not isinstance(rank_index, RankIndex)
+
+
+def _current_journal_seq() -> int:
+    try:
+        return int(cache.get(JOURNAL_SEQ_KEY, default=0))
+    except Exception as e:
+        logger.error(f"Rank index journal read error: {e}")
+        return 0
+
+
+def load_rank_index(db: Session):
+    """Load the rank index from the database."""
+    started = time.monotonic()
+    journal_seq = _current_journal_seq()
+    # Read every row before touching the index, so readers are not blocked on the query
+    rows = db.query(User.id, User.total_points, User.created_at).filter(
+        User.is_admin == False
+    ).all()
+    if _shared_index():
+        rank_index.load(rows)
+    else:
+        rank_index.load(rows, journal_seq)
+    logger.info(f"Loaded rank index with {len(rank_index)} users in {time.monotonic() - started:.3f}s")
+
+
+def _reload_due() -> bool:
+    """Whether the index is missing or older than RANK_INDEX_REFRESH_SECONDS."""
+    if _shared_index():
+        return not rank_index.loaded
+    return not rank_index.loaded or time.monotonic() - rank_index.loaded_at > settings.RANK_INDEX_REFRESH_SECONDS
+
+
+def reload_rank_index_if_due(db: Session) -> bool:
+    """
+    Reload the index from the database when it is missing or due for reconciliation.
+
+    With the Redis backend only one node reloads at a time.
+
+    Returns:
+        bool: True if a reload ran
+    """
+    if not _reload_due():
+        return False
+    if _shared_index():
+        if not rank_index.acquire_reload():
+            return False
+        try:
+            load_rank_index(db)
+        finally:
+            rank_index.release_reload()
+    else:
+        load_rank_index(db)
+    return True
+
+
+def _replay_journal() -> bool:
+    """Apply journal events written by other workers; False if the journal has a gap."""
+    latest = _current_journal_seq()
+    seq = rank_index.journal_seq
+    while seq < latest:
+        seq += 1
+        event = cache.get(JOURNAL_EVENT_KEY.format(seq))
+        if event is None:
+            return False
+        user_id, points, created_at = event
+        if points is None:
+            rank_index.remove(user_id)
+        else:
+            rank_index.upsert(user_id, points, created_at)
+        rank_index.journal_seq = seq
+    return True
+
+
+def sync_rank_index(db: Session) -> bool:
+    """
+    Bring this worker's index up to date.
+
+    Replays journal events written by other workers. Full reloads from the
+    database (index missing, too old, or the journal has gaps) are left to
+    the background reloader in processes that run it (the API workers), so
+    a request never reads the whole users table; until then the caller
+    falls back to SQL. Other processes (scripts, Celery workers, tests)
+    reload on demand.
+
+    Returns:
+        bool: True if the index can be used
+    """
+    if not settings.RANK_INDEX_ENABLED:
+        return False
+    try:
+        if not _reloader["running"]:
+            reload_rank_index_if_due(db)
+
+        if _shared_index():
+            return rank_index.exists()
+
+        if not rank_index.loaded:
+            return False
+        if not _replay_journal():
+            # Journal entry expired before we saw it; the index must be reloaded
+            logger.warning("Rank index journal has a gap; reloading from the database")
+            rank_index.loaded = False
+            if _reloader["running"]:
+                return False
+            load_rank_index(db)
+        return True
+    except Exception as e:
+        logger.error(f"Rank index sync failed: {e}")
+        return False
+
+
+def _reload_with_new_session():
+    from app.core.dependencies import SessionLocal
+    db = SessionLocal()
+    try:
+        reload_rank_index_if_due(db)
+    finally:
+        db.close()
+
+
+async def run_rank_index_reloader():
+    """Reload the index in the background whenever it is missing or due, until cancelled."""
+    _reloader["running"] = True
+    try:
+        while True:
+            try:
+                if _reload_due():
+                    await asyncio.to_thread(_reload_with_new_session)
+            except Exception as e:
+                logger.error(f"Rank index reload failed: {e}")
+            await asyncio.sleep(RELOAD_POLL_SECONDS)
+    finally:
+        _reloader["running"] = False
+
+
+def record_user_points(user_id: int, points: Optional[int], created_at: Optional[datetime] = None):
+    """
+    Apply a points change locally and publish it to the other workers.
+
+    Pass points=None to remove the user from the index.
+    """
+    if not settings.RANK_INDEX_ENABLED:
+        return
+    try:
+        if _shared_index():
+            if points is None:
+                rank_index.remove(user_id)
+            else:
+                rank_index.upsert(user_id, points, created_at)
+            return
+
+        if rank_index.loaded:
+            if points is None:
+                rank_index.remove(user_id)
+            else:
+                rank_index.upsert(user_id, points, created_at)
+        seq = cache.incr(JOURNAL_SEQ_KEY)
+        cache.set(
+            JOURNAL_EVENT_KEY.format(seq),
+            (user_id, points, created_at),
+            expire=settings.RANK_INDEX_REFRESH_SECONDS * 2
+        )
+        # Our own event is already applied; skip it on the next sync
+        if rank_index.loaded and rank_index.journal_seq == seq - 1:
+            rank_index.journal_seq = seq
+    except Exception as e:
+        logger.error(f"Rank index update failed for user {user_id}: {e}")
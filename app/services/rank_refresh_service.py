@@ -0,0 +1,161 @@
+"""
+Rank Refresh Service
+====================
+
+Takes stored rank maintenance out of the share request. In deferred mode
+(RANK_REFRESH_MODE=deferred) a share only marks its user dirty in
+diskcache (shared by all workers) and returns; a background refresher
+drains the dirty set every RANK_REFRESH_INTERVAL_MS and applies one
+batched rank update per window.
+
+- The dirty set maps user_id -> (points before the first unrefreshed gain,
+  time marked). A burst of shares by the same user coalesces into one
+  entry.
+- A drain renumbers the single points band that covers every dirty user's
+  movement (refresh_rank_range) and invalidates the leaderboard pages for
+  that band once, whether or not any stored rank changed.
+- Stored ranks are at most RANK_REFRESH_MAX_STALENESS_MS old: if the
+  refresher falls behind, the next share drains the set itself.
+
+Shares are only deferred in processes where the refresher is running (the
+API workers); scripts, Celery workers and tests keep the inline path. The
+in-memory rank index, which serves the share response and the leaderboard,
+is still updated inside the request.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.user import User
+from app.utils.cache import cache, invalidate_leaderboard_cache
+
+logger = logging.getLogger(__name__)
+
+DIRTY_KEY = "rank_refresh:dirty"
+DRAIN_LOCK_KEY = "rank_refresh:drain_lock"
+
+# Whether run_rank_refresher is active in this process
+_refresher = {"running": False}
+
+
+def rank_refresh_deferred() -> bool:
+    """Whether shares in this process should queue rank updates for the refresher."""
+    return settings.RANK_REFRESH_MODE == "deferred" and _refresher["running"]
+
+
+def _merge(dirty: dict, entries: dict):
+    """Merge entries into dirty, keeping the lowest old points and earliest mark."""
+    for user_id, (old_points, marked_at) in entries.items():
+        current = dirty.get(user_id)
+        if current is None:
+            dirty[user_id] = (old_points, marked_at)
+        else:
+            dirty[user_id] = (min(current[0], old_points), min(current[1], marked_at))
+
+
+def mark_rank_dirty(user_id: int, old_points: int):
+    """
+    Queue a user whose points went up for the next rank refresh.
+
+    Args:
+        user_id: User that gained points
+        old_points: The user's points before the gain
+    """
+    with cache.transact():
+        dirty = cache.get(DIRTY_KEY, default={})
+        _merge(dirty, {user_id: (old_points, time.time())})
+        cache.set(DIRTY_KEY, dirty)
+
+
+def oldest_dirty_age() -> Optional[float]:
+    """Seconds since the oldest unrefreshed mark, or None when nothing is queued."""
+    dirty = cache.get(DIRTY_KEY)
+    if not dirty:
+        return None
+    return time.time() - min(marked_at for _, marked_at in dirty.values())
+
+
+def drain_dirty_ranks(db: Session) -> dict:
+    """
+    Apply one batched rank update for every queued user.
+
+    Only one worker drains at a time; a concurrent call returns immediately.
+    If the update fails, the drained entries are put back in the queue.
+
+    Returns:
+        dict: users (drained), changed (ranks written) and skipped (another
+              worker holds the drain lock)
+    """
+    if not cache.add(DRAIN_LOCK_KEY, True, expire=60):
+        return {"users": 0, "changed": 0, "skipped": True}
+
+    try:
+        with cache.transact():
+            dirty = cache.get(DIRTY_KEY, default={})
+            cache.delete(DIRTY_KEY)
+        if not dirty:
+            return {"users": 0, "changed": 0, "skipped": False}
+
+        try:
+            from app.services.ranking_service import refresh_rank_range
+            low = min(old_points for old_points, _ in dirty.values())
+            high = db.query(func.max(User.total_points)).filter(User.id.in_(list(dirty))).scalar() or 0
+            result = refresh_rank_range(db, low, high)
+        except Exception:
+            db.rollback()
+            with cache.transact():
+                requeued = cache.get(DIRTY_KEY, default={})
+                _merge(requeued, dirty)
+                cache.set(DIRTY_KEY, requeued)
+            raise
+
+        # Cached pages show points as well as ranks, so drop them even when no rank moved
+        if result["first_rank"] is not None:
+            invalidate_leaderboard_cache(result["first_rank"], result["last_rank"])
+        else:
+            invalidate_leaderboard_cache()
+        logger.info(f"Rank refresh: {len(dirty)} dirty users, {result['changed']} ranks updated")
+        return {"users": len(dirty), "changed": result["changed"], "skipped": False}
+    finally:
+        cache.delete(DRAIN_LOCK_KEY)
+
+
+def refresh_if_stale(db: Session):
+    """Drain the queue now if its oldest entry exceeds RANK_REFRESH_MAX_STALENESS_MS."""
+    age = oldest_dirty_age()
+    if age is not None and age * 1000 >= settings.RANK_REFRESH_MAX_STALENESS_MS:
+        try:
+            drain_dirty_ranks(db)
+        except Exception as e:
+            logger.error(f"Inline rank refresh failed: {e}")
+
+
+def _drain_with_new_session() -> dict:
+    from app.core.dependencies import SessionLocal
+    db = SessionLocal()
+    try:
+        return drain_dirty_ranks(db)
+    finally:
+        db.close()
+
+
+async def run_rank_refresher():
+    """Drain the dirty set every RANK_REFRESH_INTERVAL_MS until cancelled."""
+    interval = settings.RANK_REFRESH_INTERVAL_MS / 1000
+    _refresher["running"] = True
+    try:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if cache.get(DIRTY_KEY):
+                    await asyncio.to_thread(_drain_with_new_session)
+            except Exception as e:
+                logger.error(f"Rank refresh failed: {e}")
+    finally:
+        _refresher["running"] = False
@@ -13,10 +13,14 @@ Logic:
 - Users with same points are ranked by registration order (earlier = better rank)
 """
 
+from typing import Callable, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import text, desc, asc
+from sqlalchemy import and_, func, not_, or_, text
+from app.core.config import settings
 from app.models.user import User
 from app.utils.cache import invalidate_leaderboard_cache
+from app.services.rank_index import rank_index, sync_rank_index
+from app.services.counter_service import get_user_counts
 import logging
 
 logger = logging.getLogger(__name__)
@@ -34,7 +38,7 @@ def assign_default_rank(db: Session, user_id: int) -> int:
     """
     try:
         # Count total non-admin users (including the new user)
-        total_users = db.query(User).filter(User.is_admin == False).count()
+        total_users = get_user_counts(db)["non_admin_users"]
         
         # The new user gets rank equal to total users count
         default_rank = total_users
@@ -85,7 +89,13 @@ def calculate_dynamic_rank(db: Session, user_id: int) -> int:
         # If user has 0 points, return their default rank
         if user.total_points == 0:
             return user.default_rank or 1
-        
+
+        # Answer from the in-memory rank index when available
+        if sync_rank_index(db):
+            dynamic_rank = rank_index.rank_for(user.total_points, user.created_at, user.id)
+            logger.info(f"Calculated dynamic rank {dynamic_rank} for user {user_id} (points: {user.total_points}, index)")
+            return dynamic_rank
+
         # Calculate rank based on points and registration order
         result = db.execute(text("""
             SELECT rank_val FROM (
@@ -111,13 +121,15 @@ def calculate_dynamic_rank(db: Session, user_id: int) -> int:
         logger.error(f"Error calculating dynamic rank for user {user_id}: {e}")
         return 1
 
-def update_user_rank(db: Session, user_id: int) -> int:
+def update_user_rank(db: Session, user_id: int, previous_rank: Optional[int] = None) -> int:
     """
     Update user's current rank after point changes.
     
     Args:
         db: Database session
         user_id: ID of the user to update rank for
+        previous_rank: Leaderboard position before the change, if known; only
+            the cached pages between the old and new position are invalidated
         
     Returns:
         int: The updated current rank
@@ -133,8 +145,11 @@ def update_user_rank(db: Session, user_id: int) -> int:
             user.current_rank = new_rank
             db.commit()
             
-            # Invalidate leaderboard cache
-            invalidate_leaderboard_cache()
+            # Users between the old and new position shift by one; other pages are unaffected
+            if previous_rank is not None:
+                invalidate_leaderboard_cache(new_rank, previous_rank)
+            else:
+                invalidate_leaderboard_cache()
             
             logger.info(f"Updated user {user_id} rank: {old_rank} → {new_rank}")
             return new_rank
@@ -146,38 +161,270 @@ def update_user_rank(db: Session, user_id: int) -> int:
         db.rollback()
         return 1
 
-def update_all_ranks(db: Session):
+def _ahead_of(points: int, created_at, user_id: int):
+    """Users ordered before (points, created_at, id) on the leaderboard."""
+    return or_(
+        User.total_points > points,
+        and_(
+            User.total_points == points,
+            or_(User.created_at < created_at, and_(User.created_at == created_at, User.id < user_id))
+        )
+    )
+
+def apply_points_gain(db: Session, user: User, old_points: int) -> int:
+    """
+    Keep every stored current_rank correct after a user gains points.
+
+    A user moving from rank a up to rank b overtakes exactly the users ranked
+    in [b, a); each of them moves down by one. That bounded range is shifted
+    with one UPDATE (an index range on total_points between the old and new
+    points), and the user's own current_rank is set to b. Users with 0 points
+    keep their default rank and are not shifted.
+
+    Runs inside the caller's transaction and does not commit, so the shift is
+    atomic with the share that caused it. user.total_points must already hold
+    the new value.
+
+    Args:
+        db: Database session
+        user: The user, with the new total_points
+        old_points: total_points before the gain
+
+    Returns:
+        int: The user's new rank
+    """
+    new_points = user.total_points
+    if new_points <= old_points:
+        return user.current_rank
+
+    overtaken = and_(
+        User.is_admin == False,
+        User.id != user.id,
+        User.total_points > 0,
+        User.total_points.between(old_points, new_points),
+        _ahead_of(old_points, user.created_at, user.id),
+        not_(_ahead_of(new_points, user.created_at, user.id))
+    )
+    shifted = db.query(User).filter(overtaken).update(
+        {User.current_rank: User.current_rank + 1},
+        synchronize_session=False
+    )
+
+    if sync_rank_index(db):
+        # The index still holds the committed (old) points; rank_for ignores the user's own entry
+        new_rank = rank_index.rank_for(new_points, user.created_at, user.id)
+    elif old_points > 0 and user.current_rank:
+        new_rank = user.current_rank - shifted
+    else:
+        new_rank = 1 + db.query(func.count(User.id)).filter(
+            User.is_admin == False,
+            User.id != user.id,
+            _ahead_of(new_points, user.created_at, user.id)
+        ).scalar()
+
+    old_rank = user.current_rank
+    user.current_rank = new_rank
+    logger.info(f"User {user.id} rank {old_rank} → {new_rank}, shifted {shifted} overtaken users")
+    return new_rank
+
+# Rank of every non-admin user: points DESC, registration order ASC.
+# Users with 0 points keep their default rank (registration order).
+RANK_REBUILD_SELECT = """
+    SELECT id, CASE WHEN total_points = 0 THEN COALESCE(default_rank, rank_val) ELSE rank_val END
+    FROM (
+        SELECT
+            id,
+            total_points,
+            default_rank,
+            ROW_NUMBER() OVER (
+                ORDER BY
+                    total_points DESC,
+                    created_at ASC,
+                    id ASC
+            ) as rank_val
+        FROM users
+        WHERE is_admin = FALSE
+    ) as ranked
+"""
+
+# Ranks for the non-admin users within a points band, offset by the users above it.
+RANK_RANGE_SELECT = """
+    SELECT
+        id as user_id,
+        :offset + ROW_NUMBER() OVER (
+            ORDER BY
+                total_points DESC,
+                created_at ASC,
+                id ASC
+        ) as new_rank
+    FROM users
+    WHERE is_admin = FALSE
+    AND total_points BETWEEN :low AND :high
+"""
+
+def refresh_rank_range(db: Session, low_points: int, high_points: int) -> dict:
+    """
+    Recompute stored ranks for users whose points lie in [low_points, high_points].
+
+    When every user that gained points since the last refresh started at or
+    above low_points and ended at or below high_points, the ranks of users
+    outside that band are unchanged; the band is renumbered with one
+    set-based UPDATE, offset by the number of users above it. Users with 0
+    points keep their default rank.
+
+    Args:
+        db: Database session (committed by this function)
+        low_points: Lowest points any moved user had before gaining
+        high_points: Highest points any moved user has now
+
+    Returns:
+        dict: changed, first_rank and last_rank of the renumbered band
+              (ranks are None when the band is empty)
+    """
+    low_points = max(low_points, 1)
+    dialect = db.get_bind().dialect.name
+    if dialect == "mysql":
+        update = text(f"""
+            UPDATE users JOIN ({RANK_RANGE_SELECT}) r ON r.user_id = users.id
+            SET users.current_rank = r.new_rank
+            WHERE NOT (users.current_rank <=> r.new_rank)
+        """)
+    elif dialect == "sqlite":
+        update = text(f"""
+            UPDATE users SET current_rank = r.new_rank
+            FROM ({RANK_RANGE_SELECT}) r
+            WHERE r.user_id = users.id
+            AND users.current_rank IS NOT r.new_rank
+        """)
+    else:
+        raise NotImplementedError(f"Rank range refresh is not supported on {dialect}")
+
+    offset = db.query(func.count(User.id)).filter(
+        User.is_admin == False,
+        User.total_points > high_points
+    ).scalar()
+    in_band = db.query(func.count(User.id)).filter(
+        User.is_admin == False,
+        User.total_points.between(low_points, high_points)
+    ).scalar()
+
+    changed = db.execute(update, {"offset": offset, "low": low_points, "high": high_points}).rowcount
+    db.commit()
+    return {
+        "changed": changed,
+        "first_rank": offset + 1 if in_band else None,
+        "last_rank": offset + in_band if in_band else None
+    }
+
+def _rank_update_statement(dialect: str):
+    """Batched UPDATE of users.current_rank from the rank_rebuild table, skipping unchanged rows."""
+    if dialect == "mysql":
+        return text("""
+            UPDATE users JOIN rank_rebuild r ON r.user_id = users.id
+            SET users.current_rank = r.new_rank
+            WHERE r.user_id BETWEEN :low AND :high
+            AND NOT (users.current_rank <=> r.new_rank)
+        """)
+    if dialect == "sqlite":
+        return text("""
+            UPDATE users SET current_rank = r.new_rank
+            FROM rank_rebuild r
+            WHERE r.user_id = users.id
+            AND r.user_id BETWEEN :low AND :high
+            AND users.current_rank IS NOT r.new_rank
+        """)
+    raise NotImplementedError(f"Set-based rank rebuild is not supported on {dialect}")
+
+def update_all_ranks(
+    db: Session,
+    batch_size: Optional[int] = None,
+    dry_run: bool = False,
+    progress: Optional[Callable[[int, int], None]] = None
+) -> dict:
     """
     Recalculate and update ranks for all users.
     This should be called after any major changes.
+
+    Ranks are computed in the database with ROW_NUMBER() into a temporary
+    rank_rebuild table, then applied with UPDATE ... JOIN (UPDATE ... FROM
+    on SQLite) in user id ranges of batch_size, one transaction per batch.
+    Only rows whose rank changes are written, and no user rows are loaded
+    into Python.
+
+    Args:
+        db: Database session (its bound engine is used for the rebuild)
+        batch_size: Users per UPDATE batch (default RANK_REBUILD_BATCH_SIZE)
+        dry_run: Only report what would change
+        progress: Called with (users_processed, total_users) after each batch
+
+    Returns:
+        dict: users, changed, batches, dry_run and, for dry runs, a sample of
+              up to 20 {"user_id", "old_rank", "new_rank"} changes
     """
+    batch_size = batch_size or settings.RANK_REBUILD_BATCH_SIZE
+    engine = db.get_bind()
+    dialect = engine.dialect.name
+    null_safe_differs = "NOT (u.current_rank <=> r.new_rank)" if dialect == "mysql" else "u.current_rank IS NOT r.new_rank"
+
     try:
-        logger.info("Starting bulk rank update for all users")
-        
-        # Get all non-admin users ordered by points (desc) and created_at (asc)
-        users = db.query(User).filter(
-            User.is_admin == False
-        ).order_by(
-            desc(User.total_points),
-            asc(User.created_at)
-        ).all()
-        
-        # Update ranks
-        for rank, user in enumerate(users, 1):
-            # Users with 0 points keep their default rank
-            if user.total_points == 0:
-                user.current_rank = user.default_rank or rank
-            else:
-                user.current_rank = rank
-        
+        logger.info(f"Starting bulk rank update for all users{' (dry run)' if dry_run else ''}")
+        # Pending changes in the caller's session must be visible to the rebuild connection
         db.commit()
-        invalidate_leaderboard_cache()
-        
-        logger.info(f"Updated ranks for {len(users)} users")
-        
+
+        with engine.connect() as conn:
+            with conn.begin():
+                conn.execute(text("DROP TEMPORARY TABLE IF EXISTS rank_rebuild" if dialect == "mysql" else "DROP TABLE IF EXISTS temp.rank_rebuild"))
+                conn.execute(text("CREATE TEMPORARY TABLE rank_rebuild (user_id INTEGER PRIMARY KEY, new_rank INTEGER NOT NULL)"))
+                conn.execute(text(f"INSERT INTO rank_rebuild (user_id, new_rank) {RANK_REBUILD_SELECT}"))
+                total, low_id, high_id = conn.execute(text(
+                    "SELECT COUNT(*), MIN(user_id), MAX(user_id) FROM rank_rebuild"
+                )).first()
+
+            result = {"users": total, "changed": 0, "batches": 0, "dry_run": dry_run}
+            try:
+                if dry_run:
+                    diff = f"FROM rank_rebuild r JOIN users u ON u.id = r.user_id WHERE {null_safe_differs}"
+                    result["changed"] = conn.execute(text(f"SELECT COUNT(*) {diff}")).scalar()
+                    result["sample"] = [
+                        {"user_id": user_id, "old_rank": old_rank, "new_rank": new_rank}
+                        for user_id, old_rank, new_rank in conn.execute(text(
+                            f"SELECT r.user_id, u.current_rank, r.new_rank {diff} ORDER BY r.new_rank LIMIT 20"
+                        ))
+                    ]
+                    conn.rollback()
+                elif total:
+                    update = _rank_update_statement(dialect)
+                    processed = 0
+                    for low in range(low_id, high_id + 1, batch_size):
+                        high = low + batch_size - 1
+                        with conn.begin():
+                            result["changed"] += conn.execute(update, {"low": low, "high": high}).rowcount
+                            processed += conn.execute(text(
+                                "SELECT COUNT(*) FROM rank_rebuild WHERE user_id BETWEEN :low AND :high"
+                            ), {"low": low, "high": high}).scalar()
+                        result["batches"] += 1
+                        if progress:
+                            progress(processed, total)
+            finally:
+                with conn.begin():
+                    conn.execute(text("DROP TEMPORARY TABLE IF EXISTS rank_rebuild" if dialect == "mysql" else "DROP TABLE IF EXISTS temp.rank_rebuild"))
+
+        if not dry_run:
+            # Ranks were written on another connection
+            db.expire_all()
+            if result["changed"]:
+                invalidate_leaderboard_cache()
+
+        logger.info(
+            f"{'Would update' if dry_run else 'Updated'} ranks for {result['changed']} of {total} users"
+            f" in {result['batches']} batches"
+        )
+        return result
+
     except Exception as e:
         logger.error(f"Error in bulk rank update: {e}")
         db.rollback()
+        return {"error": str(e)}
 
 def get_user_rank_info(db: Session, user_id: int) -> dict:
     """
@@ -196,33 +443,42 @@ def get_user_rank_info(db: Session, user_id: int) -> dict:
             return {"error": "User not found"}
         
         # Get total users for percentile calculation
-        total_users = db.query(User).filter(User.is_admin == False).count()
-        
+        total_users = get_user_counts(db)["non_admin_users"]
+
+        # Prefer the rank index, which reflects live ordering rather than stored ranks
+        # (stored ranks trail shares while the rank refresher is deferring them)
+        current_rank = user.current_rank
+        use_index = bool(user.total_points) and sync_rank_index(db)
+        if use_index:
+            # Read-only: a user this worker has not indexed yet is placed without writing
+            current_rank = rank_index.rank_for(user.total_points, user.created_at, user.id)
+
         # Calculate percentile
         percentile = 0
-        if total_users > 0 and user.current_rank:
-            percentile = ((total_users - user.current_rank + 1) / total_users) * 100
-        
-        # Get next rank info (user with better rank)
-        next_rank_target = (user.current_rank - 1) if user.current_rank and user.current_rank > 1 else None
-        next_rank_user = None
-        if next_rank_target:
+        if total_users > 0 and current_rank:
+            percentile = ((total_users - current_rank + 1) / total_users) * 100
+
+        points_to_next_rank = 0
+        if use_index:
+            above = rank_index.user_at_rank(current_rank - 1) if current_rank > 1 else None
+            if above:
+                points_to_next_rank = max(0, above[2] - user.total_points + 1)
+        elif current_rank and current_rank > 1:
+            # Get next rank info (user with better rank)
             next_rank_user = db.query(User).filter(
                 User.is_admin == False,
-                User.current_rank == next_rank_target
+                User.current_rank == current_rank - 1
             ).first()
-        
-        points_to_next_rank = 0
-        if next_rank_user and user.current_rank and user.current_rank > 1:
-            points_to_next_rank = max(0, next_rank_user.total_points - user.total_points + 1)
-        
+            if next_rank_user:
+                points_to_next_rank = max(0, next_rank_user.total_points - user.total_points + 1)
+
         return {
             "user_id": user.id,
             "name": user.name,
             "total_points": user.total_points,
             "default_rank": user.default_rank,
-            "current_rank": user.current_rank,
-            "rank_improvement": (user.default_rank - user.current_rank) if user.default_rank and user.current_rank else 0,
+            "current_rank": current_rank,
+            "rank_improvement": (user.default_rank - current_rank) if user.default_rank and current_rank else 0,
             "percentile": round(percentile, 1),
             "points_to_next_rank": points_to_next_rank,
             "total_users": total_users
@@ -253,6 +509,17 @@ def get_rank_changes_after_share(db: Session, user_id: int, points_earned: int)
         new_total_points = user.total_points + points_earned
         
         # Calculate what the new rank would be
+        if sync_rank_index(db):
+            old_rank = rank_index.rank_of(user.id) or old_rank
+            new_rank = rank_index.rank_for(new_total_points, user.created_at, user.id)
+            return {
+                "old_rank": old_rank,
+                "new_rank": new_rank,
+                "rank_improvement": (old_rank - new_rank) if old_rank else 0,
+                "points_earned": points_earned,
+                "new_total_points": new_total_points
+            }
+
         result = db.execute(text("""
             SELECT COUNT(*) + 1 as new_rank
             FROM users 
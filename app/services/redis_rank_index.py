@@ -0,0 +1,210 @@
+"""
+Redis Leaderboard Backend
+=========================
+
+Sorted-set (ZSET) implementation of the rank index interface, selected with
+LEADERBOARD_BACKEND=redis. Every app node reads and writes the same ZSET,
+so the leaderboard is consistent across nodes without a per-worker copy or
+journal, and rank queries never reach MySQL.
+
+Ordering matches ORDER BY total_points DESC, created_at ASC, id ASC:
+- score = total_points * TIE_RANGE + (TIE_RANGE - 1 - seconds since
+  SCORE_EPOCH), so more points rank first and, on equal points, earlier
+  registration ranks first. Scores stay exact doubles up to 2**22 points.
+- Members are the user id encoded as (MEMBER_BASE - id), zero-padded, so
+  that equal scores (same points, same registration second) resolve to
+  the lower id first under ZREVRANGE.
+
+Set LEADERBOARD_REDIS_URL=fakeredis:// to run against an in-process
+fakeredis server (tests and local development).
+"""
+
+import logging
+from datetime import datetime, timezone
+from typing import Iterable, List, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+TIE_RANGE = 2 ** 31
+SCORE_EPOCH = datetime(2020, 1, 1, tzinfo=timezone.utc)
+MEMBER_BASE = 10 ** 12
+LOAD_CHUNK_SIZE = 10000
+REMOVED = -1
+
+
+def _registration_offset(created_at: Optional[datetime]) -> int:
+    """Seconds since SCORE_EPOCH (users without created_at sort last)."""
+    if created_at is None:
+        return TIE_RANGE - 1
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    return min(max(int((created_at - SCORE_EPOCH).total_seconds()), 0), TIE_RANGE - 1)
+
+
+def leaderboard_score(points: int, created_at: Optional[datetime]) -> int:
+    """Composite ZSET score for (points DESC, created_at ASC)."""
+    return max(0, points or 0) * TIE_RANGE + (TIE_RANGE - 1 - _registration_offset(created_at))
+
+
+def _member(user_id: int) -> str:
+    return f"{MEMBER_BASE - user_id:013d}"
+
+
+def _user_id(member) -> int:
+    if isinstance(member, bytes):
+        member = member.decode()
+    return MEMBER_BASE - int(member)
+
+
+def _points(score: float) -> int:
+    return int(score) // TIE_RANGE
+
+
+def create_redis_client(url: str):
+    """Redis client for url; fakeredis:// gives an in-process fake server."""
+    if url.startswith("fakeredis://"):
+        import fakeredis
+        return fakeredis.FakeRedis()
+    import redis
+    return redis.Redis.from_url(url)
+
+
+class RedisRankIndex:
+    """Rank index stored in a Redis sorted set, shared by every app node."""
+
+    def __init__(self, client, key: str = "leaderboard:ranks"):
+        self.client = client
+        self.key = key
+        # Present while the ZSET is considered fresh (expires after RANK_INDEX_REFRESH_SECONDS)
+        self.loaded_key = f"{key}:loaded"
+        self.lock_key = f"{key}:reload_lock"
+        # member -> latest score (REMOVED for removals) since the last load
+        self.updates_key = f"{key}:updates"
+
+    @property
+    def loaded(self) -> bool:
+        return bool(self.client.exists(self.loaded_key))
+
+    def exists(self) -> bool:
+        return bool(self.client.exists(self.key))
+
+    def __len__(self) -> int:
+        return self.client.zcard(self.key)
+
+    def __contains__(self, user_id: int) -> bool:
+        return self.client.zscore(self.key, _member(user_id)) is not None
+
+    def upsert(self, user_id: int, points: int, created_at: Optional[datetime]):
+        """Insert a user or move them to a new points value."""
+        member, score = _member(user_id), leaderboard_score(points, created_at)
+        pipe = self.client.pipeline()
+        pipe.zadd(self.key, {member: score})
+        pipe.hset(self.updates_key, member, score)
+        pipe.execute()
+
+    def remove(self, user_id: int):
+        """Remove a user (e.g. after promotion to admin)."""
+        member = _member(user_id)
+        pipe = self.client.pipeline()
+        pipe.zrem(self.key, member)
+        pipe.hset(self.updates_key, member, REMOVED)
+        pipe.execute()
+
+    def rank_for(self, points: int, created_at: Optional[datetime], user_id: int) -> int:
+        """1-based rank a user would hold with the given points, ignoring their current entry."""
+        score = leaderboard_score(points, created_at)
+        member = _member(user_id)
+        pipe = self.client.pipeline(transaction=False)
+        pipe.zcount(self.key, f"({score}", "+inf")
+        pipe.zrangebyscore(self.key, score, score)
+        pipe.zscore(self.key, member)
+        above, equal, current = pipe.execute()
+
+        ahead = above + sum(1 for other in equal if _user_id(other) < user_id)
+        if current is not None and current > score:
+            ahead -= 1
+        return ahead + 1
+
+    def rank_of(self, user_id: int) -> Optional[int]:
+        """1-based rank of a user, or None if they are not indexed."""
+        rank = self.client.zrevrank(self.key, _member(user_id))
+        return None if rank is None else rank + 1
+
+    def users_in_range(self, start: int, end: int) -> List[Tuple[int, int, int]]:
+        """Return (rank, user_id, points) for ranks start..end inclusive."""
+        start = max(1, start)
+        if end < start:
+            return []
+        entries = self.client.zrevrange(self.key, start - 1, end - 1, withscores=True)
+        return [(start + i, _user_id(member), _points(score)) for i, (member, score) in enumerate(entries)]
+
+    def user_at_rank(self, rank: int) -> Optional[Tuple[int, int, int]]:
+        """Return (rank, user_id, points) for a single rank."""
+        found = self.users_in_range(rank, rank)
+        return found[0] if found else None
+
+    def points_to_next_rank(self, user_id: int) -> int:
+        """Points the user needs to overtake the user directly above them."""
+        rank = self.rank_of(user_id)
+        if not rank or rank <= 1:
+            return 0
+        above = self.user_at_rank(rank - 1)
+        points = _points(self.client.zscore(self.key, _member(user_id)))
+        return max(0, above[2] - points + 1) if above else 0
+
+    def load(self, rows: Iterable[Tuple[int, int, Optional[datetime]]]):
+        """
+        Rebuild the ZSET from (id, total_points, created_at) rows.
+
+        Rows are written to a staging key and swapped in with RENAME, so
+        readers never see a partially loaded leaderboard. upsert and remove
+        also record each change in the updates hash; those changes are
+        re-applied in the same transaction as the RENAME, so writes made
+        while the rows were read or staged are not lost. The transaction
+        WATCHes the hash and retries if another change lands meanwhile.
+        """
+        from redis.exceptions import WatchError
+
+        staging = f"{self.key}:staging"
+        self.client.delete(staging)
+        chunk = {}
+        for user_id, points, created_at in rows:
+            chunk[_member(user_id)] = leaderboard_score(points, created_at)
+            if len(chunk) >= LOAD_CHUNK_SIZE:
+                self.client.zadd(staging, chunk)
+                chunk = {}
+        if chunk:
+            self.client.zadd(staging, chunk)
+
+        with self.client.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(self.updates_key)
+                    updates = pipe.hgetall(self.updates_key)
+                    staged = pipe.exists(staging)
+                    pipe.multi()
+                    if staged:
+                        pipe.rename(staging, self.key)
+                    else:
+                        pipe.delete(self.key)
+                    added = {m: int(score) for m, score in updates.items() if int(score) != REMOVED}
+                    removed = [m for m, score in updates.items() if int(score) == REMOVED]
+                    if added:
+                        pipe.zadd(self.key, added)
+                    if removed:
+                        pipe.zrem(self.key, *removed)
+                    pipe.delete(self.updates_key)
+                    pipe.set(self.loaded_key, 1, ex=settings.RANK_INDEX_REFRESH_SECONDS)
+                    pipe.execute()
+                    break
+                except WatchError:
+                    continue
+
+    def acquire_reload(self) -> bool:
+        """Claim the reload for this node (one node reloads at a time)."""
+        return bool(self.client.set(self.lock_key, 1, nx=True, ex=60))
+
+    def release_reload(self):
+        self.client.delete(self.lock_key)
@@ -0,0 +1,218 @@
+"""
+Share Daily Rollup Service
+==========================
+
+Maintains share_daily_rollup: one row per (date, platform) holding shares,
+points, unique users and the first/last share timestamps of that day.
+
+- record_share_in_rollup() upserts the row for a new share event inside the
+  caller's transaction, so the rollup never drifts from share_events.
+- rebuild_share_rollup() recomputes every row from share_events (backfill
+  after deploying, or repair after manual data changes).
+
+Admin dashboards read these pre-aggregated rows, so their cost depends on
+the number of days and platforms, not on the number of share events.
+
+share_period_scores is maintained the same way: one row per user per day,
+ISO week (starting Monday) and month, upserted by
+record_share_in_period_scores() and rebuilt by rebuild_period_scores().
+Period leaderboards read one (period, period_start) slice of it.
+"""
+
+import logging
+from datetime import date, timedelta
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.share import ShareEvent, ShareDailyRollup, SharePeriodScore, ScorePeriodEnum
+from app.services.analytics_service import to_date
+
+logger = logging.getLogger(__name__)
+
+
+def period_start(period: ScorePeriodEnum, day: date) -> date:
+    """First day of the period containing `day`."""
+    if period == ScorePeriodEnum.weekly:
+        return day - timedelta(days=day.weekday())
+    if period == ScorePeriodEnum.monthly:
+        return day.replace(day=1)
+    return day
+
+
+def previous_period_start(period: ScorePeriodEnum, start: date) -> date:
+    """First day of the period before the one starting at `start`."""
+    if period == ScorePeriodEnum.weekly:
+        return start - timedelta(days=7)
+    if period == ScorePeriodEnum.monthly:
+        return (start - timedelta(days=1)).replace(day=1)
+    return start - timedelta(days=1)
+
+
+def period_end(period: ScorePeriodEnum, start: date) -> date:
+    """Last day of the period starting at `start`."""
+    if period == ScorePeriodEnum.weekly:
+        return start + timedelta(days=6)
+    if period == ScorePeriodEnum.monthly:
+        return (start.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+    return start
+
+
+def _upsert(db: Session, values: dict, increments: dict, model=ShareDailyRollup):
+    """Dialect-aware INSERT ... ON DUPLICATE KEY / ON CONFLICT upsert."""
+    table = model.__table__
+    dialect = db.get_bind().dialect.name
+
+    if dialect == "mysql":
+        from sqlalchemy.dialects.mysql import insert
+        stmt = insert(table).values(**values)
+        stmt = stmt.on_duplicate_key_update(**{
+            column: getattr(table.c, column) + amount for column, amount in increments.items()
+        }, last_share_at=stmt.inserted.last_share_at)
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+        stmt = insert(table).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(table.primary_key.columns),
+            set_={
+                **{column: getattr(table.c, column) + amount for column, amount in increments.items()},
+                "last_share_at": stmt.excluded.last_share_at
+            }
+        )
+    else:
+        raise NotImplementedError(f"Share rollup upsert is not supported on {dialect}")
+
+    db.execute(stmt)
+
+
+def record_share_in_rollup(db: Session, share: ShareEvent):
+    """
+    Add a share event to today's rollup row.
+
+    Call after the event has been flushed (so created_at is populated) and
+    before committing, so the event and the rollup commit together.
+    """
+    _upsert(
+        db,
+        values={
+            "date": share.created_at.date(),
+            "platform": share.platform,
+            "shares": 1,
+            "points": share.points_earned,
+            "unique_users": 1,
+            "first_share_at": share.created_at,
+            "last_share_at": share.created_at
+        },
+        increments={"shares": 1, "points": share.points_earned, "unique_users": 1}
+    )
+
+
+def record_share_in_period_scores(db: Session, share: ShareEvent):
+    """
+    Add a share event to the user's daily, weekly and monthly score rows.
+
+    Same contract as record_share_in_rollup: call after flushing the event
+    and before committing.
+    """
+    day = share.created_at.date()
+    for period in ScorePeriodEnum:
+        _upsert(
+            db,
+            values={
+                "period": period,
+                "period_start": period_start(period, day),
+                "user_id": share.user_id,
+                "points": share.points_earned,
+                "shares": 1,
+                "last_share_at": share.created_at
+            },
+            increments={"points": share.points_earned, "shares": 1},
+            model=SharePeriodScore
+        )
+
+
+def rebuild_share_rollup(db: Session) -> int:
+    """
+    Recompute share_daily_rollup from share_events.
+
+    Returns:
+        int: Number of rollup rows written
+    """
+    day = func.date(ShareEvent.created_at)
+    rows = db.query(
+        day.label('day'),
+        ShareEvent.platform,
+        func.count(ShareEvent.id).label('shares'),
+        func.coalesce(func.sum(ShareEvent.points_earned), 0).label('points'),
+        func.count(func.distinct(ShareEvent.user_id)).label('unique_users'),
+        func.min(ShareEvent.created_at).label('first_share_at'),
+        func.max(ShareEvent.created_at).label('last_share_at')
+    ).group_by(day, ShareEvent.platform).all()
+
+    try:
+        db.query(ShareDailyRollup).delete(synchronize_session=False)
+        db.bulk_insert_mappings(ShareDailyRollup, [
+            {
+                "date": to_date(row.day),
+                "platform": row.platform,
+                "shares": row.shares,
+                "points": row.points,
+                "unique_users": row.unique_users,
+                "first_share_at": row.first_share_at,
+                "last_share_at": row.last_share_at
+            }
+            for row in rows
+        ])
+        db.commit()
+    except Exception as e:
+        logger.error(f"Share rollup rebuild failed: {e}")
+        db.rollback()
+        raise
+
+    logger.info(f"Rebuilt share_daily_rollup with {len(rows)} rows")
+    return len(rows)
+
+
+def rebuild_period_scores(db: Session) -> int:
+    """
+    Recompute share_period_scores from share_events.
+
+    Daily rows are aggregated in the database; weekly and monthly rows are
+    folded from them.
+
+    Returns:
+        int: Number of period score rows written
+    """
+    day = func.date(ShareEvent.created_at)
+    daily = db.query(
+        day.label('day'),
+        ShareEvent.user_id,
+        func.coalesce(func.sum(ShareEvent.points_earned), 0).label('points'),
+        func.count(ShareEvent.id).label('shares'),
+        func.max(ShareEvent.created_at).label('last_share_at')
+    ).group_by(day, ShareEvent.user_id).all()
+
+    scores = {}
+    for row in daily:
+        for period in ScorePeriodEnum:
+            key = (period, period_start(period, to_date(row.day)), row.user_id)
+            score = scores.setdefault(key, {"points": 0, "shares": 0, "last_share_at": None})
+            score["points"] += row.points
+            score["shares"] += row.shares
+            if score["last_share_at"] is None or row.last_share_at > score["last_share_at"]:
+                score["last_share_at"] = row.last_share_at
+
+    try:
+        db.query(SharePeriodScore).delete(synchronize_session=False)
+        db.bulk_insert_mappings(SharePeriodScore, [
+            {"period": period, "period_start": start, "user_id": user_id, **score}
+            for (period, start, user_id), score in scores.items()
+        ])
+        db.commit()
+    except Exception as e:
+        logger.error(f"Period score rebuild failed: {e}")
+        db.rollback()
+        raise
+
+    logger.info(f"Rebuilt share_period_scores with {len(scores)} rows")
+    return len(scores)
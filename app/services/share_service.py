@@ -1,6 +1,10 @@
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.share import ShareEvent, PlatformEnum
 from app.models.user import User
+from app.services.rank_index import rank_index, sync_rank_index, record_user_points
+from app.services.rank_refresh_service import mark_rank_dirty, rank_refresh_deferred, refresh_if_stale
+from app.services.rollup_service import record_share_in_rollup, record_share_in_period_scores
 from app.utils.cache import invalidate_leaderboard_cache
 from fastapi import HTTPException, status
 from datetime import datetime
@@ -40,23 +44,53 @@ def log_share_event(db: Session, user_id: int, platform: PlatformEnum):
     )
 
     try:
+        deferred = rank_refresh_deferred()
+        # Leaderboard position before the share, to limit cache invalidation
+        previous_rank = None
+        if not deferred and sync_rank_index(db):
+            previous_rank = rank_index.rank_of(user.id)
+        old_points = user.total_points
+
         # Update user points and shares
         user.total_points += points
         user.shares_count += 1
         db.add(share)
+        db.flush()
+        db.refresh(share)
+
+        # Update the daily rollup, period scores (and, inline, the stored ranks) in the same transaction as the event
+        record_share_in_rollup(db, share)
+        record_share_in_period_scores(db, share)
+        if not deferred:
+            from app.services.ranking_service import apply_points_gain
+            new_rank = apply_points_gain(db, user, old_points)
         db.commit()
         db.refresh(share)
         db.refresh(user)
 
-        # Update user's dynamic rank after earning points
-        from app.services.ranking_service import update_user_rank
-        new_rank = update_user_rank(db, user.id)
+        # Keep the in-memory rank index in step with the new points
+        record_user_points(user.id, user.total_points, user.created_at)
 
-        # Refresh user to get updated rank
-        db.refresh(user)
+        if deferred:
+            # Stored ranks and cached pages are refreshed in batches by the rank refresher
+            mark_rank_dirty(user.id, old_points)
+            refresh_if_stale(db)
+        elif previous_rank is not None:
+            # Users between the old and new position shift by one; other pages are unaffected
+            invalidate_leaderboard_cache(new_rank, previous_rank)
+        else:
+            invalidate_leaderboard_cache()
 
-        invalidate_leaderboard_cache()
         return share, user, points
     except Exception as e:
         db.rollback()
-        raise HTTPException(status_code=500, detail="Failed to record share event")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Failed to record share event")
+
+async def log_share_event_async(db: AsyncSession, user_id: int, platform: PlatformEnum):
+    """
+    Async version of log_share_event.
+
+    The share transaction, rank update and cache invalidation run on the
+    async connection via run_sync, so database waits do not block the loop.
+    """
+    return await db.run_sync(log_share_event, user_id, platform)
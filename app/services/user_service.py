@@ -1,4 +1,7 @@
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 from app.models.user import User
 from app.core.security import create_access_token
 from passlib.context import CryptContext
@@ -20,6 +23,12 @@ def get_user_by_id(db: Session, user_id: int):
     return db.query(User).filter(User.id == user_id).first()
 
 
+async def get_user_by_email_async(db: AsyncSession, email: str):
+    """Retrieve a user by email address (async session)."""
+    result = await db.execute(select(User).where(User.email == email).limit(1))
+    return result.scalars().first()
+
+
 def create_user(db: Session, user_in: UserCreate, is_admin: bool = False):
     """Create a new user with dynamic ranking. Optionally set as admin."""
     if get_user_by_email(db, user_in.email):
@@ -38,11 +47,16 @@ def create_user(db: Session, user_in: UserCreate, is_admin: bool = False):
     db.commit()
     db.refresh(user)
 
+    from app.services.counter_service import record_user_created
+    record_user_created(is_admin)
+
     # Assign default rank for non-admin users
     if not is_admin:
         from app.services.ranking_service import assign_default_rank
+        from app.services.rank_index import record_user_points
         assign_default_rank(db, user.id)
         db.refresh(user)  # Refresh to get updated rank fields
+        record_user_points(user.id, user.total_points or 0, user.created_at)
 
     return user
 
@@ -55,6 +69,15 @@ def authenticate_user(db: Session, email: str, password: str):
     return user
 
 
+async def authenticate_user_async(db: AsyncSession, email: str, password: str):
+    """Authenticate a user by email and password without blocking the event loop."""
+    user = await get_user_by_email_async(db, email)
+    # bcrypt is deliberately slow; verify it in the threadpool
+    if not user or not await run_in_threadpool(pwd_context.verify, password, user.password_hash):
+        return None
+    return user
+
+
 def update_user_profile(db: Session, user_id: int, profile_in: UserProfileUpdate):
     """Update a user's profile information."""
     user = get_user_by_id(db, user_id)
@@ -86,6 +109,12 @@ def promote_user_to_admin(db: Session, user_id: int):
     user.is_admin = True
     db.commit()
     db.refresh(user)
+
+    # Admins are not ranked
+    from app.services.rank_index import record_user_points
+    from app.services.counter_service import record_user_promoted
+    record_user_points(user.id, None)
+    record_user_promoted()
     return user
 
 
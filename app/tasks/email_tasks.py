@@ -1,12 +1,12 @@
 import logging
-from celery import Celery
+from celery import Celery, chord, group
 from app.services.email_service import send_welcome_email, send_bulk_email
 from app.core.config import settings
 
 celery_app = Celery(
     "tasks",
     broker=settings.RABBITMQ_URL,
-    backend='rpc://'  # Use RPC backend for development
+    backend=settings.CELERY_RESULT_BACKEND  # rpc:// for development; redis:// for chunked campaign aggregation
 )
 
 @celery_app.task(bind=True, max_retries=3)
@@ -46,29 +46,126 @@ def send_campaign_email_task(self, campaign_type: str, user_email: str, user_nam
         logging.error(f"Failed to send campaign email '{campaign_type}' to {user_email}: {exc}")
         self.retry(countdown=60, exc=exc)
 
+def _supports_chords() -> bool:
+    try:
+        celery_app.backend.ensure_chords_allowed()
+        return True
+    except NotImplementedError:
+        return False
+
 @celery_app.task
 def send_bulk_campaign_task(campaign_type: str):
-    """Send campaign email to all active users."""
+    """
+    Fan a campaign out to all active users as chunk tasks.
+
+    Recipients are split into user id ranges of CAMPAIGN_CHUNK_SIZE; each
+    range is sent (and retried) by its own send_campaign_chunk_task, so
+    throughput scales with campaign workers and a failure only repeats one
+    chunk. With a chord-capable result backend, aggregate_campaign_results_task
+    collects the per-chunk results into one summary.
+    """
     try:
-        from app.services.email_campaign_service import send_bulk_campaign_email
-        from app.core.dependencies import get_db
+        from app.services.email_campaign_service import get_campaign_recipient_chunks, is_campaign_in_past
+        from app.core.dependencies import SessionLocal
 
-        db = next(get_db())
+        if is_campaign_in_past(campaign_type):
+            logging.warning(f"Campaign '{campaign_type}' is in the past. Skipping bulk send.")
+            return {"campaign_type": campaign_type, "chunks": 0, "status": "skipped"}
+
+        db = SessionLocal()
         try:
-            success_count, failed_count = send_bulk_campaign_email(campaign_type, db)
-            return {
-                "campaign_type": campaign_type,
-                "success_count": success_count,
-                "failed_count": failed_count,
-                "total_sent": success_count + failed_count,
-                "status": "completed"
-            }
+            chunks = get_campaign_recipient_chunks(db)
         finally:
             db.close()
+
+        if not chunks:
+            return {"campaign_type": campaign_type, "chunks": 0, "status": "completed"}
+
+        header = [
+            send_campaign_chunk_task.s(campaign_type, first_id, last_id)
+            for first_id, last_id in chunks
+        ]
+        if _supports_chords():
+            result = chord(header)(aggregate_campaign_results_task.s(campaign_type))
+            aggregate_task_id = result.id
+            group_id = result.parent.id if result.parent else None
+        else:
+            # Result backend without chord support (e.g. rpc://): fan out without the aggregate step
+            logging.warning("Result backend does not support chords; campaign chunks will not be aggregated")
+            result = group(header).apply_async()
+            aggregate_task_id = None
+            group_id = result.id
+
+        logging.info(f"Campaign '{campaign_type}' dispatched as {len(chunks)} chunks")
+        return {
+            "campaign_type": campaign_type,
+            "chunks": len(chunks),
+            "group_id": group_id,
+            "aggregate_task_id": aggregate_task_id,
+            "status": "dispatched"
+        }
     except Exception as exc:
         logging.error(f"Failed to send bulk campaign '{campaign_type}': {exc}")
         raise
 
+@celery_app.task(bind=True, max_retries=3, acks_late=True)
+def send_campaign_chunk_task(self, campaign_type: str, first_id: int, last_id: int):
+    """Send a campaign to one recipient id range, retrying only this chunk on failure."""
+    from app.services.email_campaign_service import send_campaign_chunk
+    from app.core.dependencies import SessionLocal
+
+    self.update_state(state="PROGRESS", meta={"campaign_type": campaign_type, "first_id": first_id, "last_id": last_id})
+    db = SessionLocal()
+    try:
+        success_count, failed_count = send_campaign_chunk(campaign_type, db, first_id, last_id)
+        return {
+            "campaign_type": campaign_type,
+            "first_id": first_id,
+            "last_id": last_id,
+            "success_count": success_count,
+            "failed_count": failed_count,
+            "status": "completed"
+        }
+    except Exception as exc:
+        logging.error(f"Campaign '{campaign_type}' chunk {first_id}-{last_id} failed: {exc}")
+        if self.request.retries >= self.max_retries:
+            # Report the chunk as failed so the aggregate step still runs
+            return {
+                "campaign_type": campaign_type,
+                "first_id": first_id,
+                "last_id": last_id,
+                "success_count": 0,
+                "failed_count": 0,
+                "status": "failed",
+                "error": str(exc)
+            }
+        raise self.retry(countdown=60 * (self.request.retries + 1), exc=exc)
+    finally:
+        db.close()
+
+@celery_app.task
+def aggregate_campaign_results_task(chunk_results: list, campaign_type: str):
+    """Combine per-chunk results into a campaign summary."""
+    success_count = sum(r.get("success_count", 0) for r in chunk_results)
+    failed_count = sum(r.get("failed_count", 0) for r in chunk_results)
+    failed_chunks = [
+        {"first_id": r["first_id"], "last_id": r["last_id"], "error": r.get("error")}
+        for r in chunk_results if r.get("status") == "failed"
+    ]
+    logging.info(
+        f"Campaign '{campaign_type}' completed: {success_count} sent, {failed_count} failed, "
+        f"{len(failed_chunks)} of {len(chunk_results)} chunks failed"
+    )
+    return {
+        "campaign_type": campaign_type,
+        "chunks": len(chunk_results),
+        "success_count": success_count,
+        "failed_count": failed_count,
+        "total_sent": success_count + failed_count,
+        "failed_chunks": failed_chunks,
+        "status": "completed" if not failed_chunks else "partial_failure"
+    }
+
 @celery_app.task(bind=True, max_retries=3)
 def send_future_campaigns_to_new_user_task(self, user_email: str, user_name: str):
     """Send only future campaigns to a new user (no backdated emails)."""
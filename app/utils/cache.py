@@ -1,37 +1,189 @@
 import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
 from diskcache import Cache
 from app.core.config import settings
 
 cache = Cache(settings.CACHE_DIR, size_limit=int(2e9))  # 2GB limit
 
+# Leaderboard pages live under a generation namespace: bumping the generation
+# invalidates every page in O(1); stale generations simply age out via expire.
+LEADERBOARD_GENERATION_KEY = "leaderboard:generation"
+# Bumped on every invalidation (full or page-targeted) so that other workers
+# know to drop their in-process copies
+LEADERBOARD_EPOCH_KEY = "leaderboard:epoch"
+# Page sizes that have been cached, so a rank range maps to concrete page keys
+LEADERBOARD_LIMITS_KEY = "leaderboard:limits"
+# Bumped by a targeted delete of one page, so a render that started before
+# the delete cannot store its stale page afterwards
+LEADERBOARD_PAGE_VERSION_KEY = "leaderboard:page_version:{}:{}"
+PAGE_VERSION_EXPIRE = 3600
+# Above this many page deletes a generation bump is cheaper
+MAX_PAGE_INVALIDATIONS = 50
+
+
+class LocalLRUCache:
+    """Small thread-safe LRU cache with a per-entry TTL, local to one process."""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+leaderboard_local_cache = LocalLRUCache(
+    settings.LEADERBOARD_LOCAL_CACHE_SIZE,
+    settings.LEADERBOARD_LOCAL_CACHE_TTL
+)
+# Last epoch seen by this worker and when it was checked
+_local_epoch = {"epoch": None, "checked_at": 0.0}
+
+def _sync_local_leaderboard_cache():
+    """Drop this worker's pages if another worker invalidated since the last check."""
+    now = time.monotonic()
+    if now - _local_epoch["checked_at"] < settings.LEADERBOARD_LOCAL_SYNC_SECONDS:
+        return
+    epoch = cache.get(LEADERBOARD_EPOCH_KEY, default=0)
+    if epoch != _local_epoch["epoch"]:
+        leaderboard_local_cache.clear()
+        _local_epoch["epoch"] = epoch
+    _local_epoch["checked_at"] = now
+
+def _leaderboard_generation() -> int:
+    return cache.get(LEADERBOARD_GENERATION_KEY, default=0)
+
+def _leaderboard_key(generation: int, page: int, limit: int) -> str:
+    return f"leaderboard:{generation}:{page}:{limit}"
+
+def _page_version(page: int, limit: int) -> int:
+    return cache.get(LEADERBOARD_PAGE_VERSION_KEY.format(page, limit), default=0)
+
+def leaderboard_cache_token(page: int = 1, limit: int = 50) -> tuple:
+    """
+    Capture the cache state a page is about to be rendered from.
+
+    Take the token before rendering and pass it to set_leaderboard_cache,
+    which stores the page only if no invalidation happened in between.
+
+    Returns:
+        tuple: (generation, page version, local epoch)
+    """
+    _sync_local_leaderboard_cache()
+    return _leaderboard_generation(), _page_version(page, limit), _local_epoch["epoch"]
+
 def get_leaderboard_cache(page: int = 1, limit: int = 50):
-    """Get leaderboard data from cache."""
+    """Get a rendered leaderboard page, from this worker's memory or diskcache."""
     try:
-        cache_key = f"leaderboard:{page}:{limit}"
-        return cache.get(cache_key)
+        _sync_local_leaderboard_cache()
+        epoch = _local_epoch["epoch"]
+        local = leaderboard_local_cache.get((page, limit))
+        # Entries copied before the last invalidation this worker has seen are stale
+        if local is not None and local[0] == epoch:
+            return local[1]
+
+        cache_key = _leaderboard_key(_leaderboard_generation(), page, limit)
+        data = cache.get(cache_key)
+        if data is not None:
+            leaderboard_local_cache.set((page, limit), (epoch, data))
+        return data
     except Exception as e:
         logging.error(f"Cache get error: {e}")
         return None
 
-def set_leaderboard_cache(data, page: int = 1, limit: int = 50, expire: int = 60):
-    """Set leaderboard data in cache."""
+def set_leaderboard_cache(data, token: tuple, page: int = 1, limit: int = 50, expire: int = 60):
+    """
+    Set a rendered leaderboard page in both cache tiers.
+
+    token is the leaderboard_cache_token taken before rendering; the page is
+    dropped instead of stored if the leaderboard or this page was
+    invalidated since.
+    """
+    generation, version, epoch = token
     try:
-        cache_key = f"leaderboard:{page}:{limit}"
-        cache.set(cache_key, data, expire=expire)
+        with cache.transact():
+            if _leaderboard_generation() != generation or _page_version(page, limit) != version:
+                logging.info(f"Leaderboard page {page} (limit {limit}) invalidated while rendering, not cached")
+                return
+            cache.set(_leaderboard_key(generation, page, limit), data, expire=expire)
+        leaderboard_local_cache.set((page, limit), (epoch, data))
+
+        limits = cache.get(LEADERBOARD_LIMITS_KEY, default=frozenset())
+        if limit not in limits:
+            with cache.transact():
+                limits = cache.get(LEADERBOARD_LIMITS_KEY, default=frozenset())
+                cache.set(LEADERBOARD_LIMITS_KEY, limits | {limit})
     except Exception as e:
         logging.error(f"Cache set error: {e}")
 
-def invalidate_leaderboard_cache():
-    """Invalidate all leaderboard cache entries."""
+def invalidate_leaderboard_cache(start_rank: Optional[int] = None, end_rank: Optional[int] = None):
+    """
+    Invalidate leaderboard cache entries.
+
+    With a rank range, only the pages that contain ranks start_rank..end_rank
+    are deleted (for every page size that has been cached). Without one, the
+    whole leaderboard namespace is dropped by bumping its generation.
+
+    In-process copies are cleared here and, in other workers, within
+    LEADERBOARD_LOCAL_SYNC_SECONDS; copies tagged with an older epoch are
+    never served again.
+    """
     try:
-        keys_to_delete = []
-        for key in cache.iterkeys():
-            if key.startswith('leaderboard:'):
-                keys_to_delete.append(key)
-        
-        for key in keys_to_delete:
-            cache.delete(key)
-        
-        logging.info(f"Invalidated {len(keys_to_delete)} leaderboard cache entries")
+        if start_rank is None or end_rank is None:
+            generation = cache.incr(LEADERBOARD_GENERATION_KEY, default=0)
+            logging.info(f"Invalidated leaderboard cache (generation {generation})")
+        else:
+            start_rank, end_rank = sorted((max(1, start_rank), max(1, end_rank)))
+            limits = cache.get(LEADERBOARD_LIMITS_KEY, default=frozenset())
+            keys = []
+            for limit in limits:
+                first_page = (start_rank - 1) // limit + 1
+                last_page = (end_rank - 1) // limit + 1
+                keys.extend((page, limit) for page in range(first_page, last_page + 1))
+
+            if len(keys) > MAX_PAGE_INVALIDATIONS:
+                invalidate_leaderboard_cache()
+                return
+
+            with cache.transact():
+                generation = _leaderboard_generation()
+                for page, limit in keys:
+                    version_key = LEADERBOARD_PAGE_VERSION_KEY.format(page, limit)
+                    cache.set(version_key, cache.get(version_key, default=0) + 1, expire=PAGE_VERSION_EXPIRE)
+                    cache.delete(_leaderboard_key(generation, page, limit))
+
+            logging.info(f"Invalidated {len(keys)} leaderboard pages for ranks {start_rank}-{end_rank}")
+
+        _local_epoch["epoch"] = cache.incr(LEADERBOARD_EPOCH_KEY, default=0)
+        _local_epoch["checked_at"] = time.monotonic()
+        leaderboard_local_cache.clear()
     except Exception as e:
-        logging.error(f"Cache invalidation error: {e}") 
\ No newline at end of file
+        logging.error(f"Cache invalidation error: {e}")
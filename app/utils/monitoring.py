@@ -1,5 +1,7 @@
-from prometheus_client import Counter, Histogram, generate_latest
+from prometheus_client import Counter, Gauge, Histogram, generate_latest
 from fastapi import Request, Response
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
 import time
 
 REQUEST_COUNT = Counter(
@@ -17,6 +19,18 @@ USER_SIGNUP_COUNT = Counter("user_signup_total", "Total number of user signups")
 SHARE_EVENT_COUNT = Counter("share_event_total", "Total number of share events")
 BULK_EMAIL_SENT_COUNT = Counter("bulk_email_sent_total", "Total number of bulk email sends")
 ADMIN_PROMOTION_COUNT = Counter("admin_promotion_total", "Total number of admin promotions")
+# Database connection pool metrics, labelled by pool name ("sync" / "async")
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    "db_pool_checkout_seconds",
+    "Time spent waiting for a pooled database connection",
+    ["pool"],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30)
+)
+DB_POOL_CHECKOUT_TIMEOUTS = Counter("db_pool_checkout_timeouts_total", "Connection checkouts that timed out", ["pool"])
+DB_POOL_IN_USE = Gauge("db_pool_connections_in_use", "Connections currently checked out", ["pool"])
+DB_POOL_OVERFLOW = Gauge("db_pool_overflow", "Connections open beyond pool_size", ["pool"])
+DB_POOL_SIZE = Gauge("db_pool_size", "Configured pool size", ["pool"])
+DB_POOL_INVALIDATIONS = Counter("db_pool_invalidations_total", "Connections invalidated (dropped or stale)", ["pool"])
 
 def prometheus_middleware(app):
     @app.middleware("http")
@@ -35,6 +49,63 @@ def prometheus_middleware(app):
             raise
     return app
 
+class _TimedCheckoutMixin:
+    """Times Pool.connect() so checkout waits show up in db_pool_checkout_seconds."""
+    metrics_name = "sync"
+
+    def connect(self):
+        start_time = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            DB_POOL_CHECKOUT_TIMEOUTS.labels(self.metrics_name).inc()
+            raise
+        finally:
+            DB_POOL_CHECKOUT_SECONDS.labels(self.metrics_name).observe(time.perf_counter() - start_time)
+
+class InstrumentedQueuePool(_TimedCheckoutMixin, QueuePool):
+    metrics_name = "sync"
+
+class InstrumentedAsyncQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    metrics_name = "async"
+
+def register_pool_metrics(engine, name: str):
+    """Keep the pool gauges current via pool events on a (sync) Engine."""
+    def _update_pool_gauges():
+        pool = engine.pool
+        DB_POOL_OVERFLOW.labels(name).set(max(0, pool.overflow()))
+        DB_POOL_SIZE.labels(name).set(pool.size())
+
+    def _checked_out(*args):
+        DB_POOL_IN_USE.labels(name).inc()
+        _update_pool_gauges()
+
+    def _checked_in(*args):
+        # Fires before the connection is back in the pool, so count it ourselves
+        DB_POOL_IN_USE.labels(name).dec()
+        _update_pool_gauges()
+
+    def _invalidated(*args):
+        DB_POOL_INVALIDATIONS.labels(name).inc()
+
+    event.listen(engine, "checkout", _checked_out)
+    event.listen(engine, "checkin", _checked_in)
+    event.listen(engine, "invalidate", _invalidated)
+    event.listen(engine, "soft_invalidate", _invalidated)
+
+def pool_status(engine) -> dict:
+    """Current usage of a QueuePool-backed engine."""
+    pool = engine.pool
+    capacity = pool.size() + max(0, pool._max_overflow)
+    checked_out = pool.checkedout()
+    return {
+        "size": pool.size(),
+        "max_overflow": pool._max_overflow,
+        "checked_out": checked_out,
+        "overflow": max(0, pool.overflow()),
+        "saturation": round(checked_out / capacity, 3) if capacity else 0
+    }
+
 def prometheus_endpoint():
     return Response(generate_latest(), media_type="text/plain")
 
@@ -0,0 +1,131 @@
+"""
+Keyset Pagination
+=================
+
+Cursor-based pagination for list endpoints. A page is selected with a
+range predicate on the sort key instead of OFFSET, so page N costs the
+same as page 1.
+
+- The sort key is a tuple of columns ending in a unique column (id),
+  e.g. (created_at, id) or (total_points, id), each ascending or
+  descending.
+- Cursors are opaque URL-safe strings encoding the key of the last row
+  of the previous page.
+- Total counts are optional in cursor mode and served from a short-lived
+  cache, since an exact COUNT(*) per page is as slow as a deep OFFSET.
+"""
+
+import base64
+import hashlib
+import json
+from datetime import datetime
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Query
+
+from app.utils.cache import cache
+
+# Seconds a cached total count is reused
+COUNT_CACHE_SECONDS = 60
+COUNT_CACHE_TAG = "pagination:count"
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor cannot be decoded."""
+
+
+def encode_cursor(values: Sequence) -> str:
+    """Encode a sort key tuple as an opaque cursor."""
+    payload = [{"dt": value.isoformat()} if isinstance(value, datetime) else value for value in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, length: int) -> list:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Raises:
+        InvalidCursor: If the cursor is malformed or has the wrong key length
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        values = [datetime.fromisoformat(v["dt"]) if isinstance(v, dict) else v for v in payload]
+    except Exception as e:
+        raise InvalidCursor(f"Invalid cursor: {e}")
+    if not isinstance(payload, list) or len(values) != length:
+        raise InvalidCursor("Invalid cursor: wrong key length")
+    return values
+
+
+def _after(keys: Sequence[Tuple[object, bool]], values: Sequence):
+    """Predicate for rows strictly after `values` in the (column, descending) ordering."""
+    clauses = []
+    for position, (column, descending) in enumerate(keys):
+        equal_prefix = [keys[i][0] == values[i] for i in range(position)]
+        beyond = column < values[position] if descending else column > values[position]
+        clauses.append(and_(*equal_prefix, beyond))
+    return or_(*clauses)
+
+
+def keyset_page(
+    query: Query,
+    keys: Sequence[Tuple[object, bool]],
+    limit: int,
+    cursor: Optional[str],
+    key_of: Callable
+) -> Tuple[List, Optional[str]]:
+    """
+    Fetch one page ordered by `keys`, starting after `cursor`.
+
+    Args:
+        query: Filtered query (without ORDER BY / LIMIT)
+        keys: (column, descending) pairs; the last column must be unique
+        limit: Page size
+        cursor: Cursor from a previous page, or None for the first page
+        key_of: Returns the key tuple of a result row
+
+    Returns:
+        tuple: (rows, next_cursor or None when this is the last page)
+
+    Raises:
+        InvalidCursor: If the cursor is malformed
+    """
+    if cursor:
+        query = query.filter(_after(keys, decode_cursor(cursor, len(keys))))
+    query = query.order_by(*(column.desc() if descending else column.asc() for column, descending in keys))
+
+    rows = query.limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(key_of(rows[-1]))
+
+
+def next_cursor_for(rows: Sequence, limit: int, key_of: Callable, total: Optional[int] = None, offset: int = 0) -> Optional[str]:
+    """Cursor continuing after an OFFSET page, so clients can switch to keyset pagination."""
+    if not rows or len(rows) < limit or (total is not None and offset + len(rows) >= total):
+        return None
+    return encode_cursor(key_of(rows[-1]))
+
+
+def cached_count(query: Query, expire: int = COUNT_CACHE_SECONDS) -> int:
+    """COUNT(*) of a query, reused across requests for `expire` seconds."""
+    compiled = query.statement.compile()
+    digest = hashlib.blake2b(
+        (str(compiled) + repr(sorted((k, str(v)) for k, v in compiled.params.items()))).encode("utf-8"),
+        digest_size=16
+    ).hexdigest()
+    key = f"count:{digest}"
+    total = cache.get(key)
+    if total is None:
+        total = query.order_by(None).count()
+        cache.set(key, total, expire=expire, tag=COUNT_CACHE_TAG)
+    return total
+
+
+def clear_cached_counts():
+    """Drop every cached count (e.g. after bulk deletes)."""
+    cache.evict(COUNT_CACHE_TAG)
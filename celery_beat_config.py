@@ -27,7 +27,7 @@ IST = pytz.timezone('Asia/Kolkata')
 celery_app = Celery(
     "lawvriksh_campaigns",
     broker=settings.RABBITMQ_URL,
-    backend=settings.RABBITMQ_URL
+    backend=settings.CELERY_RESULT_BACKEND
 )
 
 # Import tasks
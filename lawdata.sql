@@ -34,6 +34,9 @@ USE lawvriksh_referral;
 -- For development, it's safe to drop tables for a clean slate.
 -- Drop in correct order to avoid foreign key constraint errors
 DROP TABLE IF EXISTS feedback;
+DROP TABLE IF EXISTS campaign_deliveries;
+DROP TABLE IF EXISTS share_period_scores;
+DROP TABLE IF EXISTS share_daily_rollup;
 DROP TABLE IF EXISTS share_events;
 DROP TABLE IF EXISTS users;
 
@@ -64,6 +67,7 @@ CREATE TABLE users (
     updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     INDEX idx_users_email (email),
     INDEX idx_users_total_points (total_points DESC),
+    INDEX idx_users_leaderboard (is_admin, total_points, created_at, id),
     INDEX idx_users_current_rank (current_rank),
     INDEX idx_users_default_rank (default_rank),
     INDEX idx_users_is_admin (is_admin),
@@ -86,6 +90,57 @@ CREATE TABLE share_events (
     INDEX idx_share_events_user_platform (user_id, platform)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
+-- =====================================================
+-- TABLE: share_daily_rollup
+-- Per-day, per-platform totals maintained on every share
+-- =====================================================
+CREATE TABLE share_daily_rollup (
+    date DATE NOT NULL,
+    platform ENUM('facebook', 'twitter', 'linkedin', 'instagram', 'whatsapp') NOT NULL,
+    shares INT NOT NULL DEFAULT 0,
+    points INT NOT NULL DEFAULT 0,
+    unique_users INT NOT NULL DEFAULT 0,
+    first_share_at DATETIME NULL,
+    last_share_at DATETIME NULL,
+    PRIMARY KEY (date, platform),
+    INDEX idx_share_daily_rollup_platform (platform)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- =====================================================
+-- TABLE: share_period_scores
+-- Per-user points per day, ISO week and month, maintained on every share
+-- =====================================================
+CREATE TABLE share_period_scores (
+    period ENUM('daily', 'weekly', 'monthly') NOT NULL,
+    period_start DATE NOT NULL,
+    user_id INT NOT NULL,
+    points INT NOT NULL DEFAULT 0,
+    shares INT NOT NULL DEFAULT 0,
+    last_share_at DATETIME NULL,
+    PRIMARY KEY (period, period_start, user_id),
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+    INDEX idx_share_period_scores_top (period, period_start, points)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- =====================================================
+-- TABLE: campaign_deliveries
+-- Ledger of campaign emails delivered to each user
+-- =====================================================
+CREATE TABLE campaign_deliveries (
+    campaign_type VARCHAR(50) NOT NULL,
+    user_id INT NOT NULL,
+    status ENUM('pending', 'sent', 'failed') NOT NULL DEFAULT 'pending',
+    attempts INT NOT NULL DEFAULT 0,
+    claim_token VARCHAR(36) NULL,
+    last_error VARCHAR(500) NULL,
+    sent_at DATETIME NULL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (campaign_type, user_id),
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+    INDEX idx_campaign_deliveries_status (campaign_type, status)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
 -- =====================================================
 -- TABLE: feedback
 -- =====================================================
@@ -126,6 +181,9 @@ CREATE TABLE feedback (
     INDEX idx_feedback_professional_fear (professional_fear),
     INDEX idx_feedback_time_consuming_part (time_consuming_part),
 
+    -- Full-text search over the free-text answers
+    FULLTEXT INDEX ft_feedback_text (monetization_considerations, professional_legacy, platform_impact, biggest_hurdle_other),
+
     -- Foreign key constraint (optional, allows anonymous feedback)
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE SET NULL
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
@@ -340,6 +398,28 @@ INSERT INTO share_events (user_id, platform, points_earned) VALUES
 (4, 'facebook', 3), (4, 'linkedin', 5), (4, 'instagram', 2), (4, 'twitter', 1),
 (5, 'facebook', 3), (5, 'linkedin', 5);
 
+-- Backfill the daily rollup for the sample share events
+INSERT INTO share_daily_rollup (date, platform, shares, points, unique_users, first_share_at, last_share_at)
+SELECT DATE(created_at), platform, COUNT(*), SUM(points_earned), COUNT(DISTINCT user_id), MIN(created_at), MAX(created_at)
+FROM share_events
+GROUP BY DATE(created_at), platform;
+
+-- Backfill the per-user daily, weekly (Monday start) and monthly buckets
+INSERT INTO share_period_scores (period, period_start, user_id, points, shares, last_share_at)
+SELECT 'daily', DATE(created_at), user_id, COALESCE(SUM(points_earned), 0), COUNT(*), MAX(created_at)
+FROM share_events
+GROUP BY DATE(created_at), user_id;
+
+INSERT INTO share_period_scores (period, period_start, user_id, points, shares, last_share_at)
+SELECT 'weekly', DATE_SUB(DATE(created_at), INTERVAL WEEKDAY(created_at) DAY), user_id, COALESCE(SUM(points_earned), 0), COUNT(*), MAX(created_at)
+FROM share_events
+GROUP BY DATE_SUB(DATE(created_at), INTERVAL WEEKDAY(created_at) DAY), user_id;
+
+INSERT INTO share_period_scores (period, period_start, user_id, points, shares, last_share_at)
+SELECT 'monthly', DATE_FORMAT(created_at, '%Y-%m-01'), user_id, COALESCE(SUM(points_earned), 0), COUNT(*), MAX(created_at)
+FROM share_events
+GROUP BY DATE_FORMAT(created_at, '%Y-%m-01'), user_id;
+
 -- =====================================================
 -- SAMPLE FEEDBACK DATA (Optional - for testing)
 -- =====================================================
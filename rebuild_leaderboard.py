@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Leaderboard Rebuild Script for LawVriksh Platform
+=================================================
+Reloads the leaderboard rank index from the database. With
+LEADERBOARD_BACKEND=redis this rebuilds the shared sorted set (run it after
+the first deploy, after restoring the database or after flushing Redis).
+
+Usage:
+    python rebuild_leaderboard.py
+"""
+
+import sys
+from pathlib import Path
+
+# Add the backend directory to Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+def main():
+    """Rebuild the leaderboard rank index."""
+    try:
+        from app.core.config import settings
+        from app.core.dependencies import get_db
+        from app.services.rank_index import load_rank_index, rank_index
+
+        print(f"🔄 Rebuilding leaderboard ({settings.LEADERBOARD_BACKEND} backend)...")
+
+        db = next(get_db())
+        try:
+            load_rank_index(db)
+        finally:
+            db.close()
+
+        print(f"✅ Leaderboard rebuilt with {len(rank_index)} users")
+    except Exception as e:
+        print(f"❌ Error rebuilding leaderboard: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Rank Rebuild Script for LawVriksh Platform
+==========================================
+Recomputes users.current_rank for every non-admin user with a set-based
+update (see ranking_service.update_all_ranks).
+
+Usage:
+    python rebuild_ranks.py [--dry-run] [--batch-size N]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add the backend directory to Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+def main():
+    """Rebuild user ranks."""
+    parser = argparse.ArgumentParser(description="Recompute current ranks for all users")
+    parser.add_argument("--dry-run", action="store_true", help="Report rank changes without writing them")
+    parser.add_argument("--batch-size", type=int, default=None, help="Users per UPDATE batch")
+    args = parser.parse_args()
+
+    print(f"🔄 Rebuilding user ranks{' (dry run)' if args.dry_run else ''}...")
+
+    try:
+        from app.core.dependencies import get_db
+        from app.services.ranking_service import update_all_ranks
+
+        def report(done, total):
+            print(f"   {done}/{total} users ({100 * done // max(total, 1)}%)")
+
+        db = next(get_db())
+        try:
+            result = update_all_ranks(db, batch_size=args.batch_size, dry_run=args.dry_run, progress=report)
+        finally:
+            db.close()
+
+        if "error" in result:
+            raise RuntimeError(result["error"])
+
+        if args.dry_run:
+            print(f"✅ {result['changed']} of {result['users']} ranks would change")
+            for change in result["sample"]:
+                print(f"   user {change['user_id']}: {change['old_rank']} → {change['new_rank']}")
+        else:
+            print(f"✅ Updated {result['changed']} of {result['users']} ranks in {result['batches']} batches")
+    except Exception as e:
+        print(f"❌ Error rebuilding ranks: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
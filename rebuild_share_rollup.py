@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Share Rollup Rebuild Script for LawVriksh Platform
+=================================================
+Recomputes the share_daily_rollup and share_period_scores tables from
+share_events.
+
+Run once after deploying the rollup tables (to backfill history), or any
+time share_events has been changed outside the application.
+
+Usage:
+    python rebuild_share_rollup.py
+"""
+
+import sys
+from pathlib import Path
+
+# Add the backend directory to Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+def main():
+    """Rebuild the share rollup table."""
+    print("🔄 Rebuilding share_daily_rollup and share_period_scores from share_events...")
+
+    try:
+        from app.core.dependencies import engine, get_db
+        from app.core.database import Base
+        from app.models.share import ShareDailyRollup, SharePeriodScore
+        from app.services.rollup_service import rebuild_share_rollup, rebuild_period_scores
+
+        # Make sure the rollup tables exist
+        Base.metadata.create_all(bind=engine, tables=[ShareDailyRollup.__table__, SharePeriodScore.__table__])
+
+        db = next(get_db())
+        try:
+            rows = rebuild_share_rollup(db)
+            scores = rebuild_period_scores(db)
+        finally:
+            db.close()
+
+        print(f"✅ Rebuilt {rows} rollup rows and {scores} period score rows")
+    except Exception as e:
+        print(f"❌ Error rebuilding share rollup: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -4,11 +4,20 @@ from unittest.mock import Mock, patch
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from app.core.database import Base
 from app.main import app
-from app.core.dependencies import get_db
+from app.core.dependencies import get_db, get_async_db
 from app.models.user import User
 from app.models.share import ShareEvent, PlatformEnum
+from app.models.campaign import CampaignDelivery
+from app.services.rank_index import rank_index
+from app.utils.cache import cache, invalidate_leaderboard_cache
+from app.services.counter_service import SNAPSHOT_KEY as USER_COUNTS_KEY
+from app.services.feedback_stats_service import SNAPSHOT_KEY as FEEDBACK_STATS_KEY
+from app.utils.pagination import clear_cached_counts
+from app.services.rank_refresh_service import DIRTY_KEY as RANK_DIRTY_KEY
 from passlib.context import CryptContext
 
 # Set testing environment variable
@@ -22,6 +31,9 @@ mock_celery_task.delay = Mock(return_value=Mock(id="test-task-id"))
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
 engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Same database file for async endpoints; NullPool because each TestClient call may run on its own event loop
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -32,6 +44,15 @@ def db_session():
     Base.metadata.drop_all(bind=engine)
     # Create all tables
     Base.metadata.create_all(bind=engine)
+    # The rank index is process-wide; rebuild it from the fresh database
+    rank_index.reset()
+    # Drop leaderboard pages cached by earlier tests
+    invalidate_leaderboard_cache()
+    # User counts are recounted from the fresh database on first use
+    cache.delete(USER_COUNTS_KEY)
+    cache.delete(FEEDBACK_STATS_KEY)
+    cache.delete(RANK_DIRTY_KEY)
+    clear_cached_counts()
 
     session = TestingSessionLocal()
     try:
@@ -51,7 +72,12 @@ def client(db_session):
         finally:
             pass
 
+    async def override_get_async_db():
+        async with TestingAsyncSessionLocal() as db:
+            yield db
+
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
 
     # Mock Celery tasks during testing
     with patch('app.api.auth.send_welcome_email_task', mock_celery_task), \
@@ -59,6 +59,24 @@ class TestAdmin:
         data = response.json()
         assert len(data["users"]) >= 1
 
+    def test_admin_users_cursor_pagination(self, client, admin_headers, db_session):
+        """Test cursor pages follow the points ordering with a cached total."""
+        from app.models.user import User
+        for i in range(5):
+            db_session.add(User(name=f"Cursor {i}", email=f"cursor{i}@example.com", total_points=10 * (i % 3)))
+        db_session.commit()
+
+        first = client.get("/admin/users?limit=2", headers=admin_headers).json()
+        pages = [first]
+        while pages[-1]["next_cursor"]:
+            pages.append(client.get(f"/admin/users?limit=2&cursor={pages[-1]['next_cursor']}", headers=admin_headers).json())
+
+        users = [u for page in pages for u in page["users"]]
+        assert len(users) == 6
+        assert len({u["user_id"] for u in users}) == 6
+        assert [u["points"] for u in users] == sorted((u["points"] for u in users), reverse=True)
+        assert pages[-1]["pagination"]["total"] == 6
+
     def test_admin_users_unauthorized(self, client, auth_headers):
         """Test admin users with non-admin user."""
         response = client.get("/admin/users", headers=auth_headers)
@@ -133,4 +151,42 @@ class TestAdmin:
             }, 
             headers=auth_headers
         )
-        assert response.status_code == status.HTTP_403_FORBIDDEN 
\ No newline at end of file
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_admin_analytics_aggregates(self, client, admin_headers, auth_headers):
+        """Test system-wide analytics and platform stats are aggregated in SQL."""
+        client.post("/shares/twitter", headers=auth_headers)
+        client.post("/shares/linkedin", headers=auth_headers)
+
+        response = client.get("/admin/analytics", headers=admin_headers)
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["summary"]["total_shares"] == 2
+        assert data["summary"]["total_points"] == 6
+        assert data["platform_breakdown"]["linkedin"]["points"] == 5
+        assert len(data["timeline"]) == 30
+        assert data["timeline"][-1]["shares"] == 2
+
+        response = client.get("/admin/platform-stats", headers=admin_headers)
+        assert response.status_code == status.HTTP_200_OK
+        stats = response.json()["platform_stats"]
+        assert stats["twitter"]["unique_users"] == 1
+        assert stats["twitter"]["recent_shares_7d"] == 1
+        assert stats["facebook"]["shares"] == 0
+
+    def test_share_rollup_rebuild_matches_incremental(self, client, admin_headers, auth_headers, db_session):
+        """Test rebuilding the daily rollup reproduces the incrementally maintained rows."""
+        from app.models.share import ShareDailyRollup
+        from app.services.rollup_service import rebuild_share_rollup
+
+        client.post("/shares/facebook", headers=auth_headers)
+        client.post("/shares/instagram", headers=auth_headers)
+        before = client.get("/admin/platform-stats", headers=admin_headers).json()
+
+        db_session.query(ShareDailyRollup).delete()
+        db_session.commit()
+        assert rebuild_share_rollup(db_session) == 2
+
+        after = client.get("/admin/platform-stats", headers=admin_headers).json()
+        assert after == before
+        assert after["summary"]["total_points"] == 5
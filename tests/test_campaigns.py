@@ -0,0 +1,156 @@
+import uuid
+import pytest
+from app.models.user import User
+from app.services import email_campaign_service
+from app.services.email_campaign_service import get_campaign_recipient_chunks, send_campaign_chunk
+from app.services.campaign_delivery_service import claim_recipients, get_delivery_counts, release_claims
+from app.tasks.email_tasks import aggregate_campaign_results_task, send_campaign_chunk_task
+
+def add_users(db_session, count, **fields):
+    users = [User(name=f"User {i}", email=f"campaign-{uuid.uuid4().hex[:8]}@example.com", **fields) for i in range(count)]
+    db_session.add_all(users)
+    db_session.commit()
+    return users
+
+class TestCampaignChunks:
+    def test_recipient_chunks_cover_active_users(self, db_session):
+        """Test recipients are split into contiguous id ranges of bounded size."""
+        users = add_users(db_session, 7, is_active=True, is_admin=False)
+        add_users(db_session, 2, is_active=True, is_admin=True)
+
+        chunks = get_campaign_recipient_chunks(db_session, chunk_size=3)
+        ids = [u.id for u in users]
+        assert chunks == [(ids[0], ids[2]), (ids[3], ids[5]), (ids[6], ids[6])]
+
+    def test_send_campaign_chunk_only_targets_range(self, db_session, monkeypatch):
+        """Test a chunk sends to the users inside its id range only."""
+        users = add_users(db_session, 4, is_active=True, is_admin=False)
+        sent_to = []
+
+        def fake_dispatch(messages):
+            # Handed over unbuilt, for the dispatcher to pull lazily
+            assert not isinstance(messages, list)
+            messages = list(messages)
+            sent_to.extend(msg["To"] for msg in messages)
+            return [{"email": msg["To"], "success": True, "error": None} for msg in messages]
+
+        monkeypatch.setattr("app.services.email_dispatcher.dispatch_messages", fake_dispatch)
+        assert send_campaign_chunk("search_engine", db_session, users[1].id, users[2].id) == (2, 0)
+        assert sent_to == [users[1].email, users[2].email]
+
+    def test_send_campaign_chunk_is_idempotent(self, db_session, monkeypatch):
+        """Test re-running a chunk only targets users without a delivery."""
+        users = add_users(db_session, 3, is_active=True, is_admin=False)
+        sent_to = []
+
+        def fake_dispatch(messages):
+            messages = list(messages)
+            sent_to.extend(msg["To"] for msg in messages)
+            return [
+                {"email": msg["To"], "success": msg["To"] != users[1].email, "error": None if msg["To"] != users[1].email else "550 rejected"}
+                for msg in messages
+            ]
+
+        monkeypatch.setattr("app.services.email_dispatcher.dispatch_messages", fake_dispatch)
+        assert send_campaign_chunk("search_engine", db_session, users[0].id, users[2].id) == (2, 1)
+        assert get_delivery_counts(db_session, "search_engine") == {"pending": 0, "sent": 2, "failed": 1}
+
+        # Only the failed recipient is retried, until it runs out of attempts
+        sent_to.clear()
+        for _ in range(4):
+            send_campaign_chunk("search_engine", db_session, users[0].id, users[2].id)
+        assert sent_to == [users[1].email, users[1].email]
+
+        # Deliveries are per campaign
+        assert send_campaign_chunk("portfolio_builder", db_session, users[0].id, users[2].id) == (2, 1)
+
+    def test_release_claims_makes_recipients_claimable(self, db_session):
+        """Test claims released after an aborted send can be claimed again at once."""
+        users = add_users(db_session, 2, is_active=True, is_admin=False)
+        recipients = db_session.query(User).filter(User.id.in_([u.id for u in users]))
+        token, claimed = claim_recipients(db_session, "search_engine", recipients)
+        assert len(claimed) == 2
+        assert claim_recipients(db_session, "search_engine", recipients)[1] == []
+
+        assert release_claims(db_session, "search_engine", token, "SMTP unreachable") == 2
+        assert get_delivery_counts(db_session, "search_engine") == {"pending": 0, "sent": 0, "failed": 2}
+        assert len(claim_recipients(db_session, "search_engine", recipients)[1]) == 2
+
+    def test_send_campaign_chunk_releases_claims_on_error(self, db_session, monkeypatch):
+        """Test a chunk whose dispatch raises leaves no pending claims behind."""
+        users = add_users(db_session, 2, is_active=True, is_admin=False)
+
+        def broken_dispatch(messages):
+            raise ConnectionError("SMTP unreachable")
+
+        monkeypatch.setattr("app.services.email_dispatcher.dispatch_messages", broken_dispatch)
+        with pytest.raises(ConnectionError):
+            send_campaign_chunk("search_engine", db_session, users[0].id, users[1].id)
+        assert get_delivery_counts(db_session, "search_engine") == {"pending": 0, "sent": 0, "failed": 2}
+
+    def test_chunk_task_retry_resends_after_dispatch_error(self, db_session, monkeypatch):
+        """Test the chunk task's retry delivers to recipients whose first send raised."""
+        from sqlalchemy.orm import sessionmaker
+        users = add_users(db_session, 2, is_active=True, is_admin=False)
+        calls = []
+
+        def flaky_dispatch(messages):
+            messages = list(messages)
+            calls.append(len(messages))
+            if len(calls) == 1:
+                raise ConnectionError("SMTP unreachable")
+            return [{"email": msg["To"], "success": True, "error": None} for msg in messages]
+
+        monkeypatch.setattr("app.services.email_dispatcher.dispatch_messages", flaky_dispatch)
+        monkeypatch.setattr("app.core.dependencies.SessionLocal", sessionmaker(bind=db_session.get_bind()))
+        monkeypatch.setattr(send_campaign_chunk_task, "update_state", lambda **kwargs: None)
+        send_campaign_chunk_task.apply(args=("search_engine", users[0].id, users[1].id))
+
+        assert calls == [2, 2]
+        assert get_delivery_counts(db_session, "search_engine") == {"pending": 0, "sent": 2, "failed": 0}
+
+    def test_aggregate_campaign_results(self):
+        """Test chunk results are combined into one summary."""
+        summary = aggregate_campaign_results_task([
+            {"first_id": 1, "last_id": 3, "success_count": 3, "failed_count": 0, "status": "completed"},
+            {"first_id": 4, "last_id": 6, "success_count": 0, "failed_count": 0, "status": "failed", "error": "db down"}
+        ], "search_engine")
+        assert summary["success_count"] == 3
+        assert summary["failed_chunks"] == [{"first_id": 4, "last_id": 6, "error": "db down"}]
+        assert summary["status"] == "partial_failure"
+
+class TestCampaignTemplates:
+    def test_text_part_matches_source(self):
+        """Test the compiled text body renders like the raw template."""
+        from app.services.email_campaign_service import EMAIL_TEMPLATES, get_campaign_template
+        for campaign_type, template in EMAIL_TEMPLATES.items():
+            expected = template["template"].format(name="Asha").strip()
+            assert get_campaign_template(campaign_type).render_text(name="Asha") == expected
+
+    def test_html_part_escapes_recipient_fields(self):
+        """Test the HTML body converts markup and escapes names."""
+        from app.services.email_campaign_service import get_campaign_template
+        body = get_campaign_template("welcome").render_html(name="<b>Eve</b>")
+        assert "&lt;b&gt;Eve&lt;/b&gt;" in body
+        assert "<strong>CONGRATULATIONS</strong>" in body
+        assert '<a href="https://lawvriksh.com/feedback">' in body
+
+    def test_build_messages_streams_multipart(self):
+        """Test one text + HTML message is built per recipient with the shared subject."""
+        from email.header import decode_header, make_header
+        from app.services.email_campaign_service import EMAIL_TEMPLATES, get_campaign_template
+        messages = get_campaign_template("search_engine").build_messages(iter([("a@example.com", "A"), ("b@example.com", "B")]))
+        first = next(messages)
+        assert first["To"] == "a@example.com"
+        assert str(make_header(decode_header(first["Subject"]))) == EMAIL_TEMPLATES["search_engine"]["subject"]
+        assert [part.get_content_type() for part in first.get_payload()] == ["text/plain", "text/html"]
+        assert "Hello A," in first.get_payload()[0].get_payload(decode=True).decode("utf-8")
+        assert [msg["To"] for msg in messages] == ["b@example.com"]
+
+    def test_preview_endpoint_renders_both_parts(self, client, admin_headers):
+        """Test the preview endpoint renders the compiled text and HTML bodies."""
+        response = client.get("/campaigns/preview/welcome", headers=admin_headers)
+        assert response.status_code == 200
+        data = response.json()
+        assert "[User Name]" in data["body"]
+        assert "<strong>CONGRATULATIONS</strong>" in data["html_body"]
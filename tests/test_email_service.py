@@ -0,0 +1,130 @@
+import smtplib
+import pytest
+from app.services import email_service
+from app.services.email_service import SMTPConnectionPool, build_message
+
+class FakeSMTP:
+    """Records sessions and messages instead of talking to a server."""
+    instances = []
+
+    def __init__(self, host, port, timeout=None):
+        self.sent = []
+        self.logged_in = False
+        self.drop_after = None
+        FakeSMTP.instances.append(self)
+
+    def starttls(self):
+        pass
+
+    def login(self, user, password):
+        self.logged_in = True
+
+    def sendmail(self, from_addr, to_addrs, msg):
+        if self.drop_after is not None and len(self.sent) >= self.drop_after:
+            raise smtplib.SMTPServerDisconnected("Connection unexpectedly closed")
+        self.sent.append(to_addrs[0])
+
+    def noop(self):
+        return (250, b"OK")
+
+    def quit(self):
+        pass
+
+    def close(self):
+        pass
+
+@pytest.fixture
+def fake_smtp(monkeypatch):
+    FakeSMTP.instances = []
+    monkeypatch.setattr(email_service.smtplib, "SMTP", FakeSMTP)
+    return FakeSMTP
+
+class TestSMTPConnectionPool:
+    def test_connection_reused_across_messages(self, fake_smtp):
+        """Test consecutive sends share one authenticated session."""
+        pool = SMTPConnectionPool("smtp.test", 587, "user", "secret")
+        for i in range(3):
+            pool.send_message(build_message(f"user{i}@example.com", "Hi", "Body"))
+        assert len(fake_smtp.instances) == 1
+        assert fake_smtp.instances[0].logged_in
+        assert fake_smtp.instances[0].sent == ["user0@example.com", "user1@example.com", "user2@example.com"]
+
+    def test_reconnects_after_drop(self, fake_smtp):
+        """Test a dropped session is replaced and the message retried."""
+        pool = SMTPConnectionPool("smtp.test", 587)
+        pool.send_message(build_message("first@example.com", "Hi", "Body"))
+        fake_smtp.instances[0].drop_after = 1
+
+        pool.send_message(build_message("second@example.com", "Hi", "Body"))
+        assert len(fake_smtp.instances) == 2
+        assert fake_smtp.instances[1].sent == ["second@example.com"]
+
+    def test_send_messages_recycles_sessions(self, fake_smtp):
+        """Test bulk sends respect the per-session message cap."""
+        pool = SMTPConnectionPool("smtp.test", 587, max_messages=2)
+        messages = [build_message(f"user{i}@example.com", "Hi", "Body") for i in range(5)]
+        results = pool.send_messages(messages)
+        assert [error for _, error in results] == [None] * 5
+        assert [len(server.sent) for server in fake_smtp.instances] == [2, 2, 1]
+
+class TestAsyncMailDispatcher:
+    @pytest.fixture
+    def smtp_server(self):
+        """Local aiosmtpd server collecting delivered messages."""
+        controller_module = pytest.importorskip("aiosmtpd.controller")
+
+        class Collector:
+            def __init__(self):
+                self.recipients = []
+
+            async def handle_DATA(self, server, session, envelope):
+                self.recipients.extend(envelope.rcpt_tos)
+                return "250 Message accepted for delivery"
+
+        import socket
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            port = probe.getsockname()[1]
+
+        handler = Collector()
+        controller = controller_module.Controller(handler, hostname="127.0.0.1", port=port)
+        controller.start()
+        yield "127.0.0.1", port, handler
+        controller.stop()
+
+    def test_dispatches_concurrently_with_results(self, smtp_server):
+        """Test every recipient is delivered and reported once."""
+        from app.services.email_dispatcher import AsyncMailDispatcher, dispatch_messages
+        host, port, handler = smtp_server
+        dispatcher = AsyncMailDispatcher(host, port, concurrency=3, max_messages=2, start_tls=False)
+        messages = [build_message(f"user{i}@example.com", "Campaign", "Body") for i in range(7)]
+
+        results = dispatch_messages(messages, dispatcher)
+        assert [r["email"] for r in results] == [f"user{i}@example.com" for i in range(7)]
+        assert all(r["success"] for r in results)
+        assert sorted(handler.recipients) == sorted(r["email"] for r in results)
+
+    def test_pulls_messages_lazily(self, smtp_server):
+        """Test a message generator is consumed as sessions free up, not up front."""
+        from app.services.email_dispatcher import AsyncMailDispatcher, dispatch_messages
+        host, port, handler = smtp_server
+        dispatcher = AsyncMailDispatcher(host, port, concurrency=2, start_tls=False)
+        delivered_when_built = []
+
+        def messages():
+            for i in range(6):
+                delivered_when_built.append(len(handler.recipients))
+                yield build_message(f"user{i}@example.com", "Campaign", "Body")
+
+        results = dispatch_messages(messages(), dispatcher)
+        assert [r["email"] for r in results] == [f"user{i}@example.com" for i in range(6)]
+        # Beyond the first message per session, each is built only after a send completed
+        assert all(delivered >= i - 1 for i, delivered in enumerate(delivered_when_built))
+
+    def test_reports_failures_per_recipient(self):
+        """Test an unreachable server yields a failed result per message."""
+        from app.services.email_dispatcher import AsyncMailDispatcher, dispatch_messages
+        dispatcher = AsyncMailDispatcher("127.0.0.1", 1, concurrency=2, start_tls=False, timeout=2)
+        results = dispatch_messages([build_message("a@example.com", "S", "B"), build_message("b@example.com", "S", "B")], dispatcher)
+        assert [r["success"] for r in results] == [False, False]
+        assert all(r["error"] for r in results)
@@ -0,0 +1,154 @@
+import csv
+import io
+import json
+from app.api import feedback as feedback_api
+from app.models.feedback import Feedback, BiggestHurdleEnum, ProfessionalFearEnum, PrimaryMotivationEnum
+
+def add_feedback(db_session, count, user=None):
+    entries = [
+        Feedback(
+            user_id=user.id if user else None,
+            email=f"respondent{i}@example.com",
+            name=f"Respondent {i}",
+            biggest_hurdle=BiggestHurdleEnum.A,
+            primary_motivation=PrimaryMotivationEnum.B if i % 2 else None,
+            professional_fear=ProfessionalFearEnum.C,
+            platform_impact=f"Impact statement {i}, with a comma"
+        )
+        for i in range(count)
+    ]
+    db_session.add_all(entries)
+    db_session.commit()
+    return entries
+
+class TestFeedbackExport:
+    def test_export_csv_streams_all_rows(self, client, admin_headers, db_session, test_user, monkeypatch):
+        """Test the CSV export contains every row when flushed in small chunks."""
+        monkeypatch.setattr(feedback_api, "EXPORT_CHUNK_BYTES", 256)
+        monkeypatch.setattr(feedback_api, "EXPORT_BATCH_SIZE", 3)
+        add_feedback(db_session, 10, user=test_user)
+
+        response = client.get("/feedback/export?format=csv", headers=admin_headers)
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        rows = list(csv.reader(io.StringIO(response.text)))
+        assert rows[0] == feedback_api.EXPORT_CSV_HEADERS
+        assert len(rows) == 11
+        assert {row[4] for row in rows[1:]} == {test_user.name}
+
+    def test_export_ndjson(self, client, admin_headers, db_session):
+        """Test the NDJSON export yields one JSON record per line."""
+        add_feedback(db_session, 4)
+
+        response = client.get("/feedback/export?format=ndjson", headers=admin_headers)
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        records = [json.loads(line) for line in response.text.splitlines()]
+        assert len(records) == 4
+        assert records[0]["professional_fear"]["value"] == "C"
+
+    def test_export_json_array_is_valid(self, client, admin_headers, db_session, monkeypatch):
+        """Test the incrementally written JSON array parses, including when empty."""
+        response = client.get("/feedback/export?format=json", headers=admin_headers)
+        assert response.json() == []
+
+        monkeypatch.setattr(feedback_api, "EXPORT_CHUNK_BYTES", 128)
+        add_feedback(db_session, 5)
+        response = client.get("/feedback/export?format=json", headers=admin_headers)
+        data = response.json()
+        assert len(data) == 5
+        assert {entry["primary_motivation"]["value"] for entry in data if entry["primary_motivation"]} == {"B"}
+
+class TestFeedbackSearch:
+    def test_search_orders_by_relevance(self, client, admin_headers, db_session):
+        """Test full-text matches come back ranked by relevance."""
+        entries = add_feedback(db_session, 3)
+        entries[0].professional_legacy = "Mentoring younger lawyers"
+        entries[2].professional_legacy = "Mentoring and more mentoring, mentorship matters"
+        db_session.commit()
+
+        response = client.get("/feedback?search=mentor", headers=admin_headers)
+        assert response.status_code == 200
+        ids = [entry["id"] for entry in response.json()["feedback"]]
+        assert ids == [entries[2].id, entries[0].id]
+
+    def test_search_matches_user_and_falls_back_to_like(self, client, admin_headers, db_session, test_user):
+        """Test user names and emails match by substring and short terms use the fallback."""
+        entries = add_feedback(db_session, 2, user=test_user)
+        add_feedback(db_session, 1)
+
+        response = client.get(f"/feedback?search={test_user.name.split()[0]}", headers=admin_headers)
+        assert {entry["id"] for entry in response.json()["feedback"]} == {e.id for e in entries}
+
+        # Substring of the user's email, not a prefix
+        response = client.get("/feedback?search=example.com", headers=admin_headers)
+        assert {entry["id"] for entry in response.json()["feedback"]} == {e.id for e in entries}
+
+        # "ct" is below the full-text token size: substring match on "Impact"
+        response = client.get("/feedback?search=ct", headers=admin_headers)
+        assert response.json()["pagination"]["total"] == 3
+
+    def test_export_uses_search(self, client, admin_headers, db_session):
+        """Test exports apply the same full-text filter."""
+        entries = add_feedback(db_session, 3)
+        entries[1].monetization_considerations = "Subscription revenue"
+        db_session.commit()
+
+        response = client.get("/feedback/export?format=ndjson&search=subscript", headers=admin_headers)
+        assert [json.loads(line)["id"] for line in response.text.splitlines()] == [entries[1].id]
+
+class TestFeedbackStats:
+    def test_stats_snapshot_follows_submissions(self, client, admin_headers, db_session):
+        """Test submissions update the cached stats without a recompute."""
+        add_feedback(db_session, 3)
+        stats = client.get("/feedback/stats", headers=admin_headers).json()
+        assert stats["total_responses"] == 3
+        assert stats["responses_by_hurdle"] == {"BiggestHurdleEnum.A": 3}
+        assert stats["responses_by_motivation"] == {"None": 2, "PrimaryMotivationEnum.B": 1}
+        assert stats["responses_last_7_days"] == 3
+
+        response = client.post("/feedback/submit", json={
+            "email": "complete@example.com",
+            "name": "Complete User",
+            "biggest_hurdle": "B",
+            "primary_motivation": "A",
+            "time_consuming_part": "C",
+            "professional_fear": "B",
+            "monetization_considerations": "I have concerns about ethical implications and time investment required.",
+            "professional_legacy": "I want to be remembered as someone who made legal knowledge accessible to everyone.",
+            "platform_impact": "Such a platform would allow me to reach thousands of people and establish thought leadership."
+        })
+        assert response.status_code == 200
+
+        cached = client.get("/feedback/stats", headers=admin_headers).json()
+        fresh = client.get("/feedback/stats?fresh=true", headers=admin_headers).json()
+        assert cached["total_responses"] == 4
+        assert cached["responses_by_hurdle"] == {"BiggestHurdleEnum.A": 3, "BiggestHurdleEnum.B": 1}
+        assert cached == fresh
+
+    def test_fresh_stats_see_direct_writes(self, client, admin_headers, db_session):
+        """Test fresh=true recomputes changes made outside the submit endpoint."""
+        assert client.get("/feedback/stats", headers=admin_headers).json()["total_responses"] == 0
+        add_feedback(db_session, 2)
+        assert client.get("/feedback/stats", headers=admin_headers).json()["total_responses"] == 0
+        assert client.get("/feedback/stats?fresh=true", headers=admin_headers).json()["total_responses"] == 2
+
+    def test_recompute_keeps_concurrent_submissions(self, db_session, monkeypatch):
+        """Test a submission recorded mid-recompute is kept, and counted only once."""
+        from app.services import feedback_stats_service
+        add_feedback(db_session, 2)
+        query = feedback_stats_service._query_feedback_stats
+        late = []
+
+        def query_then_submit(db):
+            snapshot = query(db)
+            # Committed and recorded after the aggregate query ran
+            late.extend(add_feedback(db_session, 1))
+            feedback_stats_service.record_feedback_submitted(late[0])
+            return snapshot
+
+        monkeypatch.setattr(feedback_stats_service, "_query_feedback_stats", query_then_submit)
+        assert feedback_stats_service.compute_feedback_stats(db_session)["total"] == 3
+
+        feedback_stats_service.record_feedback_submitted(late[0])
+        assert feedback_stats_service.get_feedback_stats(db_session)["total"] == 3
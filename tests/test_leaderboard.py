@@ -98,4 +98,293 @@ class TestLeaderboard:
         assert response.status_code == status.HTTP_200_OK
         data = response.json()
         assert "your_rank" in data["metadata"]
-        assert "your_points" in data["metadata"] 
\ No newline at end of file
+        assert "your_points" in data["metadata"] 
+
+    def test_leaderboard_around_me_window(self, client, auth_headers, db_session, test_user):
+        """Test around-me returns only the neighbours and the caller's exact rank."""
+        from app.models.user import User
+
+        for i in range(6):
+            db_session.add(User(
+                name=f"Ranked {i}",
+                email=f"ranked{i}@example.com",
+                password_hash="x",
+                total_points=(i + 1) * 10
+            ))
+        db_session.commit()
+
+        response = client.get("/leaderboard/around-me?range=2", headers=auth_headers)
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["your_stats"]["rank"] == 7
+        assert [u["rank"] for u in data["surrounding_users"]] == [5, 6, 7]
+        assert data["surrounding_users"][-1]["is_current_user"] is True
+        assert data["your_stats"]["points_to_next_rank"] == 11
+
+    def test_around_me_fallback_ignores_stale_stored_rank(self, client, auth_headers, db_session, test_user, monkeypatch):
+        """Test the SQL fallback numbers the window from points, not the stored current_rank."""
+        from app.core.config import settings
+        from app.models.user import User
+        monkeypatch.setattr(settings, "RANK_INDEX_ENABLED", False)
+
+        for i in range(3):
+            db_session.add(User(name=f"Ahead {i}", email=f"ahead{i}@example.com", password_hash="x", total_points=10))
+        test_user.current_rank = 1
+        db_session.commit()
+
+        data = client.get("/leaderboard/around-me?range=1", headers=auth_headers).json()
+        assert data["your_stats"]["rank"] == 4
+        assert [u["rank"] for u in data["surrounding_users"]] == [3, 4]
+
+    def test_leaderboard_etag_not_modified(self, client, auth_headers):
+        """Test polling with If-None-Match returns 304 until the page changes."""
+        response = client.get("/leaderboard?page=1&limit=10")
+        assert response.status_code == status.HTTP_200_OK
+        etag = response.headers["etag"]
+        assert response.json()["pagination"]["total"] >= 1
+
+        response = client.get("/leaderboard?page=1&limit=10", headers={"If-None-Match": etag})
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.content == b""
+
+        client.post("/shares/linkedin", headers=auth_headers)
+        response = client.get("/leaderboard?page=1&limit=10", headers={"If-None-Match": etag})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["etag"] != etag
+
+    def test_leaderboard_cache_invalidates_affected_pages(self):
+        """Test a rank range only drops the cached pages it overlaps."""
+        from app.utils.cache import (
+            get_leaderboard_cache, set_leaderboard_cache, invalidate_leaderboard_cache,
+            leaderboard_cache_token
+        )
+        invalidate_leaderboard_cache()
+        for page in (1, 2, 3):
+            set_leaderboard_cache(f"page-{page}".encode(), leaderboard_cache_token(page, 10), page=page, limit=10)
+
+        invalidate_leaderboard_cache(12, 25)
+        assert get_leaderboard_cache(page=1, limit=10) == b"page-1"
+        assert get_leaderboard_cache(page=2, limit=10) is None
+        assert get_leaderboard_cache(page=3, limit=10) is None
+
+        invalidate_leaderboard_cache()
+        assert get_leaderboard_cache(page=1, limit=10) is None
+
+    def test_leaderboard_cache_drops_pages_invalidated_while_rendering(self):
+        """Test a page rendered before an invalidation is not stored after it."""
+        from app.utils.cache import (
+            get_leaderboard_cache, set_leaderboard_cache, invalidate_leaderboard_cache,
+            leaderboard_cache_token
+        )
+        token = leaderboard_cache_token(1, 10)
+        invalidate_leaderboard_cache()
+        set_leaderboard_cache(b"stale", token, page=1, limit=10)
+        assert get_leaderboard_cache(page=1, limit=10) is None
+
+        set_leaderboard_cache(b"page-1", leaderboard_cache_token(1, 10), page=1, limit=10)
+        token = leaderboard_cache_token(1, 10)
+        invalidate_leaderboard_cache(1, 5)
+        set_leaderboard_cache(b"stale", token, page=1, limit=10)
+        assert get_leaderboard_cache(page=1, limit=10) is None
+
+    def test_leaderboard_local_cache_follows_other_workers(self, monkeypatch):
+        """Test the in-process tier drops pages invalidated by another worker."""
+        from app.core.config import settings
+        from app.utils import cache as cache_module
+        cache_module.invalidate_leaderboard_cache()
+        cache_module.set_leaderboard_cache(b"fresh", cache_module.leaderboard_cache_token(1, 10), page=1, limit=10)
+
+        # Another worker bumps the shared epoch; its diskcache page is gone too
+        cache_module.cache.incr(cache_module.LEADERBOARD_EPOCH_KEY)
+        cache_module.cache.incr(cache_module.LEADERBOARD_GENERATION_KEY)
+        assert cache_module.get_leaderboard_cache(page=1, limit=10) == b"fresh"
+
+        monkeypatch.setattr(settings, "LEADERBOARD_LOCAL_SYNC_SECONDS", 0)
+        assert cache_module.get_leaderboard_cache(page=1, limit=10) is None
+
+    def test_leaderboard_local_cache_rejects_copies_from_before_invalidation(self):
+        """Test an in-process copy made before an invalidation is never served."""
+        from app.utils import cache as cache_module
+        cache_module.invalidate_leaderboard_cache()
+        epoch = cache_module._local_epoch["epoch"]
+
+        # A request thread copied the page just before another thread invalidated
+        cache_module.invalidate_leaderboard_cache()
+        cache_module.leaderboard_local_cache.set((1, 10), (epoch, b"stale"))
+        assert cache_module.get_leaderboard_cache(page=1, limit=10) is None
+
+    def test_local_lru_cache_evicts_oldest(self):
+        """Test the in-process tier stays within its size bound."""
+        from app.utils.cache import LocalLRUCache
+        local = LocalLRUCache(max_entries=2, ttl=60)
+        local.set("a", b"1")
+        local.set("b", b"2")
+        local.get("a")
+        local.set("c", b"3")
+        assert local.get("b") is None
+        assert local.get("a") == b"1"
+        assert len(local) == 2
+
+class TestRedisLeaderboard:
+    @pytest.fixture
+    def redis_index(self, monkeypatch):
+        fakeredis = pytest.importorskip("fakeredis")
+        from app.services.redis_rank_index import RedisRankIndex
+        index = RedisRankIndex(fakeredis.FakeRedis())
+        for module in ("rank_index", "leaderboard_service", "ranking_service", "share_service"):
+            monkeypatch.setattr(f"app.services.{module}.rank_index", index)
+        return index
+
+    def add_users(self, db_session):
+        from datetime import datetime
+        from app.models.user import User
+        joined = datetime(2025, 7, 1, 12, 0, 0)
+        users = [
+            User(name=f"Redis {i}", email=f"redis{i}@example.com", total_points=points, created_at=created)
+            for i, (points, created) in enumerate([
+                (10, joined), (10, datetime(2025, 6, 30)), (3, joined), (10, joined), (0, joined)
+            ])
+        ]
+        db_session.add_all(users)
+        db_session.commit()
+        return users
+
+    def test_order_matches_database(self, db_session, redis_index):
+        """Test the sorted set orders like points DESC, created_at ASC, id ASC."""
+        from app.models.user import User
+        from app.services.rank_index import sync_rank_index
+        self.add_users(db_session)
+
+        assert sync_rank_index(db_session)
+        expected = [u.id for u in db_session.query(User).filter(User.is_admin == False).order_by(
+            User.total_points.desc(), User.created_at.asc(), User.id.asc()
+        )]
+        ranked = redis_index.users_in_range(1, len(expected))
+        assert [user_id for _, user_id, _ in ranked] == expected
+        assert [rank for rank, _, _ in ranked] == list(range(1, len(expected) + 1))
+        assert redis_index.rank_of(expected[2]) == 3
+
+    def test_share_updates_shared_ranks(self, db_session, redis_index):
+        """Test a share moves the user in the sorted set and rank lookups follow it."""
+        from app.models.share import PlatformEnum
+        from app.services.leaderboard_service import get_around_me, get_user_rank
+        from app.services.rank_index import sync_rank_index
+        from app.services.ranking_service import get_rank_changes_after_share
+        from app.services.share_service import log_share_event
+        users = self.add_users(db_session)
+        sync_rank_index(db_session)
+
+        # 3 -> 11 points passes every 10-point user
+        changes = get_rank_changes_after_share(db_session, users[2].id, 8)
+        assert changes["old_rank"] == 4
+        assert changes["new_rank"] == 1
+
+        log_share_event(db_session, users[2].id, PlatformEnum.linkedin)
+        log_share_event(db_session, users[2].id, PlatformEnum.facebook)
+        assert get_user_rank(db_session, users[2].id) == 1
+        assert redis_index.user_at_rank(1)[2] == 11
+        assert redis_index.points_to_next_rank(users[1].id) == 2
+
+        around = get_around_me(db_session, users[1].id, range=1)
+        assert [(rank, u.id) for rank, u in around["neighbours"]] == [(1, users[2].id), (2, users[1].id), (3, users[0].id)]
+
+    def test_load_keeps_writes_made_during_reload(self, redis_index):
+        """Test upserts and removals made while a reload is staged survive the swap."""
+        from datetime import datetime
+        joined = datetime(2025, 7, 1)
+        redis_index.load([(1, 5, joined), (2, 5, joined)])
+
+        def rows():
+            yield (1, 5, joined)
+            # Another node writes while this one is still reading rows
+            redis_index.upsert(3, 20, joined)
+            redis_index.upsert(1, 8, joined)
+            redis_index.remove(2)
+            yield (2, 5, joined)
+
+        redis_index.load(rows())
+        assert [(user_id, points) for _, user_id, points in redis_index.users_in_range(1, 3)] == [(3, 20), (1, 8)]
+        assert not redis_index.client.exists(redis_index.updates_key)
+
+class TestTopPerformers:
+    def add_sharers(self, db_session):
+        from datetime import datetime, timedelta
+        from app.models.share import PlatformEnum, ScorePeriodEnum, SharePeriodScore
+        from app.models.user import User
+        from app.services.rollup_service import period_start
+        from app.services.share_service import log_share_event
+
+        veteran = User(name="Veteran", email="veteran@example.com", total_points=40)
+        newcomer = User(name="Newcomer", email="newcomer@example.com")
+        db_session.add_all([veteran, newcomer])
+        db_session.commit()
+
+        # Veteran earned their 40 points last week
+        last_week = period_start(ScorePeriodEnum.weekly, datetime.utcnow().date()) - timedelta(days=7)
+        db_session.add(SharePeriodScore(
+            period=ScorePeriodEnum.weekly, period_start=last_week, user_id=veteran.id, points=4, shares=2
+        ))
+        db_session.commit()
+
+        log_share_event(db_session, veteran.id, PlatformEnum.twitter)
+        log_share_event(db_session, veteran.id, PlatformEnum.facebook)
+        log_share_event(db_session, newcomer.id, PlatformEnum.linkedin)
+        return veteran, newcomer
+
+    def test_weekly_ranks_points_gained_in_period(self, client, db_session):
+        """Test weekly top performers use this week's points, with growth vs last week."""
+        veteran, newcomer = self.add_sharers(db_session)
+
+        response = client.get("/leaderboard/top-performers?period=weekly&limit=5")
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        performers = [(p["user_id"], p["points_gained"], p["total_points"], p["growth_rate"]) for p in data["top_performers"]]
+        assert performers == [(newcomer.id, 5, 5, "new"), (veteran.id, 4, 44, "+0%")]
+        assert data["period_stats"]["total_points_awarded"] == 9
+        assert data["period_stats"]["active_users"] == 2
+
+    def test_period_scores_rebuild_matches_incremental(self, db_session):
+        """Test rebuilding the period buckets from share events reproduces them."""
+        from datetime import datetime
+        from app.models.share import ScorePeriodEnum, SharePeriodScore
+        from app.services.rollup_service import period_start, rebuild_period_scores
+        self.add_sharers(db_session)
+
+        # Drop the seeded last-week row, which has no share events behind it
+        db_session.query(SharePeriodScore).filter(
+            SharePeriodScore.period == ScorePeriodEnum.weekly,
+            SharePeriodScore.period_start < period_start(ScorePeriodEnum.weekly, datetime.utcnow().date())
+        ).delete()
+        db_session.commit()
+
+        def snapshot():
+            return sorted(
+                (s.period.value, s.period_start, s.user_id, s.points, s.shares)
+                for s in db_session.query(SharePeriodScore)
+            )
+
+        incremental = snapshot()
+        assert len(incremental) == 6
+        assert rebuild_period_scores(db_session) == 6
+        assert snapshot() == incremental
+
+    def test_all_time_uses_total_points(self, client, db_session):
+        """Test all-time top performers rank by total points."""
+        veteran, newcomer = self.add_sharers(db_session)
+
+        data = client.get("/leaderboard/top-performers?period=all-time").json()
+        assert [p["user_id"] for p in data["top_performers"][:2]] == [veteran.id, newcomer.id]
+        assert data["top_performers"][0]["points_gained"] == 44
+        assert data["period_stats"]["total_points_awarded"] == 9
+
+    def test_period_stats_exclude_admins(self, client, db_session, test_admin_user):
+        """Test admins' shares count toward neither active users nor points awarded."""
+        from app.models.share import PlatformEnum
+        from app.services.share_service import log_share_event
+        self.add_sharers(db_session)
+        log_share_event(db_session, test_admin_user.id, PlatformEnum.twitter)
+
+        for period in ("weekly", "all-time"):
+            stats = client.get(f"/leaderboard/top-performers?period={period}").json()["period_stats"]
+            assert stats["total_points_awarded"] == 9
+            assert stats["active_users"] == 2
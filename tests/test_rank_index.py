@@ -0,0 +1,107 @@
+import pytest
+from datetime import datetime, timedelta
+from app.services.rank_index import RankIndex
+
+BASE_TIME = datetime(2025, 7, 1, 12, 0, 0)
+
+def build_index(rows):
+    index = RankIndex()
+    index.load([(user_id, points, BASE_TIME + timedelta(minutes=minute)) for user_id, points, minute in rows])
+    return index
+
+class TestRankIndex:
+    def test_rank_orders_by_points_then_registration(self):
+        """Test ranks follow total_points DESC, created_at ASC."""
+        index = build_index([(1, 5, 0), (2, 10, 1), (3, 5, 2), (4, 0, 3)])
+        assert index.rank_of(2) == 1
+        assert index.rank_of(1) == 2
+        assert index.rank_of(3) == 3
+        assert index.rank_of(4) == 4
+        assert index.rank_of(99) is None
+
+    def test_upsert_moves_user(self):
+        """Test updating points re-ranks the user incrementally."""
+        index = build_index([(1, 5, 0), (2, 10, 1), (3, 0, 2)])
+        index.upsert(3, 11, BASE_TIME + timedelta(minutes=2))
+        assert index.rank_of(3) == 1
+        assert index.rank_of(2) == 2
+        assert index.rank_of(1) == 3
+        assert len(index) == 3
+
+    def test_users_in_range(self):
+        """Test fetching a window of ranks across point buckets."""
+        index = build_index([(1, 5, 0), (2, 10, 1), (3, 5, 2), (4, 0, 3), (5, 1, 4)])
+        assert index.users_in_range(2, 4) == [(2, 1, 5), (3, 3, 5), (4, 5, 1)]
+        assert index.users_in_range(4, 10) == [(4, 5, 1), (5, 4, 0)]
+        assert index.users_in_range(6, 10) == []
+
+    def test_points_to_next_rank(self):
+        """Test points needed to overtake the user directly above."""
+        index = build_index([(1, 5, 0), (2, 10, 1), (3, 5, 2)])
+        assert index.points_to_next_rank(2) == 0
+        assert index.points_to_next_rank(1) == 6
+        assert index.points_to_next_rank(3) == 1
+
+    def test_rank_for_hypothetical_points(self):
+        """Test predicting a rank without moving the user."""
+        index = build_index([(1, 5, 0), (2, 10, 1), (3, 0, 2)])
+        assert index.rank_for(6, BASE_TIME + timedelta(minutes=2), 3) == 2
+        assert index.rank_for(10, BASE_TIME + timedelta(minutes=2), 3) == 2
+        assert index.rank_of(3) == 3
+
+    def test_points_beyond_initial_capacity(self):
+        """Test the point bucket tree grows for large point totals."""
+        index = build_index([(1, 5, 0)])
+        index.upsert(2, 1000, BASE_TIME)
+        assert index.rank_of(2) == 1
+        assert index.users_in_range(1, 2) == [(1, 2, 1000), (2, 1, 5)]
+
+    def test_remove(self):
+        """Test removing a promoted user shifts ranks up."""
+        index = build_index([(1, 5, 0), (2, 10, 1)])
+        index.remove(2)
+        assert index.rank_of(1) == 1
+        assert index.rank_of(2) is None
+
+class TestSyncRankIndex:
+    def test_requests_leave_reloads_to_the_reloader(self, db_session, monkeypatch):
+        """Test sync falls back instead of reloading while the background reloader runs."""
+        from app.services import rank_index as rank_index_module
+        monkeypatch.setitem(rank_index_module._reloader, "running", True)
+        assert rank_index_module.sync_rank_index(db_session) is False
+        assert not rank_index_module.rank_index.loaded
+
+        assert rank_index_module.reload_rank_index_if_due(db_session) is True
+        assert rank_index_module.sync_rank_index(db_session) is True
+
+    def test_rank_info_does_not_write_the_index(self, db_session, test_user):
+        """Test reading a user's rank info leaves the index unchanged."""
+        from app.services.rank_index import rank_index, sync_rank_index
+        from app.services.ranking_service import get_user_rank_info
+        sync_rank_index(db_session)
+
+        # Points committed without going through record_user_points
+        test_user.total_points = 7
+        db_session.commit()
+        info = get_user_rank_info(db_session, test_user.id)
+
+        assert info["current_rank"] == 1
+        assert rank_index.users_in_range(1, 1)[0][2] == 0
+
+    def test_around_me_does_not_write_the_index(self, db_session, test_user):
+        """Test the around-me window places a stale caller without touching the index."""
+        from app.models.user import User
+        from app.services.leaderboard_service import get_around_me
+        from app.services.rank_index import rank_index, sync_rank_index
+        for i in range(3):
+            db_session.add(User(name=f"Other {i}", email=f"other{i}@example.com", password_hash="x", total_points=(i + 1) * 10))
+        db_session.commit()
+        sync_rank_index(db_session)
+
+        test_user.total_points = 25
+        db_session.commit()
+        result = get_around_me(db_session, test_user.id, range=1)
+
+        assert result["rank"] == 2
+        assert [(r, u.total_points) for r, u in result["neighbours"]] == [(1, 30), (2, 25), (3, 20)]
+        assert rank_index.rank_of(test_user.id) == 4
@@ -0,0 +1,137 @@
+import pytest
+from datetime import datetime, timedelta
+from app.core.config import settings
+from app.models.user import User
+from app.models.share import PlatformEnum
+from app.services.ranking_service import update_all_ranks
+from app.services.share_service import log_share_event
+from app.services.rank_refresh_service import DIRTY_KEY, _refresher, drain_dirty_ranks
+from app.utils.cache import cache
+
+def add_ranked_users(db_session):
+    base = datetime(2025, 7, 1)
+    users = [
+        User(name=f"Ranked {i}", email=f"ranked{i}@example.com", total_points=points,
+             default_rank=i + 1, current_rank=99, created_at=base + timedelta(hours=i))
+        for i, points in enumerate([5, 20, 0, 20, 7])
+    ]
+    users.append(User(name="Admin", email="ranked-admin@example.com", total_points=100, is_admin=True, created_at=base))
+    db_session.add_all(users)
+    db_session.commit()
+    return users
+
+class TestUpdateAllRanks:
+    def test_dry_run_reports_without_writing(self, db_session):
+        """Test a dry run returns the diff and leaves ranks untouched."""
+        users = add_ranked_users(db_session)
+        result = update_all_ranks(db_session, dry_run=True)
+
+        assert result["dry_run"] is True
+        assert result["users"] == 5
+        assert result["changed"] == 5
+        assert result["sample"][0] == {"user_id": users[1].id, "old_rank": 99, "new_rank": 1}
+        db_session.expire_all()
+        assert {u.current_rank for u in db_session.query(User).filter(User.is_admin == False)} == {99}
+
+    def test_rebuild_in_batches(self, db_session):
+        """Test ranks follow points then registration order, applied batch by batch."""
+        users = add_ranked_users(db_session)
+        calls = []
+        result = update_all_ranks(db_session, batch_size=2, progress=lambda done, total: calls.append((done, total)))
+
+        assert result["changed"] == 5
+        assert result["batches"] == 3
+        assert calls[-1] == (5, 5)
+        ranks = {u.id: u.current_rank for u in db_session.query(User)}
+        # 20 (earlier), 20, 7, 5; the 0-point user keeps its default rank
+        assert [ranks[users[i].id] for i in (1, 3, 4, 0, 2)] == [1, 2, 3, 4, 3]
+        assert ranks[users[5].id] is None
+
+        # Nothing left to change on a second run
+        assert update_all_ranks(db_session)["changed"] == 0
+
+class TestApplyPointsGain:
+    @pytest.fixture(autouse=True)
+    def inline_mode(self, monkeypatch):
+        monkeypatch.setattr(settings, "RANK_REFRESH_MODE", "inline")
+
+    def test_share_shifts_overtaken_users(self, db_session):
+        """Test a share moves the user up and shifts only the users it overtakes."""
+        users = add_ranked_users(db_session)
+        update_all_ranks(db_session)
+
+        # 5 -> 10 points passes the 7-point user only
+        log_share_event(db_session, users[0].id, PlatformEnum.linkedin)
+        db_session.expire_all()
+        ranks = {u.id: u.current_rank for u in db_session.query(User)}
+        assert [ranks[users[i].id] for i in (1, 3, 0, 4)] == [1, 2, 3, 4]
+        assert update_all_ranks(db_session, dry_run=True)["changed"] == 0
+
+    def test_first_points_rank_after_ties(self, db_session):
+        """Test a user's first points place them after earlier users with equal points."""
+        users = add_ranked_users(db_session)
+        update_all_ranks(db_session)
+
+        # 0 -> 5 points ties with an earlier 5-point user
+        log_share_event(db_session, users[2].id, PlatformEnum.linkedin)
+        db_session.expire_all()
+        assert db_session.get(User, users[2].id).current_rank == 5
+        assert update_all_ranks(db_session, dry_run=True)["changed"] == 0
+
+        # 5 -> 8 points passes the earlier 5-point and the 7-point user
+        log_share_event(db_session, users[2].id, PlatformEnum.facebook)
+        db_session.expire_all()
+        ranks = {u.id: u.current_rank for u in db_session.query(User)}
+        assert [ranks[users[i].id] for i in (1, 3, 2, 4, 0)] == [1, 2, 3, 4, 5]
+        assert update_all_ranks(db_session, dry_run=True)["changed"] == 0
+
+class TestRankRefresh:
+    @pytest.fixture(autouse=True)
+    def deferred_mode(self, monkeypatch):
+        monkeypatch.setattr(settings, "RANK_REFRESH_MODE", "deferred")
+        monkeypatch.setitem(_refresher, "running", True)
+
+    def test_shares_coalesce_until_drained(self, db_session):
+        """Test shares only mark the user dirty and one drain applies all of them."""
+        users = add_ranked_users(db_session)
+        update_all_ranks(db_session)
+
+        log_share_event(db_session, users[2].id, PlatformEnum.linkedin)
+        log_share_event(db_session, users[2].id, PlatformEnum.facebook)
+        db_session.expire_all()
+        assert db_session.get(User, users[2].id).current_rank == 3  # still the default rank
+        assert list(cache.get(DIRTY_KEY)) == [users[2].id]
+        assert cache.get(DIRTY_KEY)[users[2].id][0] == 0
+
+        result = drain_dirty_ranks(db_session)
+        assert result["users"] == 1
+        assert cache.get(DIRTY_KEY) is None
+        db_session.expire_all()
+        ranks = {u.id: u.current_rank for u in db_session.query(User)}
+        assert [ranks[users[i].id] for i in (1, 3, 2, 4, 0)] == [1, 2, 3, 4, 5]
+        assert update_all_ranks(db_session, dry_run=True)["changed"] == 0
+
+    def test_share_drains_past_staleness_bound(self, db_session, monkeypatch):
+        """Test a share refreshes ranks itself when the queue is older than the bound."""
+        users = add_ranked_users(db_session)
+        update_all_ranks(db_session)
+        monkeypatch.setattr(settings, "RANK_REFRESH_MAX_STALENESS_MS", 0)
+
+        log_share_event(db_session, users[0].id, PlatformEnum.linkedin)
+        assert cache.get(DIRTY_KEY) is None
+        assert update_all_ranks(db_session, dry_run=True)["changed"] == 0
+
+    def test_drain_invalidates_pages_without_rank_changes(self, db_session):
+        """Test a drain drops cached pages even when no stored rank moved."""
+        from app.utils.cache import get_leaderboard_cache, leaderboard_cache_token, set_leaderboard_cache
+        users = add_ranked_users(db_session)
+        update_all_ranks(db_session)
+
+        # 20 -> 25 points keeps the leader in first place
+        log_share_event(db_session, users[1].id, PlatformEnum.linkedin)
+        set_leaderboard_cache(b"page-1", leaderboard_cache_token(1, 10), page=1, limit=10)
+        result = drain_dirty_ranks(db_session)
+
+        assert result["users"] == 1
+        assert result["changed"] == 0
+        assert get_leaderboard_cache(page=1, limit=10) is None
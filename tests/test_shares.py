@@ -67,6 +67,37 @@ class TestShares:
         assert len(data["shares"]) == 2
         assert data["pagination"]["total"] == 2
 
+    def test_share_history_cursor_pagination(self, client, auth_headers, db_session, test_user):
+        """Test walking share history with cursors visits every share once, newest first."""
+        from datetime import datetime, timedelta
+        from app.models.share import ShareEvent
+        base = datetime(2025, 7, 1, 12, 0, 0)
+        platforms = list(PlatformEnum)
+        # Pairs of shares with identical timestamps exercise the id tie-break
+        events = [
+            ShareEvent(user_id=test_user.id, platform=platforms[i % len(platforms)], points_earned=0, created_at=base + timedelta(minutes=i // 2))
+            for i in range(7)
+        ]
+        db_session.add_all(events)
+        db_session.commit()
+
+        first = client.get("/shares/history?limit=3", headers=auth_headers).json()
+        seen = [item["share_id"] for item in first["shares"]]
+        cursor = first["next_cursor"]
+        while cursor:
+            data = client.get(f"/shares/history?limit=3&cursor={cursor}&include_total=false", headers=auth_headers).json()
+            assert "total" not in data["pagination"]
+            seen.extend(item["share_id"] for item in data["shares"])
+            cursor = data["next_cursor"]
+
+        expected = [e.id for e in sorted(events, key=lambda e: (e.created_at, e.id), reverse=True)]
+        assert seen == expected
+
+    def test_share_history_invalid_cursor(self, client, auth_headers):
+        """Test a malformed cursor is rejected."""
+        response = client.get("/shares/history?cursor=not-a-cursor", headers=auth_headers)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
     def test_share_history_filtered_by_platform(self, client, auth_headers):
         """Test getting share history filtered by platform."""
         # Create shares on different platforms
@@ -113,4 +144,44 @@ class TestShares:
     def test_share_analytics_unauthorized(self, client):
         """Test share analytics without authentication."""
         response = client.get("/shares/analytics")
-        assert response.status_code == status.HTTP_401_UNAUTHORIZED 
\ No newline at end of file
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_share_analytics_enhanced(self, client, auth_headers):
+        """Test enhanced analytics breakdown, timeline and summary."""
+        client.post("/shares/twitter", headers=auth_headers)
+        client.post("/shares/facebook", headers=auth_headers)
+
+        response = client.get("/shares/analytics/enhanced", headers=auth_headers)
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["summary"]["total_shares"] == 2
+        assert data["summary"]["active_platforms"] == 2
+        assert data["platform_breakdown"]["facebook"]["percentage"] == 50.0
+        assert "first_share_date" in data["platform_breakdown"]["twitter"]
+        assert sum(day["points"] for day in data["timeline"]) == 4
+
+    def test_share_reports_live_rank_when_deferred(self, client, auth_headers, db_session, test_user, monkeypatch):
+        """Test the share response reports the live rank while stored ranks await the refresher."""
+        from app.core.config import settings
+        from app.models.user import User
+        from app.services.rank_index import load_rank_index
+        from app.services.rank_refresh_service import DIRTY_KEY, _refresher
+        from app.utils.cache import cache
+        monkeypatch.setattr(settings, "RANK_REFRESH_MODE", "deferred")
+        monkeypatch.setitem(_refresher, "running", True)
+
+        db_session.add_all([
+            User(name=f"Ahead {i}", email=f"ahead{i}@example.com", total_points=3, current_rank=i + 1)
+            for i in range(3)
+        ])
+        test_user.current_rank = 4
+        db_session.commit()
+        load_rank_index(db_session)
+
+        response = client.post("/shares/linkedin", headers=auth_headers)
+        assert response.status_code == status.HTTP_201_CREATED
+        data = response.json()
+        assert data["new_rank"] == 1
+        assert "Current rank: 1" in data["message"]
+        # The stored rank is still waiting for the refresher
+        assert test_user.id in cache.get(DIRTY_KEY)
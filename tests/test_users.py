@@ -75,6 +75,29 @@ class TestUsers:
         assert response.status_code == status.HTTP_200_OK
         # Should return empty CSV/JSON, not error
 
+    def test_export_users_ndjson_gzip(self, client, admin_headers, test_user, test_admin_user):
+        """Test the gzip NDJSON export decompresses to one record per user."""
+        import gzip
+        import json
+        response = client.get("/users/export?format=ndjson&gzip=true", headers=admin_headers)
+        assert response.status_code == status.HTTP_200_OK
+        assert "users.ndjson.gz" in response.headers["content-disposition"]
+        records = [json.loads(line) for line in gzip.decompress(response.content).decode("utf-8").splitlines()]
+        assert sorted(r["email"] for r in records) == sorted([test_user.email, test_admin_user.email])
+        assert set(records[0]) == {"id", "name", "email", "total_points", "shares_count", "created_at", "is_admin"}
+
+    def test_export_users_csv_streams_in_chunks(self, client, admin_headers, test_user, test_admin_user, monkeypatch):
+        """Test a CSV export split into many chunks keeps every row."""
+        import csv
+        import io
+        from app.api import users as users_api
+        monkeypatch.setattr(users_api, "USER_EXPORT_CHUNK_BYTES", 16)
+        monkeypatch.setattr(users_api, "USER_EXPORT_BATCH_SIZE", 1)
+        response = client.get("/users/export?min_points=0", headers=admin_headers)
+        rows = list(csv.reader(io.StringIO(response.text)))
+        assert rows[0] == users_api.USER_EXPORT_COLUMNS
+        assert sorted(row[2] for row in rows[1:]) == sorted([test_user.email, test_admin_user.email])
+
     def test_profile_includes_admin_status(self, client, test_admin_user):
         """Test that profile includes admin status."""
         response = client.get(f"/users/{test_admin_user.id}/profile")
@@ -88,4 +111,20 @@ class TestUsers:
         assert response.status_code == status.HTTP_200_OK
         data = response.json()
         assert "total_points" in data
-        assert "shares_count" in data 
\ No newline at end of file
+        assert "shares_count" in data
+
+    def test_user_counts_follow_signups(self, client, db_session, test_admin_user):
+        """Test user counters are seeded from the database and updated on signup."""
+        from app.services.counter_service import get_user_counts
+        counts = get_user_counts(db_session)
+        assert counts["total_users"] == 1
+        assert counts["non_admin_users"] == 0
+
+        response = client.post("/beta/signup", json={"name": "Beta User", "email": "beta-counter@example.com"})
+        assert response.status_code == 201
+
+        counts = get_user_counts(db_session)
+        assert counts["total_users"] == 2
+        assert counts["non_admin_users"] == 1
+        assert counts["non_admin_signups_24h"] == 1
+        assert counts["signups_7d"] == 2